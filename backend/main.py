@@ -5,37 +5,91 @@ Modern async API for building plan compliance checking
 """
 
 import os
-import json
-import uuid
+import sys
+import glob
+import secrets
 import shutil
+import signal
 import asyncio
+import functools
 import subprocess
 import hashlib
+import threading
+import multiprocessing
 from pathlib import Path
 from datetime import datetime
 from typing import Optional, Dict, List
 from contextlib import asynccontextmanager
+from concurrent.futures import ProcessPoolExecutor
 
-from fastapi import FastAPI, File, UploadFile, HTTPException, Form, BackgroundTasks
-from fastapi.responses import FileResponse, JSONResponse
+import aiosqlite
+import orjson
+from fastapi import (
+    FastAPI, File, UploadFile, HTTPException, Form, BackgroundTasks, Request,
+    WebSocket, WebSocketDisconnect
+)
+from fastapi.responses import FileResponse, JSONResponse, ORJSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 
+# Import the pipeline once at startup so its modules stay warm across requests
+BASE_DIR = Path(__file__).parent.parent.resolve()
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from compliCheckV2 import bedrock_kb_enabled, run_pipeline
+
 # ============================================================================
 # Configuration
 # ============================================================================
 
-BASE_DIR = Path(__file__).parent.parent.resolve()
 UPLOAD_FOLDER = BASE_DIR / 'uploads'
 REPORTS_FOLDER = BASE_DIR / 'reports_web'
 COMPLICHECK_SCRIPT = BASE_DIR / 'compliCheckV2.py'
 PYTHON_CMD = str(BASE_DIR / '.venv' / 'bin' / 'python3')
+COMPLICHECK_TIMEOUT = 300.0  # 5 minutes
+
+# How the pipeline is run: 'inprocess' (default) calls compliCheckV2 directly
+# in a worker thread, 'pool' dispatches to pre-forked worker processes that
+# have already imported the heavy dependencies, 'subprocess' spawns a fresh
+# python3 per plan
+COMPLICHECK_MODE = os.getenv('COMPLICHECK_MODE', 'inprocess').lower()
+COMPLICHECK_WORKERS = int(os.getenv('COMPLICHECK_WORKERS', '2'))
+
+# Cap concurrent pipeline runs so parallel pre-checks don't contend for the
+# same cores/RAM; extra runs wait their turn
+COMPLICHECK_CONCURRENCY = int(
+    os.getenv('COMPLICHECK_CONCURRENCY', str(max(1, (os.cpu_count() or 2) // 2)))
+)
+COMPLICHECK_SEM = asyncio.Semaphore(COMPLICHECK_CONCURRENCY)
+# The extraction script divides the cores between concurrent runs with this
+os.environ['COMPLICHECK_CONCURRENCY'] = str(COMPLICHECK_CONCURRENCY)
+
+# When served behind nginx, set this to an `internal` location aliased to
+# REPORTS_FOLDER (e.g. /internal/reports/) so report PDFs are sent by nginx
+# with sendfile(2) instead of being streamed through the app:
+#
+#   location /internal/reports/ {
+#       internal;
+#       alias /path/to/reports_web/;
+#   }
+REPORTS_ACCEL_REDIRECT_PREFIX = os.getenv('REPORTS_ACCEL_REDIRECT_PREFIX')
+
+# Seconds between store re-reads for /events WebSockets (see precheck_events)
+PROGRESS_EVENTS_RECHECK = float(os.getenv('PROGRESS_EVENTS_RECHECK', '5'))
+
+# Uploads are copied to disk in fixed-size chunks so memory stays O(chunk)
+UPLOAD_CHUNK_SIZE = 1 << 20  # 1 MiB
+
+# Every PDF starts with this header
+PDF_MAGIC = b'%PDF-'
 
 UPLOAD_FOLDER.mkdir(exist_ok=True)
 REPORTS_FOLDER.mkdir(exist_ok=True)
 
-# In-memory storage (POC - no database)
-prechecks: Dict[str, dict] = {}
+# Pre-check state lives in SQLite so it survives restarts/reloads and is
+# shared between uvicorn workers
+PRECHECK_DB = Path(os.getenv('PRECHECK_DB', str(BASE_DIR / 'prechecks.db')))
 
 # ============================================================================
 # Pydantic Models
@@ -71,17 +125,16 @@ class PreCheckResponse(BaseModel):
     precheck_id: Optional[str] = None
     message: Optional[str] = None
 
-class StatusResponse(BaseModel):
-    success: bool
-    status: str
-    results: Optional[dict] = None
-    processing_step: Optional[str] = None
-    progress: Optional[int] = None
-
 # ============================================================================
 # Lifespan Context Manager
 # ============================================================================
 
+def preload_pipeline_modules():
+    """Worker initializer: import the pipeline scripts and their heavy dependencies up front"""
+    import compliCheckV2
+
+    compliCheckV2.preload_scripts()
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Startup and shutdown events"""
@@ -92,9 +145,30 @@ async def lifespan(app: FastAPI):
     print(f"Upload Folder: {UPLOAD_FOLDER}")
     print(f"Reports Folder: {REPORTS_FOLDER}")
     print(f"CompliCheck Script: {COMPLICHECK_SCRIPT}")
+    print(f"Pipeline Mode: {COMPLICHECK_MODE}")
+    print(f"Pre-check DB: {PRECHECK_DB}")
     print("=" * 70)
-    yield
-    print("\nShutting down CompliCheck backend...")
+
+    await store.open()
+
+    app.state.worker_pool = None
+    app.state.cancel_manager = None
+    if COMPLICHECK_MODE == 'pool':
+        app.state.worker_pool = ProcessPoolExecutor(
+            max_workers=COMPLICHECK_WORKERS,
+            initializer=preload_pipeline_modules
+        )
+        # Cancel events for runs in the pool have to be shared across processes
+        app.state.cancel_manager = multiprocessing.Manager()
+
+    try:
+        yield
+    finally:
+        print("\nShutting down CompliCheck backend...")
+        if app.state.worker_pool:
+            app.state.worker_pool.shutdown(wait=False, cancel_futures=True)
+            app.state.cancel_manager.shutdown()
+        await store.close()
 
 # ============================================================================
 # FastAPI App
@@ -104,7 +178,8 @@ app = FastAPI(
     title="CompliCheck API",
     description="Building Plan Compliance Checking API",
     version="2.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # CORS configuration for React frontend
@@ -120,98 +195,421 @@ app.add_middleware(
 # Helper Functions
 # ============================================================================
 
-def get_precheck(precheck_id: str) -> Optional[dict]:
-    """Get precheck from memory"""
-    return prechecks.get(precheck_id)
+class PrecheckStore:
+    """SQLite-backed pre-check storage (one orjson blob per pre-check)"""
 
-async def run_complicheck(
-    pdf_path: str,
-    output_dir: str,
-    precheck_id: str,
-    file_type: str
-) -> dict:
-    """Run CompliCheck pipeline asynchronously"""
+    def __init__(self, path: Path):
+        self.path = path
+        self.db: Optional[aiosqlite.Connection] = None
+
+    async def open(self):
+        self.db = await aiosqlite.connect(self.path)
+        await self.db.execute("PRAGMA journal_mode=WAL")
+        await self.db.execute(
+            "CREATE TABLE IF NOT EXISTS precheck (id TEXT PRIMARY KEY, blob BLOB NOT NULL)"
+        )
+        await self.db.execute(
+            "CREATE TABLE IF NOT EXISTS plan_result (key TEXT PRIMARY KEY, blob BLOB NOT NULL)"
+        )
+        await self.db.commit()
+
+    async def close(self):
+        if self.db:
+            await self.db.close()
+            self.db = None
+
+    async def get(self, precheck_id: str) -> Optional[dict]:
+        async with self.db.execute(
+            "SELECT blob FROM precheck WHERE id = ?", (precheck_id,)
+        ) as cursor:
+            row = await cursor.fetchone()
+        return orjson.loads(row[0]) if row else None
+
+    async def save(self, precheck: dict):
+        await self.db.execute(
+            "INSERT OR REPLACE INTO precheck (id, blob) VALUES (?, ?)",
+            (precheck['id'], orjson.dumps(precheck))
+        )
+        await self.db.commit()
+
+    async def delete(self, precheck_id: str):
+        await self.db.execute("DELETE FROM precheck WHERE id = ?", (precheck_id,))
+        await self.db.commit()
+
+    async def get_plan_result(self, key: str) -> Optional[dict]:
+        """Cached pipeline result for a plan, keyed by content hash"""
+        async with self.db.execute(
+            "SELECT blob FROM plan_result WHERE key = ?", (key,)
+        ) as cursor:
+            row = await cursor.fetchone()
+        return orjson.loads(row[0]) if row else None
+
+    async def save_plan_result(self, key: str, entry: dict):
+        await self.db.execute(
+            "INSERT OR REPLACE INTO plan_result (key, blob) VALUES (?, ?)",
+            (key, orjson.dumps(entry))
+        )
+        await self.db.commit()
+
+    async def count(self) -> int:
+        async with self.db.execute("SELECT COUNT(*) FROM precheck") as cursor:
+            row = await cursor.fetchone()
+        return row[0]
+
+store = PrecheckStore(PRECHECK_DB)
+
+# Queues of connected /events WebSockets, keyed by precheck id
+progress_listeners: Dict[str, set] = {}
+
+# Statuses after which a precheck no longer changes on its own
+FINAL_STATUSES = {'completed', 'failed'}
+
+def status_snapshot(precheck: dict) -> dict:
+    """The status fields the frontend shows while a pre-check runs"""
+    return {
+        "success": True,
+        "status": precheck['status'],
+        "results": precheck.get('results') or {},
+        "processing_step": precheck.get('processing_step'),
+        "progress": precheck.get('progress', 0)
+    }
+
+async def get_precheck(precheck_id: str) -> Optional[dict]:
+    """Get precheck from the store"""
+    return await store.get(precheck_id)
+
+async def update_precheck(precheck: dict, **changes):
+    """Apply changes to a precheck, persist it and push it to listeners"""
+    precheck.update(changes)
+    await store.save(precheck)
+
+    listeners = progress_listeners.get(precheck['id'])
+    if listeners:
+        snapshot = status_snapshot(precheck)
+        for queue in listeners:
+            queue.put_nowait(snapshot)
+
+def copy_upload(src, file_path: Path) -> Optional[str]:
+    """
+    Copy an upload's spooled file to file_path, hashing it on the way.
+    Returns the sha256 hex, or None (and writes nothing) if it isn't a PDF
+    """
+    src.seek(0)
+    chunk = src.read(UPLOAD_CHUNK_SIZE)
+    if not chunk.startswith(PDF_MAGIC):
+        return None
+
+    digest = hashlib.sha256()
+    with open(file_path, "wb") as buffer:
+        while chunk:
+            digest.update(chunk)
+            buffer.write(chunk)
+            chunk = src.read(UPLOAD_CHUNK_SIZE)
+
+    return digest.hexdigest()
+
+async def save_upload(upload_dir: Path, file_key: str, file: UploadFile) -> tuple:
+    """Save an uploaded file to disk and return (file_key, saved path, sha256 hex)"""
+    file_path = upload_dir / f"{file_key}_{file.filename}"
+
+    # The whole copy runs in one worker thread instead of hopping back to
+    # the event loop for every chunk
+    sha256 = await asyncio.to_thread(copy_upload, file.file, file_path)
+
+    # Reject non-PDF content up front rather than after the pipeline fails on it
+    if sha256 is None:
+        raise HTTPException(
+            status_code=400,
+            detail=f"{file_key}: File is not a valid PDF"
+        )
+
+    return file_key, str(file_path), sha256
+
+@functools.lru_cache(maxsize=256)
+def _load_json(path: str, mtime_ns: int):
+    """Parse a JSON file; cached per (path, mtime) so unchanged files parse once"""
+    return orjson.loads(Path(path).read_bytes())
+
+def load_json_cached(path) -> dict:
+    """Load a report JSON file, reusing the parsed result until the file changes.
+    Callers must treat the returned data as read-only."""
+    return _load_json(str(path), Path(path).stat().st_mtime_ns)
+
+@functools.lru_cache(maxsize=64)
+def _load_json_fragment(path: str, mtime_ns: int) -> orjson.Fragment:
+    """Raw JSON file bytes wrapped for embedding; cached per (path, mtime)"""
+    return orjson.Fragment(Path(path).read_bytes())
+
+def load_json_fragment(path) -> orjson.Fragment:
+    """Load a report JSON file for passing straight through to a response,
+    without parsing it and serializing it again"""
+    return _load_json_fragment(str(path), Path(path).stat().st_mtime_ns)
+
+# Filename suffixes of the files a pipeline run leaves in a report directory
+REPORT_FILE_SUFFIXES = {
+    'compliance': '_compliance.json',
+    'enriched': 'enriched.json',
+    'components': '_components.json',
+    'pdf': '.pdf'
+}
+
+def find_report_files(report_dir: Path, file_type: str) -> dict:
+    """
+    Find the first <file_type>_*<suffix> file of each kind in report_dir
+    with one os.scandir pass (instead of one glob per kind)
+    """
+    prefix = f"{file_type}_"
+    found = dict.fromkeys(REPORT_FILE_SUFFIXES)
+
+    with os.scandir(report_dir) as entries:
+        for entry in entries:
+            name = entry.name
+            if not name.startswith(prefix):
+                continue
+            for kind, suffix in REPORT_FILE_SUFFIXES.items():
+                if (found[kind] is None and name.endswith(suffix)
+                        and len(name) >= len(prefix) + len(suffix)):
+                    found[kind] = entry.path
+
+    return found
+
+async def load_report_source(name: str, path: str) -> tuple:
+    """Load one report JSON off the event loop; (name, fragment or None)"""
     try:
-        cmd = [
-            PYTHON_CMD if Path(PYTHON_CMD).exists() else 'python3',
-            str(COMPLICHECK_SCRIPT),
-            pdf_path,
-            '--output-dir', output_dir,
-            '--enable-enrichment',
-            '--keep-intermediates'
-        ]
+        return name, await asyncio.to_thread(load_json_fragment, path)
+    except FileNotFoundError:
+        return name, None
+    except Exception as e:
+        print(f"Error loading {name} JSON: {e}")
+        return name, None
+
+def collect_results(pdf_path: str, output_dir: str) -> dict:
+    """Locate the files a successful pipeline run produced and summarise them"""
+    # Find generated files - check multiple patterns
+    output_path = Path(output_dir)
+
+    # Site and building plans share output_dir (and may run at the
+    # same time), so only match files generated from this PDF
+    prefix = glob.escape(Path(pdf_path).stem)
+
+    # Only the first match of each pattern is used, so stop scanning there
 
-        # Bedrock KB mode is controlled by USE_BEDROCK_KB environment variable
+    # Look for report PDFs
+    pdf_file = next(output_path.glob(f'{prefix}*CompliCheck_Report.pdf'), None) or \
+               next(output_path.glob(f'{prefix}*_report.pdf'), None)
 
-        # Run subprocess
+    # Look for compliance JSON files
+    compliance_file = next(output_path.glob(f'{prefix}*compliance.json'), None)
+
+    # Look for enriched JSON files
+    enriched_file = next(output_path.glob(f'{prefix}*enriched.json'), None)
+
+    # Look for component files (fallback if compliance not run)
+    component_file = next(output_path.glob(f'{prefix}*components.json'), None)
+
+    result = {
+        'status': 'completed',
+        'pdf_report': str(pdf_file) if pdf_file else None,
+        'compliance_json': str(compliance_file) if compliance_file else None,
+        'enriched_json': str(enriched_file) if enriched_file else None,
+        'components_json': str(component_file) if component_file else None
+    }
+
+    # Parse compliance results
+    if compliance_file:
+        compliance_data = load_json_cached(compliance_file)
+        result['summary'] = compliance_data.get('summary', {})
+
+        # Parse enrichment data for quality score
+        if enriched_file:
+            enriched_data = load_json_cached(enriched_file)
+            llm_enrichment = enriched_data.get('llm_enrichment', {})
+            reconciliation = llm_enrichment.get('reconciliation', {})
+            result['quality_score'] = reconciliation.get('quality_score', None)
+            result['confidence_level'] = reconciliation.get('confidence_level', None)
+
+    # If no compliance files, still return review status since we have extracted data
+    if not compliance_file and (enriched_file or component_file):
+        result['status'] = 'review'  # Needs manual review
+
+    return result
+
+def read_log_tail(log_path: Path, max_bytes: int = 16384) -> str:
+    """Return the last max_bytes of a log file (empty if missing)"""
+    try:
+        with open(log_path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            f.seek(max(0, f.tell() - max_bytes))
+            return f.read().decode('utf-8', errors='replace')
+    except OSError:
+        return ''
+
+async def run_pipeline_subprocess(pdf_path: str, output_dir: str) -> Optional[dict]:
+    """Run compliCheckV2.py as a child process; returns an error result or None on success"""
+    cmd = [
+        PYTHON_CMD if Path(PYTHON_CMD).exists() else 'python3',
+        str(COMPLICHECK_SCRIPT),
+        pdf_path,
+        '--output-dir', output_dir,
+        '--enable-enrichment',
+        '--keep-intermediates'
+    ]
+
+    # Bedrock KB mode is controlled by USE_BEDROCK_KB environment variable
+
+    # Send the child's output straight to per-plan log files rather than
+    # buffering minutes of pipeline output in pipes
+    log_prefix = Path(output_dir) / Path(pdf_path).stem
+    stdout_log = log_prefix.with_name(log_prefix.name + '_stdout.log')
+    stderr_log = log_prefix.with_name(log_prefix.name + '_stderr.log')
+
+    # Run subprocess in its own session/process group so a timeout can take
+    # down the extract/check/report children it spawns along with it
+    with open(stdout_log, 'wb') as stdout, open(stderr_log, 'wb') as stderr:
         process = await asyncio.create_subprocess_exec(
             *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
+            stdout=stdout,
+            stderr=stderr,
+            start_new_session=True
         )
 
+    try:
+        await asyncio.wait_for(process.wait(), timeout=COMPLICHECK_TIMEOUT)
+    except asyncio.TimeoutError:
         try:
-            stdout, stderr = await asyncio.wait_for(
-                process.communicate(),
-                timeout=300.0  # 5 minutes
-            )
-        except asyncio.TimeoutError:
-            process.kill()
-            return {
-                'status': 'timeout',
-                'error': 'Processing took too long (>5 minutes)'
-            }
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        await process.wait()
+        return {
+            'status': 'timeout',
+            'error': 'Processing took too long (>5 minutes)'
+        }
+
+    if process.returncode != 0:
+        return {
+            'status': 'failed',
+            'error': read_log_tail(stderr_log) or 'Unknown error'
+        }
+
+    return None
+
+async def run_pipeline_in_process(
+    pdf_path: str,
+    output_dir: str,
+    executor: Optional[ProcessPoolExecutor] = None,
+    cancel_manager=None
+) -> Optional[dict]:
+    """
+    Run the imported pipeline on an executor (the default thread pool, or
+    the warm worker pool); returns an error result or None on success.
+
+    A thread or pool worker can't be killed, so on timeout the run is told
+    to stop between steps and this waits for it to do so; the caller's
+    COMPLICHECK_SEM slot stays held until the work has actually finished.
+    """
+    loop = asyncio.get_running_loop()
+    cancel = cancel_manager.Event() if cancel_manager else threading.Event()
+    call = functools.partial(
+        run_pipeline,
+        pdf_path,
+        output_dir,
+        enable_enrichment=True,
+        keep_intermediates=True,
+        cancel=cancel
+    )
 
-        if process.returncode == 0:
-            # Find generated files - check multiple patterns
-            output_path = Path(output_dir)
+    future = loop.run_in_executor(executor, call)
+    try:
+        success = await asyncio.wait_for(asyncio.shield(future), timeout=COMPLICHECK_TIMEOUT)
+    except asyncio.TimeoutError:
+        cancel.set()
+        try:
+            await future
+        except Exception:
+            pass
+        return {
+            'status': 'timeout',
+            'error': 'Processing took too long (>5 minutes)'
+        }
 
-            # Look for report PDFs
-            pdf_files = list(output_path.glob('*CompliCheck_Report.pdf')) or \
-                       list(output_path.glob('*_report.pdf'))
+    if not success:
+        return {
+            'status': 'failed',
+            'error': 'CompliCheck pipeline failed (see server log for details)'
+        }
 
-            # Look for compliance JSON files
-            compliance_files = list(output_path.glob('*compliance.json'))
+    return None
 
-            # Look for enriched JSON files
-            enriched_files = list(output_path.glob('*enriched.json'))
+RESULT_FILE_KEYS = ('pdf_report', 'compliance_json', 'enriched_json', 'components_json')
 
-            # Look for component files (fallback if compliance not run)
-            component_files = list(output_path.glob('*components.json'))
+async def restore_plan_result(cached: dict, pdf_path: str, output_dir: str) -> Optional[dict]:
+    """
+    Copy a previously generated result for identical PDF content into
+    output_dir, renamed after this upload. Returns None if any of the
+    cached files has since been deleted.
+    """
+    old_stem = cached['stem']
+    new_stem = Path(pdf_path).stem
+    result = dict(cached['result'])
 
-            result = {
-                'status': 'completed',
-                'pdf_report': str(pdf_files[0]) if pdf_files else None,
-                'compliance_json': str(compliance_files[0]) if compliance_files else None,
-                'enriched_json': str(enriched_files[0]) if enriched_files else None,
-                'components_json': str(component_files[0]) if component_files else None
-            }
+    for key in RESULT_FILE_KEYS:
+        source = result.get(key)
+        if not source:
+            continue
+        if not Path(source).exists():
+            return None
 
-            # Parse compliance results
-            if compliance_files:
-                with open(compliance_files[0]) as f:
-                    compliance_data = json.load(f)
-                    result['summary'] = compliance_data.get('summary', {})
-
-                    # Parse enrichment data for quality score
-                    if enriched_files:
-                        with open(enriched_files[0]) as ef:
-                            enriched_data = json.load(ef)
-                            llm_enrichment = enriched_data.get('llm_enrichment', {})
-                            reconciliation = llm_enrichment.get('reconciliation', {})
-                            result['quality_score'] = reconciliation.get('quality_score', None)
-                            result['confidence_level'] = reconciliation.get('confidence_level', None)
-
-            # If no compliance files, still return review status since we have extracted data
-            if not compliance_files and (enriched_files or component_files):
-                result['status'] = 'review'  # Needs manual review
+        destination = Path(output_dir) / (new_stem + Path(source).name[len(old_stem):])
+        await asyncio.to_thread(shutil.copy2, source, destination)
+        result[key] = str(destination)
 
-            return result
-        else:
-            return {
-                'status': 'failed',
-                'error': stderr.decode('utf-8') if stderr else 'Unknown error'
-            }
+    return result
+
+async def run_complicheck(
+    pdf_path: str,
+    output_dir: str,
+    precheck_id: str,
+    file_type: str,
+    file_hash: Optional[str] = None
+) -> dict:
+    """Run CompliCheck pipeline asynchronously"""
+    # Re-uploads of the same PDF reuse the earlier result instead of
+    # re-running extraction; the key also covers the compliance backend
+    cache_key = None
+    if file_hash:
+        cache_key = f"{file_hash}:{'bedrock' if bedrock_kb_enabled() else 'neo4j'}"
+
+    try:
+        if cache_key:
+            cached = await store.get_plan_result(cache_key)
+            if cached:
+                restored = await restore_plan_result(cached, pdf_path, output_dir)
+                if restored:
+                    return restored
+
+        async with COMPLICHECK_SEM:
+            if COMPLICHECK_MODE == 'subprocess':
+                failure = await run_pipeline_subprocess(pdf_path, output_dir)
+            else:
+                failure = await run_pipeline_in_process(
+                    pdf_path,
+                    output_dir,
+                    executor=app.state.worker_pool,
+                    cancel_manager=app.state.cancel_manager
+                )
+
+        if failure:
+            return failure
+
+        result = collect_results(pdf_path, output_dir)
+        if cache_key and result['status'] in ('completed', 'review'):
+            await store.save_plan_result(cache_key, {
+                'stem': Path(pdf_path).stem,
+                'result': result
+            })
+
+        return result
 
     except Exception as e:
         return {
@@ -265,16 +663,16 @@ async def validate_access_key(request: AccessKeyRequest):
 @app.post("/api/precheck/create", response_model=PreCheckResponse)
 async def create_precheck():
     """Create a new pre-check session"""
-    precheck_id = str(uuid.uuid4())
+    precheck_id = secrets.token_hex(16)
 
-    prechecks[precheck_id] = {
+    await store.save({
         'id': precheck_id,
         'created_at': datetime.now().isoformat(),
         'status': 'created',
         'basic_info': {},
         'files': {},
         'results': {}
-    }
+    })
 
     return PreCheckResponse(
         success=True,
@@ -285,15 +683,15 @@ async def create_precheck():
 @app.post("/api/precheck/{precheck_id}/basic-info")
 async def save_basic_info(precheck_id: str, request: BasicInfoRequest):
     """Save basic information"""
-    precheck = get_precheck(precheck_id)
+    precheck = await get_precheck(precheck_id)
     if not precheck:
         raise HTTPException(status_code=404, detail="Pre-check not found")
 
-    precheck['basic_info'] = {
+    await update_precheck(precheck, basic_info={
         'project_description': request.project_description,
         'address': request.address,
         'consent_type': request.consent_type
-    }
+    })
 
     return {"success": True, "message": "Basic info saved"}
 
@@ -307,7 +705,7 @@ async def upload_files(
     agent_consent: Optional[UploadFile] = File(None)
 ):
     """Upload documents"""
-    precheck = get_precheck(precheck_id)
+    precheck = await get_precheck(precheck_id)
     if not precheck:
         raise HTTPException(status_code=404, detail="Pre-check not found")
 
@@ -315,8 +713,6 @@ async def upload_files(
     upload_dir = UPLOAD_FOLDER / precheck_id
     upload_dir.mkdir(exist_ok=True)
 
-    uploaded_files = {}
-
     # Process each file
     files_map = {
         'site_plan': site_plan,
@@ -326,26 +722,35 @@ async def upload_files(
         'agent_consent': agent_consent
     }
 
-    for file_key, file in files_map.items():
-        if file and file.filename:
-            # Check file extension
-            if not file.filename.lower().endswith('.pdf'):
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"{file_key}: Only PDF files are allowed"
-                )
+    uploads = {
+        file_key: file for file_key, file in files_map.items()
+        if file and file.filename
+    }
 
-            # Save file
-            file_path = upload_dir / f"{file_key}_{file.filename}"
-            with open(file_path, "wb") as buffer:
-                content = await file.read()
-                buffer.write(content)
+    # Cheap extension check before reading anything; contents are checked
+    # for the PDF header as they are saved
+    for file_key, file in uploads.items():
+        if not file.filename.lower().endswith('.pdf'):
+            raise HTTPException(
+                status_code=400,
+                detail=f"{file_key}: Only PDF files are allowed"
+            )
 
-            uploaded_files[file_key] = str(file_path)
+    # Save all files concurrently
+    saved = await asyncio.gather(*[
+        save_upload(upload_dir, file_key, file)
+        for file_key, file in uploads.items()
+    ])
+    uploaded_files = {file_key: path for file_key, path, _ in saved}
+    file_hashes = {file_key: sha256 for file_key, _, sha256 in saved}
 
     # Update precheck
-    precheck['files'] = uploaded_files
-    precheck['status'] = 'files_uploaded'
+    await update_precheck(
+        precheck,
+        files=uploaded_files,
+        file_hashes=file_hashes,
+        status='files_uploaded'
+    )
 
     return {
         "success": True,
@@ -356,7 +761,7 @@ async def upload_files(
 @app.post("/api/precheck/{precheck_id}/process")
 async def process_precheck(precheck_id: str, background_tasks: BackgroundTasks):
     """Start compliance checking (async background task)"""
-    precheck = get_precheck(precheck_id)
+    precheck = await get_precheck(precheck_id)
     if not precheck:
         raise HTTPException(status_code=404, detail="Pre-check not found")
 
@@ -368,9 +773,12 @@ async def process_precheck(precheck_id: str, background_tasks: BackgroundTasks):
         )
 
     # Update status
-    precheck['status'] = 'processing'
-    precheck['processing_step'] = 'Preparing documents for analysis...'
-    precheck['progress'] = 10
+    await update_precheck(
+        precheck,
+        status='processing',
+        processing_step='Preparing documents for analysis...',
+        progress=10
+    )
 
     # Create output directory
     output_dir = REPORTS_FOLDER / precheck_id
@@ -380,48 +788,65 @@ async def process_precheck(precheck_id: str, background_tasks: BackgroundTasks):
     async def process_files():
         results = {}
 
-        try:
-            # Process site plan
-            precheck['processing_step'] = 'Extracting components from site plan...'
-            precheck['progress'] = 25
+        # Site plan is required; building plan is optional
+        plan_types = [
+            file_type for file_type in ('site_plan', 'building_plan')
+            if files.get(file_type)
+        ]
+        labels = {'site_plan': 'Site plan', 'building_plan': 'Building plan'}
 
-            site_plan_result = await run_complicheck(
-                files['site_plan'],
+        async def process_plan(file_type: str) -> dict:
+            """Run one plan and report its completion as soon as it finishes"""
+            result = await run_complicheck(
+                files[file_type],
                 str(output_dir),
                 precheck_id,
-                'site_plan'
+                file_type,
+                file_hash=precheck.get('file_hashes', {}).get(file_type)
             )
-            results['site_plan'] = site_plan_result
+            results[file_type] = result
 
-            precheck['processing_step'] = 'Site plan analysis completed'
-            precheck['progress'] = 50
-
-            # Process building plan if uploaded
-            if files.get('building_plan'):
-                precheck['processing_step'] = 'Extracting components from building plan...'
-                precheck['progress'] = 60
+            await update_precheck(
+                precheck,
+                processing_step=f'{labels[file_type]} analysis completed',
+                progress=25 + 65 * len(results) // len(plan_types)
+            )
+            return result
 
-                building_plan_result = await run_complicheck(
-                    files['building_plan'],
-                    str(output_dir),
-                    precheck_id,
-                    'building_plan'
-                )
-                results['building_plan'] = building_plan_result
+        try:
+            # Site and building plans are independent, so run them side by side
+            await update_precheck(
+                precheck,
+                processing_step='Extracting components from ' + ' and '.join(
+                    labels[file_type].lower() for file_type in plan_types
+                ) + '...',
+                progress=25
+            )
 
-                precheck['processing_step'] = 'Building plan analysis completed'
-                precheck['progress'] = 90
+            outcomes = await asyncio.gather(
+                *[process_plan(file_type) for file_type in plan_types],
+                return_exceptions=True
+            )
+            for file_type, outcome in zip(plan_types, outcomes):
+                if isinstance(outcome, Exception):
+                    results[file_type] = {'status': 'error', 'error': str(outcome)}
 
             # Update precheck with results
-            precheck['results'] = results
-            precheck['status'] = 'completed'
-            precheck['processing_step'] = 'Complete'
-            precheck['progress'] = 100
+            await update_precheck(
+                precheck,
+                results=results,
+                status='completed',
+                processing_step='Complete',
+                progress=100
+            )
 
         except Exception as e:
-            precheck['status'] = 'failed'
-            precheck['processing_step'] = f'Error: {str(e)}'
-            precheck['progress'] = 0
+            await update_precheck(
+                precheck,
+                status='failed',
+                processing_step=f'Error: {str(e)}',
+                progress=0
+            )
 
     # Add to background tasks
     background_tasks.add_task(process_files)
@@ -432,25 +857,81 @@ async def process_precheck(precheck_id: str, background_tasks: BackgroundTasks):
         "status": "processing"
     }
 
-@app.get("/api/precheck/{precheck_id}/status", response_model=StatusResponse)
-async def get_status(precheck_id: str):
-    """Get pre-check status (for polling)"""
-    precheck = get_precheck(precheck_id)
+@app.get("/api/precheck/{precheck_id}/status")
+async def get_status(precheck_id: str, request: Request):
+    """
+    Get pre-check status (for polling)
+
+    Hit every 1-2 s per open tab, so the body is built directly instead of
+    through a Pydantic response model, and an unchanged status answers the
+    client's If-None-Match with an empty 304.
+    """
+    precheck = await get_precheck(precheck_id)
     if not precheck:
         raise HTTPException(status_code=404, detail="Pre-check not found")
 
-    return StatusResponse(
-        success=True,
-        status=precheck['status'],
-        results=precheck.get('results', {}),
-        processing_step=precheck.get('processing_step'),
-        progress=precheck.get('progress', 0)
-    )
+    body = orjson.dumps(status_snapshot(precheck))
+    etag = f'"{hashlib.sha1(body).hexdigest()}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+
+    return Response(content=body, media_type="application/json", headers=headers)
+
+@app.websocket("/api/precheck/{precheck_id}/events")
+async def precheck_events(websocket: WebSocket, precheck_id: str):
+    """
+    Push status changes to the frontend instead of having it poll /status
+
+    Sends the current status on connect, then one message per change until
+    the pre-check completes or fails. Changes made by this worker arrive
+    through update_precheck; the store is re-read every
+    PROGRESS_EVENTS_RECHECK seconds to pick up jobs running in another
+    worker and to notice closed connections.
+    """
+    precheck = await get_precheck(precheck_id)
+    if not precheck:
+        await websocket.close(code=4404)
+        return
+
+    await websocket.accept()
+    queue = asyncio.Queue()
+    progress_listeners.setdefault(precheck_id, set()).add(queue)
+
+    try:
+        last = status_snapshot(precheck)
+        await websocket.send_text(orjson.dumps(last).decode())
+
+        while last['status'] not in FINAL_STATUSES:
+            try:
+                snapshot = await asyncio.wait_for(
+                    queue.get(), timeout=PROGRESS_EVENTS_RECHECK
+                )
+            except asyncio.TimeoutError:
+                precheck = await get_precheck(precheck_id)
+                if not precheck:
+                    break
+                snapshot = status_snapshot(precheck)
+
+            # Re-sent even when unchanged after a recheck, as a keepalive
+            await websocket.send_text(orjson.dumps(snapshot).decode())
+            last = snapshot
+
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        listeners = progress_listeners.get(precheck_id)
+        if listeners is not None:
+            listeners.discard(queue)
+            if not listeners:
+                del progress_listeners[precheck_id]
 
 @app.get("/api/precheck/{precheck_id}")
 async def get_precheck_data(precheck_id: str):
     """Get complete precheck data"""
-    precheck = get_precheck(precheck_id)
+    precheck = await get_precheck(precheck_id)
     if not precheck:
         raise HTTPException(status_code=404, detail="Pre-check not found")
 
@@ -465,9 +946,9 @@ async def get_report_json(precheck_id: str, file_type: str):
     if file_type not in ['site_plan', 'building_plan']:
         raise HTTPException(status_code=400, detail="Invalid file type")
 
-    precheck = get_precheck(precheck_id)
+    precheck = await get_precheck(precheck_id)
 
-    # If precheck exists in memory, use its registered file paths
+    # If precheck exists in the store, use its registered file paths
     if precheck:
         results = precheck.get('results', {})
         result = results.get(file_type, {})
@@ -484,44 +965,30 @@ async def get_report_json(precheck_id: str, file_type: str):
         if not report_dir.exists():
             raise HTTPException(status_code=404, detail="Pre-check not found")
 
-        # Find files by pattern
-        file_prefix = f"{file_type}_*"
-        compliance_files = list(report_dir.glob(f"{file_prefix}_compliance.json"))
-        enriched_files = list(report_dir.glob(f"{file_prefix}enriched.json"))
-        components_files = list(report_dir.glob(f"{file_prefix}_components.json"))
-        pdf_files = list(report_dir.glob(f"{file_prefix}*.pdf"))
-
-        compliance_json_path = str(compliance_files[0]) if compliance_files else None
-        enriched_json_path = str(enriched_files[0]) if enriched_files else None
-        components_json_path = str(components_files[0]) if components_files else None
-        pdf_report_path = str(pdf_files[0]) if pdf_files else None
+        # Find files by name in a single directory scan
+        found = find_report_files(report_dir, file_type)
+        compliance_json_path = found['compliance']
+        enriched_json_path = found['enriched']
+        components_json_path = found['components']
+        pdf_report_path = found['pdf']
         report_status = 'completed' if compliance_json_path else 'review'
 
     report_data = {}
 
-    # Try to load compliance JSON
-    if compliance_json_path and Path(compliance_json_path).exists():
-        try:
-            with open(compliance_json_path, 'r') as f:
-                report_data['compliance'] = json.load(f)
-        except Exception as e:
-            print(f"Error loading compliance JSON: {e}")
-
-    # Try to load enriched JSON
-    if enriched_json_path and Path(enriched_json_path).exists():
-        try:
-            with open(enriched_json_path, 'r') as f:
-                report_data['enriched'] = json.load(f)
-        except Exception as e:
-            print(f"Error loading enriched JSON: {e}")
-
-    # Try to load components JSON as fallback
-    if components_json_path and Path(components_json_path).exists():
-        try:
-            with open(components_json_path, 'r') as f:
-                report_data['components'] = json.load(f)
-        except Exception as e:
-            print(f"Error loading components JSON: {e}")
+    # Load compliance, enriched and components (fallback) JSON concurrently
+    # in worker threads so large reads don't block the event loop
+    report_sources = {
+        'compliance': compliance_json_path,
+        'enriched': enriched_json_path,
+        'components': components_json_path
+    }
+    loaded = await asyncio.gather(*[
+        load_report_source(name, path)
+        for name, path in report_sources.items() if path
+    ])
+    for name, fragment in loaded:
+        if fragment is not None:
+            report_data[name] = fragment
 
     if not report_data:
         raise HTTPException(status_code=404, detail="Report data not found")
@@ -568,18 +1035,20 @@ async def get_report_json(precheck_id: str, file_type: str):
                 'licensed_practitioners': basic_info.get('licensed_practitioners', [])
             }
 
-    return {
+    # Returned as an ORJSONResponse directly so the raw report fragments are
+    # written out as-is rather than walked by FastAPI's jsonable_encoder
+    return ORJSONResponse({
         "success": True,
         "file_type": file_type,
         "report": report_data,
         "has_pdf": pdf_report_path is not None and Path(pdf_report_path).exists(),
         "status": report_status
-    }
+    })
 
 @app.get("/api/precheck/{precheck_id}/download/{file_type}")
 async def download_report(precheck_id: str, file_type: str):
     """Download compliance report PDF"""
-    precheck = get_precheck(precheck_id)
+    precheck = await get_precheck(precheck_id)
     if not precheck:
         raise HTTPException(status_code=404, detail="Pre-check not found")
 
@@ -594,16 +1063,31 @@ async def download_report(precheck_id: str, file_type: str):
     if not report_path or not Path(report_path).exists():
         raise HTTPException(status_code=404, detail="Report not found")
 
+    filename = f"{file_type}_compliance_report.pdf"
+
+    # Behind nginx: hand the file off with X-Accel-Redirect
+    report_file = Path(report_path).resolve()
+    if REPORTS_ACCEL_REDIRECT_PREFIX and report_file.is_relative_to(REPORTS_FOLDER):
+        internal_path = report_file.relative_to(REPORTS_FOLDER).as_posix()
+        return Response(
+            status_code=200,
+            media_type='application/pdf',
+            headers={
+                'X-Accel-Redirect': f"{REPORTS_ACCEL_REDIRECT_PREFIX.rstrip('/')}/{internal_path}",
+                'Content-Disposition': f'attachment; filename="{filename}"'
+            }
+        )
+
     return FileResponse(
         report_path,
         media_type='application/pdf',
-        filename=f"{file_type}_compliance_report.pdf"
+        filename=filename
     )
 
 @app.delete("/api/precheck/{precheck_id}")
 async def delete_precheck(precheck_id: str):
     """Delete pre-check and cleanup files"""
-    precheck = get_precheck(precheck_id)
+    precheck = await get_precheck(precheck_id)
     if not precheck:
         raise HTTPException(status_code=404, detail="Pre-check not found")
 
@@ -616,8 +1100,8 @@ async def delete_precheck(precheck_id: str):
     if output_dir.exists():
         shutil.rmtree(output_dir)
 
-    # Remove from memory
-    del prechecks[precheck_id]
+    # Remove from the store
+    await store.delete(precheck_id)
 
     return {"success": True, "message": "Pre-check deleted"}
 
@@ -631,7 +1115,7 @@ async def health_check():
     return {
         "status": "healthy",
         "timestamp": datetime.now().isoformat(),
-        "active_prechecks": len(prechecks)
+        "active_prechecks": await store.count()
     }
 
 # ============================================================================
@@ -640,10 +1124,15 @@ async def health_check():
 
 if __name__ == "__main__":
     import uvicorn
+
+    # State is in SQLite, so several workers can serve requests in parallel;
+    # auto-reload only works with a single worker
+    workers = int(os.getenv('WEB_CONCURRENCY', '1'))
     uvicorn.run(
         "main:app",
         host="0.0.0.0",
         port=8000,
-        reload=True,
+        reload=workers == 1,
+        workers=workers,
         log_level="info"
     )
@@ -15,6 +15,8 @@ Options:
     --enable-enrichment    Enable LLM enrichment layer (requires ANTHROPIC_API_KEY)
     --skip-enrichment      Skip enrichment and use standard processing
     --enrichment-ops       Specify enrichment operations: infer_metadata, categorize, label, reconcile, all
+    --force-enrichment     Enrich even simple single-sheet plans (skipped by default, see config.py)
+    --batch-mode           Run enrichment through the Anthropic Message Batches API (50% cheaper, slower)
     --use-bedrock-kb       Use AWS Bedrock Knowledge Base for compliance checking (overrides USE_BEDROCK_KB env var)
     --kb-id                Bedrock Knowledge Base ID (overrides BEDROCK_KB_ID env var)
     --output-dir           Directory for output files (default: reports/)
@@ -28,6 +30,7 @@ Environment Variables:
 
 Features:
     - Automatic fallback if enrichment fails
+    - Enrichment skipped for simple single-sheet plans
     - Quality score indicators in reports
     - Enhanced plan type detection
     - Critical component prioritization
@@ -36,12 +39,22 @@ Features:
 
 import os
 import sys
-import subprocess
 import argparse
+import atexit
+import importlib.util
+import logging
+import logging.handlers
+import queue
+import threading
 from pathlib import Path
 from datetime import datetime
 import json
 
+try:
+    import orjson
+except ImportError:
+    orjson = None  # falls back to the stdlib json module
+
 # Load environment variables from .env
 try:
     from dotenv import load_dotenv
@@ -49,6 +62,9 @@ try:
 except ImportError:
     pass  # dotenv not required if env vars already set
 
+# Imported after .env is loaded so its settings see those variables
+from config import EnrichmentConfig, LoggingConfig
+
 # Colors for terminal output
 class Color:
     HEADER = '\033[95m'
@@ -61,39 +77,71 @@ class Color:
     BOLD = '\033[1m'
     UNDERLINE = '\033[4m'
 
+def use_color() -> bool:
+    """ANSI colors only on an interactive terminal, unless NO_COLOR is set or config.py disables them."""
+    return LoggingConfig.COLORIZE_OUTPUT and "NO_COLOR" not in os.environ and sys.stdout.isatty()
+
+# Plain output when captured to a log file or aggregator
+if not use_color():
+    for _name in [attr for attr in vars(Color) if attr.isupper()]:
+        setattr(Color, _name, '')
+
+# Pipeline progress and failures (with tracebacks) are also logged through
+# this logger; setup_logging() sends it to LoggingConfig.LOG_FILE
+logger = logging.getLogger("complicheck")
+logger.addHandler(logging.NullHandler())  # no stderr fallback; messages are printed already
+_log_listener = None
+_log_listener_lock = threading.Lock()
+
+def setup_logging():
+    """
+    Log to a rotating file when LoggingConfig.LOG_TO_FILE (or
+    COMPLICHECK_LOG_FILE) is set. Records go through a queue to a single
+    listener thread, so pipeline worker threads never block on file I/O.
+    Safe to call more than once.
+    """
+    global _log_listener
+    log_file = os.getenv("COMPLICHECK_LOG_FILE") or (LoggingConfig.LOG_TO_FILE and LoggingConfig.LOG_FILE)
+    if not log_file:
+        return
+    with _log_listener_lock:
+        if _log_listener is not None:
+            return
+        log_path = Path(log_file)
+        if not log_path.is_absolute():
+            log_path = SCRIPT_DIR / log_path
+        log_path.parent.mkdir(parents=True, exist_ok=True)
+
+        file_handler = logging.handlers.RotatingFileHandler(log_path, maxBytes=10_000_000, backupCount=3)
+        file_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s [%(threadName)s] %(message)s"))
+        log_queue = queue.SimpleQueue()
+        logger.addHandler(logging.handlers.QueueHandler(log_queue))
+        logger.setLevel(LoggingConfig.LOG_LEVEL)
+        _log_listener = logging.handlers.QueueListener(log_queue, file_handler)
+        _log_listener.start()
+        atexit.register(_log_listener.stop)
+
 def print_header(text):
-    print(f"\n{Color.HEADER}{Color.BOLD}{'='*70}{Color.ENDC}")
-    print(f"{Color.HEADER}{Color.BOLD}{text:^70}{Color.ENDC}")
-    print(f"{Color.HEADER}{Color.BOLD}{'='*70}{Color.ENDC}\n")
+    logger.info(text)
+    rule = f"{Color.HEADER}{Color.BOLD}{'='*70}{Color.ENDC}"
+    print(f"\n{rule}\n{Color.HEADER}{Color.BOLD}{text:^70}{Color.ENDC}\n{rule}\n")
 
 def print_step(step_num, text):
+    logger.info(f"[Step {step_num}] {text}")
     print(f"{Color.OKBLUE}{Color.BOLD}[Step {step_num}]{Color.ENDC} {text}")
 
 def print_success(text):
+    logger.info(text)
     print(f"{Color.OKGREEN}✓ {text}{Color.ENDC}")
 
 def print_warning(text):
+    logger.warning(text)
     print(f"{Color.WARNING}⚠ {text}{Color.ENDC}")
 
 def print_error(text):
+    logger.error(text)
     print(f"{Color.FAIL}✗ {text}{Color.ENDC}")
 
-def run_command(cmd, description, capture_output=False):
-    """Run a shell command and return success status."""
-    print(f"  {Color.OKCYAN}Running:{Color.ENDC} {description}")
-    try:
-        if capture_output:
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-            return True, result.stdout
-        else:
-            result = subprocess.run(cmd, check=True)
-            return True, None
-    except subprocess.CalledProcessError as e:
-        print_error(f"Command failed: {e}")
-        if capture_output and e.stderr:
-            print(f"  Error: {e.stderr}")
-        return False, None
-
 # Script paths
 SCRIPT_DIR = Path(__file__).parent.resolve()
 EXTRACT_SCRIPT = SCRIPT_DIR / "scripts" / "extract_compliance_components.py"
@@ -101,22 +149,101 @@ ENRICHMENT_SCRIPT = SCRIPT_DIR / "scripts" / "llm_enrichment_layer.py"
 CHECK_SCRIPT = SCRIPT_DIR / "scripts" / "check_component_compliance.py"
 CHECK_SCRIPT_BEDROCK = SCRIPT_DIR / "scripts" / "check_component_compliance_bedrock.py"
 REPORT_SCRIPT = SCRIPT_DIR / "scripts" / "generate_enhanced_compliance_report.py"
-
-# Find Python executable
-VENV_PYTHON = SCRIPT_DIR / ".venv" / "bin" / "python3"
-PYTHON_CMD = str(VENV_PYTHON) if VENV_PYTHON.exists() else "python3"
-
-def step1_extract_components(pdf_path: Path, output_path: Path) -> bool:
-    """Extract components from PDF."""
+PIPELINE_SCRIPTS = [EXTRACT_SCRIPT, ENRICHMENT_SCRIPT, CHECK_SCRIPT, CHECK_SCRIPT_BEDROCK, REPORT_SCRIPT]
+
+# Scripts are imported once and their run(args) entry points called directly,
+# so heavy dependencies (pdfplumber, numpy, neo4j, pinecone, openai, ...) are
+# imported once per process instead of once per step
+_script_modules = {}
+_script_modules_lock = threading.Lock()
+
+def load_script(script_path: Path):
+    """
+    Import a pipeline script as a module, reusing it on later calls.
+
+    Scripts are registered under their own names with scripts/ on sys.path,
+    so worker processes they spawn (e.g. page extraction) can import them.
+    """
+    with _script_modules_lock:
+        module = _script_modules.get(script_path)
+        if module is None:
+            if str(script_path.parent) not in sys.path:
+                sys.path.insert(0, str(script_path.parent))
+            name = script_path.stem
+            spec = importlib.util.spec_from_file_location(name, script_path)
+            module = importlib.util.module_from_spec(spec)
+            # dataclasses look the module up in sys.modules while it executes
+            sys.modules[name] = module
+            try:
+                spec.loader.exec_module(module)
+            except BaseException:
+                del sys.modules[name]
+                raise
+            _script_modules[script_path] = module
+    return module
+
+def preload_scripts():
+    """Import every pipeline script up front (e.g. in a pre-forked worker)."""
+    for script_path in PIPELINE_SCRIPTS:
+        try:
+            load_script(script_path)
+        except Exception as e:
+            print_warning(f"Could not preload {script_path.name}: {e}")
+
+def call_script(script_path: Path, description: str, call):
+    """
+    Run call(module) against a pipeline script loaded in this process.
+    Returns its result, or None if the step failed.
+    """
+    print(f"  {Color.OKCYAN}Running:{Color.ENDC} {description}")
+    try:
+        return call(load_script(script_path))
+    except SystemExit as e:
+        print_error(f"{description} failed with exit code {e.code}")
+    except Exception as e:
+        logger.exception(f"{description} raised")
+        print_error(f"{description} failed: {e}")
+    return None
+
+def write_json(path: Path, data) -> None:
+    """Write an intermediate JSON file, using orjson when it is installed."""
+    if orjson is not None:
+        path.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        return
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
+
+# Each step takes and returns in-memory dicts; intermediate JSON files are only
+# written by run_complicheck when they are kept
+
+def step1_extract_components(pdf_path: Path, workers: int = None):
+    """
+    Extract components from PDF. Returns the components dict, or None.
+    workers defaults to the extraction script's EXTRACT_WORKERS.
+    """
     print_step(1, "Extracting components from PDF")
-    cmd = [PYTHON_CMD, str(EXTRACT_SCRIPT), "--pdf", str(pdf_path), "--output", str(output_path)]
-    success, _ = run_command(cmd, "Component extraction")
-    if success:
-        print_success(f"Components saved: {output_path.name}")
-    return success
+    components = call_script(EXTRACT_SCRIPT, "Component extraction",
+                             lambda m: m.extract_compliance_components(pdf_path, workers))
+    if components is not None:
+        print_success(f"Components extracted: {components.get('summary', {}).get('total_sheets', 0)} sheets")
+    return components
+
+def is_simple_plan(components: dict) -> bool:
+    """
+    Whether a plan is a single sheet with fewer than
+    EnrichmentConfig.SIMPLE_DOC_MAX_COMPONENTS components, where enrichment
+    costs more than it adds.
+    """
+    summary = components.get("summary", {})
+    total = sum(
+        value for key, value in summary.items()
+        if key.startswith("total_") and key != "total_sheets" and isinstance(value, int)
+    )
+    return len(components.get("sheets", [])) == 1 and total < EnrichmentConfig.SIMPLE_DOC_MAX_COMPONENTS
 
-def step2_enrich_components(components_path: Path, output_path: Path, operations: list) -> tuple:
-    """Enrich components with LLM analysis (optional)."""
+def step2_enrich_components(components: dict, components_path: Path, operations: list,
+                            batch_mode: bool = False) -> tuple:
+    """Enrich components with LLM analysis (optional). Returns (enriched, components)."""
     print_step(2, "Enriching components with LLM analysis")
 
     # Check for API key
@@ -126,66 +253,59 @@ def step2_enrich_components(components_path: Path, output_path: Path, operations
         print(f"  To enable enrichment, add to .env file:")
         print(f"    ANTHROPIC_API_KEY=sk-ant-...")
         print(f"  Or export: export ANTHROPIC_API_KEY=sk-ant-...")
-        return False, components_path
+        return False, components
 
     # Check if enrichment script exists
     if not ENRICHMENT_SCRIPT.exists():
         print_warning(f"Enrichment script not found: {ENRICHMENT_SCRIPT}")
-        return False, components_path
+        return False, components
 
-    cmd = [
-        PYTHON_CMD, str(ENRICHMENT_SCRIPT),
-        "--input", str(components_path),
-        "--output", str(output_path),
-        "--operations"
-    ] + operations
+    argv = ["--input", str(components_path), "--operations"] + operations
+    if batch_mode:
+        argv.append("--batch-mode")
 
-    success, _ = run_command(cmd, "LLM enrichment")
+    enriched = call_script(ENRICHMENT_SCRIPT, "LLM enrichment",
+                           lambda m: m.enrich(components, m.parse_args(argv)))
 
-    if success:
-        print_success(f"Enriched data saved: {output_path.name}")
-        return True, output_path
+    if enriched is not None:
+        print_success("Components enriched")
+        return True, enriched
     else:
         print_warning("Enrichment failed - continuing with unenriched data")
-        return False, components_path
+        return False, components
 
-def step3_check_compliance(components_path: Path, output_path: Path, use_bedrock: bool = False, kb_id: str = None) -> bool:
-    """Check compliance against rules database."""
+def step3_check_compliance(components: dict, components_path: Path, use_bedrock: bool = False,
+                           kb_id: str = None):
+    """Check compliance against rules database. Returns the compliance dict, or None."""
     print_step(3, "Checking compliance against building codes")
 
+    argv = ["--components", str(components_path)]
     if use_bedrock:
         print(f"  {Color.OKCYAN}Using AWS Bedrock Knowledge Base{Color.ENDC}")
-        cmd = [
-            PYTHON_CMD, str(CHECK_SCRIPT_BEDROCK),
-            "--components", str(components_path),
-            "--output", str(output_path)
-        ]
+        script = CHECK_SCRIPT_BEDROCK
         if kb_id:
-            cmd.extend(["--kb-id", kb_id])
+            argv.extend(["--kb-id", kb_id])
     else:
         print(f"  {Color.OKCYAN}Using Neo4j + Pinecone{Color.ENDC}")
-        cmd = [
-            PYTHON_CMD, str(CHECK_SCRIPT),
-            "--components", str(components_path),
-            "--output", str(output_path)
-        ]
+        script = CHECK_SCRIPT
 
-    success, _ = run_command(cmd, "Compliance checking")
-    if success:
-        print_success(f"Compliance results saved: {output_path.name}")
-    return success
+    compliance = call_script(script, "Compliance checking",
+                             lambda m: m.check_components(components, m.parse_args(argv)))
+    if compliance is not None:
+        print_success("Compliance checked")
+    return compliance
 
-def step4_generate_report(components_path: Path, compliance_path: Path,
-                          output_path: Path, plan_name: str) -> bool:
+def step4_generate_report(components: dict, compliance: dict, components_path: Path,
+                          compliance_path: Path, output_path: Path, plan_name: str) -> bool:
     """Generate PDF compliance report."""
     print_step(4, "Generating PDF compliance report")
-    cmd = [
-        PYTHON_CMD, str(REPORT_SCRIPT),
+    argv = [
         "--components", str(components_path),
         "--compliance", str(compliance_path),
         "--output", str(output_path)
     ]
-    success, _ = run_command(cmd, "Report generation")
+    success = call_script(REPORT_SCRIPT, "Report generation",
+                          lambda m: m.build_report(components, compliance, m.parse_args(argv))) is not None
     if success:
         print_success(f"Report generated: {output_path.name}")
     return success
@@ -197,9 +317,26 @@ def run_complicheck(
     output_dir: Path = None,
     keep_intermediates: bool = False,
     use_bedrock_kb: bool = False,
-    kb_id: str = None
+    kb_id: str = None,
+    batch_mode: bool = False,
+    force_enrichment: bool = False,
+    cancel=None,
+    extract_workers: int = None
 ) -> bool:
-    """Run the complete CompliCheck v2.0 pipeline."""
+    """
+    Run the complete CompliCheck v2.0 pipeline.
+
+    cancel is an optional threading/multiprocessing Event; once it is set
+    the pipeline stops before its next step and returns False.
+    extract_workers is the number of processes pages are extracted in.
+    """
+    setup_logging()
+
+    def cancelled() -> bool:
+        if cancel is not None and cancel.is_set():
+            print_error("Pipeline cancelled")
+            return True
+        return False
 
     mode = "Bedrock KB" if use_bedrock_kb else "Neo4j + Pinecone"
     print_header(f"CompliCheck v2.0 - Enhanced Compliance Checking ({mode})")
@@ -226,20 +363,30 @@ def run_complicheck(
     start_time = datetime.now()
 
     # === STEP 1: Extract Components ===
-    if not step1_extract_components(pdf_path, components_file):
+    components = step1_extract_components(pdf_path, extract_workers)
+    if components is None:
+        return False
+
+    if cancelled():
         return False
 
     # === STEP 2: Enrich Components (Optional) ===
     enriched = False
+    working_components = components
     working_components_file = components_file
 
-    if enable_enrichment:
+    if (enable_enrichment and not force_enrichment
+            and EnrichmentConfig.SKIP_ENRICHMENT_FOR_SIMPLE_DOCS and is_simple_plan(components)):
+        print_step(2, "Simple single-sheet plan - skipping enrichment (use --force-enrichment to run it)")
+    elif enable_enrichment:
         if enrichment_ops is None:
             enrichment_ops = ["all"]
 
-        enriched, working_components_file = step2_enrich_components(
-            components_file, enriched_file, enrichment_ops
+        enriched, working_components = step2_enrich_components(
+            components, components_file, enrichment_ops, batch_mode
         )
+        if enriched:
+            working_components_file = enriched_file
 
         if enriched:
             print_success("Using enriched data for compliance checking")
@@ -248,24 +395,33 @@ def run_complicheck(
     else:
         print_step(2, "Enrichment disabled - using standard processing")
 
+    # Steps hand their results over in memory. The JSON files are only written
+    # when they are kept: always with --keep-intermediates, and for enriched
+    # runs (whose enrichment is worth keeping)
+    persist = keep_intermediates or enriched
+    if persist:
+        write_json(components_file, components)
+        if enriched:
+            write_json(enriched_file, working_components)
+
+    if cancelled():
+        return False
+
     # === STEP 3: Check Compliance ===
-    if not step3_check_compliance(working_components_file, compliance_file, use_bedrock_kb, kb_id):
+    compliance = step3_check_compliance(working_components, working_components_file,
+                                        use_bedrock_kb, kb_id)
+    if compliance is None:
         return False
+    if persist:
+        write_json(compliance_file, compliance)
 
-    # === STEP 4: Generate Report ===
-    if not step4_generate_report(working_components_file, compliance_file,
-                                 report_file, base_name):
+    if cancelled():
         return False
 
-    # === Cleanup ===
-    if not keep_intermediates and not enriched:
-        # Only clean up non-enriched intermediate files
-        if components_file.exists():
-            components_file.unlink()
-            print(f"  Cleaned up: {components_file.name}")
-        if compliance_file.exists():
-            compliance_file.unlink()
-            print(f"  Cleaned up: {compliance_file.name}")
+    # === STEP 4: Generate Report ===
+    if not step4_generate_report(working_components, compliance, working_components_file,
+                                 compliance_file, report_file, base_name):
+        return False
 
     # === Summary ===
     elapsed = (datetime.now() - start_time).total_seconds()
@@ -285,6 +441,46 @@ def run_complicheck(
     print(f"\n{Color.OKGREEN}{Color.BOLD}✓ Success!{Color.ENDC} Open report: {report_file}\n")
     return True
 
+def bedrock_kb_enabled() -> bool:
+    """Whether USE_BEDROCK_KB selects Bedrock KB as the default compliance backend."""
+    return os.getenv('USE_BEDROCK_KB', '').lower() in ('1', 'true', 'yes')
+
+def run_pipeline(
+    pdf_path,
+    output_dir=None,
+    enable_enrichment: bool = True,
+    enrichment_ops: list = None,
+    keep_intermediates: bool = False,
+    use_bedrock_kb: bool = None,
+    kb_id: str = None,
+    batch_mode: bool = False,
+    force_enrichment: bool = False,
+    cancel=None
+) -> bool:
+    """
+    Programmatic entry point for callers that import this module
+    (e.g. the FastAPI backend) instead of spawning it as a script.
+
+    use_bedrock_kb defaults to the USE_BEDROCK_KB environment variable,
+    matching the CLI behaviour. Setting the optional cancel Event stops
+    the run between steps.
+    """
+    if use_bedrock_kb is None:
+        use_bedrock_kb = bedrock_kb_enabled()
+
+    return run_complicheck(
+        pdf_path=Path(pdf_path),
+        enable_enrichment=enable_enrichment,
+        enrichment_ops=enrichment_ops,
+        output_dir=Path(output_dir) if output_dir else None,
+        keep_intermediates=keep_intermediates,
+        use_bedrock_kb=use_bedrock_kb,
+        kb_id=kb_id,
+        batch_mode=batch_mode,
+        force_enrichment=force_enrichment,
+        cancel=cancel
+    )
+
 def main():
     parser = argparse.ArgumentParser(
         description="CompliCheck v2.0 - Enhanced AI-Powered Building Plan Compliance",
@@ -303,6 +499,9 @@ Examples:
   # Use Bedrock KB with specific KB ID
   python3 compliCheckV2.py data/plan.pdf --use-bedrock-kb --kb-id YOUR_KB_ID
 
+  # Cheaper enrichment through the Anthropic Message Batches API
+  python3 compliCheckV2.py data/plan.pdf --batch-mode
+
   # Run only specific enrichment operations
   python3 compliCheckV2.py data/plan.pdf --enrichment-ops infer_metadata categorize
 
@@ -338,6 +537,26 @@ Examples:
         help="Enrichment operations to run (default: all)"
     )
 
+    parser.add_argument(
+        "--force-enrichment",
+        action="store_true",
+        help="Enrich even simple single-sheet plans, which are otherwise skipped"
+    )
+
+    parser.add_argument(
+        "--batch-mode",
+        action="store_true",
+        help="Run enrichment through the Anthropic Message Batches API (50%% cheaper, results take minutes)"
+    )
+
+    parser.add_argument(
+        "--extract-workers",
+        type=int,
+        default=os.cpu_count(),
+        help="Processes to extract PDF pages in (default: CPU count, capped when "
+             "COMPLICHECK_CONCURRENCY runs share the machine)"
+    )
+
     parser.add_argument(
         "--output-dir",
         type=Path,
@@ -370,7 +589,7 @@ Examples:
     enable_enrichment = args.enable_enrichment and not args.skip_enrichment
 
     # Check for USE_BEDROCK_KB environment variable (can be overridden by --use-bedrock-kb flag)
-    use_bedrock_kb = args.use_bedrock_kb or os.getenv('USE_BEDROCK_KB', '').lower() in ('1', 'true', 'yes')
+    use_bedrock_kb = args.use_bedrock_kb or bedrock_kb_enabled()
 
     try:
         success = run_complicheck(
@@ -380,7 +599,10 @@ Examples:
             output_dir=args.output_dir,
             keep_intermediates=args.keep_intermediates,
             use_bedrock_kb=use_bedrock_kb,
-            kb_id=args.kb_id
+            kb_id=args.kb_id,
+            batch_mode=args.batch_mode,
+            force_enrichment=args.force_enrichment,
+            extract_workers=args.extract_workers
         )
 
         sys.exit(0 if success else 1)
@@ -10,6 +10,33 @@ Modify these settings to customize behavior without changing code.
 import os
 from pathlib import Path
 
+_UNSET = object()
+
+# Relative paths below are taken from the repository root (see repo_path)
+BASE_DIR = Path(__file__).resolve().parent
+
+def repo_path(path) -> Path:
+    """Resolve a configured path against the repository root, not the working directory."""
+    return BASE_DIR / path
+
+class EnvSetting:
+    """
+    Class attribute read from the environment on first access and cached.
+
+    Resolving lazily means values loaded from .env (load_dotenv) are honored
+    even when this module is imported before the .env file is loaded.
+    """
+
+    def __init__(self, name: str, default=None):
+        self.name = name
+        self.default = default
+        self.value = _UNSET
+
+    def __get__(self, instance, owner):
+        if self.value is _UNSET:
+            self.value = os.getenv(self.name, self.default)
+        return self.value
+
 # =============================================================================
 # Pipeline Settings
 # =============================================================================
@@ -57,7 +84,7 @@ class EnrichmentConfig:
     CACHE_EXPIRY_DAYS = 7
 
     # Rate Limiting
-    MAX_REQUESTS_PER_MINUTE = 50
+    MAX_REQUESTS_PER_MINUTE = 50  # Shared by all enrichment calls in a process; 0 disables
     RETRY_ON_RATE_LIMIT = True
     MAX_RETRIES = 3
     RETRY_DELAY_SECONDS = 5
@@ -69,6 +96,7 @@ class EnrichmentConfig:
     # Quality Thresholds
     MIN_QUALITY_SCORE = 0.5  # Warn if quality score below this
     SKIP_ENRICHMENT_FOR_SIMPLE_DOCS = True  # Skip enrichment for single-sheet site plans
+    SIMPLE_DOC_MAX_COMPONENTS = 20  # Single-sheet plans with fewer components count as simple
 
 # =============================================================================
 # Knowledge Base Settings
@@ -78,14 +106,14 @@ class KnowledgeBaseConfig:
     """Neo4j and Pinecone configuration."""
 
     # Neo4j
-    NEO4J_URI = os.getenv("NEO4J_URI", "neo4j+s://your-instance.databases.neo4j.io")
-    NEO4J_USERNAME = os.getenv("NEO4J_USERNAME", "neo4j")
-    NEO4J_PASSWORD = os.getenv("NEO4J_PASSWORD")
+    NEO4J_URI = EnvSetting("NEO4J_URI", "neo4j+s://your-instance.databases.neo4j.io")
+    NEO4J_USERNAME = EnvSetting("NEO4J_USERNAME", "neo4j")
+    NEO4J_PASSWORD = EnvSetting("NEO4J_PASSWORD")
 
     # Pinecone
-    PINECONE_API_KEY = os.getenv("PINECONE_API_KEY")
-    PINECONE_INDEX = os.getenv("PINECONE_INDEX", "planning-rules")
-    PINECONE_ENVIRONMENT = os.getenv("PINECONE_ENVIRONMENT", "us-east-1")
+    PINECONE_API_KEY = EnvSetting("PINECONE_API_KEY")
+    PINECONE_INDEX = EnvSetting("PINECONE_INDEX", "planning-rules")
+    PINECONE_ENVIRONMENT = EnvSetting("PINECONE_ENVIRONMENT", "us-east-1")
 
     # Query Settings
     DEFAULT_TOP_K = 5  # Number of rules to retrieve per component
@@ -227,24 +255,23 @@ def get_config(section: str = "pipeline"):
     }
     return configs.get(section.lower(), PipelineConfig)
 
+def ensure_dirs():
+    """Create the cache and output directories the pipeline writes to."""
+    if EnrichmentConfig.ENABLE_CACHING:
+        repo_path(EnrichmentConfig.CACHE_DIR).mkdir(parents=True, exist_ok=True)
+    repo_path(PipelineConfig.DEFAULT_OUTPUT_DIR).mkdir(parents=True, exist_ok=True)
+
 def validate_config():
-    """Validate configuration settings."""
+    """Validate configuration settings (no side effects, see ensure_dirs)."""
     errors = []
 
     # Check required API keys
-    if EnrichmentConfig.ENABLE_CACHING and not EnrichmentConfig.CACHE_DIR.exists():
-        EnrichmentConfig.CACHE_DIR.mkdir(parents=True, exist_ok=True)
-
     if PipelineConfig.ENABLE_COMPLIANCE_CHECK:
         if not KnowledgeBaseConfig.NEO4J_PASSWORD:
             errors.append("NEO4J_PASSWORD not set")
         if not KnowledgeBaseConfig.PINECONE_API_KEY:
             errors.append("PINECONE_API_KEY not set")
 
-    # Check paths
-    if not ReportConfig.DEFAULT_OUTPUT_DIR.exists():
-        ReportConfig.DEFAULT_OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
-
     return errors
 
 def print_config():
@@ -273,6 +300,7 @@ def print_config():
 
 if __name__ == "__main__":
     # Validate and print config when run directly
+    ensure_dirs()
     errors = validate_config()
     if errors:
         print("Configuration Errors:")
@@ -1,7 +1,7 @@
 import { useState, useEffect } from 'react';
 import { useParams, useNavigate } from 'react-router-dom';
 import Header from '../components/Layout/Header';
-import { getPreCheckStatus, getPreCheckData, downloadReport } from '../utils/api';
+import { getPreCheckStatus, getPreCheckData, downloadReport, subscribePreCheckEvents } from '../utils/api';
 
 function Results() {
   const { precheckId } = useParams();
@@ -14,50 +14,67 @@ function Results() {
 
   useEffect(() => {
     let interval;
+    let socket;
+    let finished = false;
 
-    const pollStatus = async () => {
-      try {
-        const statusData = await getPreCheckStatus(precheckId);
+    const stop = () => {
+      finished = true;
+      if (interval) clearInterval(interval);
+      if (socket) socket.close();
+    };
+
+    const handleStatus = async (statusData) => {
+      // Update progress information
+      if (statusData.processing_step) {
+        setProcessingStep(statusData.processing_step);
+      }
+      if (statusData.progress !== undefined) {
+        setProgress(statusData.progress);
+      }
 
-        // Update progress information
-        if (statusData.processing_step) {
-          setProcessingStep(statusData.processing_step);
-        }
-        if (statusData.progress !== undefined) {
-          setProgress(statusData.progress);
-        }
+      if (statusData.status === 'completed') {
+        stop();
+        // Get full precheck data
+        const data = await getPreCheckData(precheckId);
+        setPrecheck(data.precheck);
+        setLoading(false);
+      } else if (statusData.status === 'processing') {
+        // Keep waiting for updates
+        setLoading(true);
+      } else {
+        stop();
+        setError('Processing failed');
+        setLoading(false);
+      }
+    };
 
-        if (statusData.status === 'completed') {
-          // Get full precheck data
-          const data = await getPreCheckData(precheckId);
-          setPrecheck(data.precheck);
-          setLoading(false);
-          if (interval) clearInterval(interval);
-        } else if (statusData.status === 'processing') {
-          // Keep polling
-          setLoading(true);
-        } else {
-          setError('Processing failed');
-          setLoading(false);
-          if (interval) clearInterval(interval);
-        }
+    const pollStatus = async () => {
+      try {
+        await handleStatus(await getPreCheckStatus(precheckId));
       } catch (err) {
         console.error('Failed to get status:', err);
         setError('Failed to load results');
         setLoading(false);
-        if (interval) clearInterval(interval);
+        stop();
       }
     };
 
-    // Initial poll
-    pollStatus();
-
-    // Poll every 3 seconds
-    interval = setInterval(pollStatus, 3000);
-
-    return () => {
-      if (interval) clearInterval(interval);
+    // Updates are pushed over a WebSocket; if it can't connect or drops
+    // before processing finishes, fall back to polling every 3 seconds
+    socket = subscribePreCheckEvents(precheckId, (statusData) => {
+      handleStatus(statusData).catch(() => {
+        setError('Failed to load results');
+        setLoading(false);
+      });
+    });
+    socket.onclose = () => {
+      if (!finished && !interval) {
+        pollStatus();
+        interval = setInterval(pollStatus, 3000);
+      }
     };
+
+    return stop;
   }, [precheckId]);
 
   const getComplianceIcon = (status) => {
@@ -68,6 +68,15 @@ export const getPreCheckStatus = async (precheckId) => {
   return response.data;
 };
 
+// Opens a WebSocket that pushes status updates as they happen;
+// onEvent receives the same shape as getPreCheckStatus
+export const subscribePreCheckEvents = (precheckId, onEvent) => {
+  const wsUrl = API_BASE_URL.replace(/^http/, 'ws');
+  const socket = new WebSocket(`${wsUrl}/api/precheck/${precheckId}/events`);
+  socket.onmessage = (message) => onEvent(JSON.parse(message.data));
+  return socket;
+};
+
 export const getPreCheckData = async (precheckId) => {
   const response = await api.get(`/api/precheck/${precheckId}`);
   return response.data;
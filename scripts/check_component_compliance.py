@@ -14,8 +14,19 @@ Optional flags:
     --pinecone-index planning-rules  # override index name
     --top-k 2                        # top rules per component type
     --writeback                      # write results to Neo4j
+    --concurrency 16                 # max Pinecone queries / LLM calls in flight
+    --relevance-high 0.85 --relevance-low 0.3   # Pinecone scores that settle relevance without the LLM
     --output path/to/output.json     # custom output path
 
+Environment:
+    VECTOR_BACKEND=local             # search an in-process rule index instead of Pinecone
+    EMBEDDING_BACKEND=local          # embed queries with sentence-transformers instead of OpenAI
+    RELEVANCE_CACHE_TTL_HOURS=0      # always re-ask the LLM instead of reusing cached verdicts
+    RELEVANCE_GATE_LOW/HIGH          # embedding-similarity band still sent to the relevance LLM
+    RELEVANCE_MODEL / RELEVANCE_ESCALATION_MODEL   # first-pass and low-confidence relevance models
+    RELEVANCE_ESCALATION_AFTER=3     # ambiguous verdicts a component type needs before escalating
+    EMBEDDING_CACHE_PATH=""          # don't persist embeddings or relevance verdicts between runs
+
 Output:
     Writes <plan>_compliance.json with detailed compliance findings.
 """
@@ -23,14 +34,22 @@ Output:
 from __future__ import annotations
 
 import argparse
+import atexit
+import functools
+import hashlib
 import json
 import os
+import re
+import sqlite3
 import sys
-from collections import defaultdict
+import threading
+import time
+from collections import Counter, OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Sequence
+from typing import Any, Callable, Dict, List, Optional, Sequence
 
 import numpy as np
 from neo4j import GraphDatabase
@@ -47,6 +66,26 @@ try:
 except ImportError:
     OpenAI = None
 
+try:
+    from pinecone.grpc import PineconeGRPC
+except ImportError:
+    PineconeGRPC = None  # pinecone[grpc] not installed; the REST client is used
+
+try:
+    from sentence_transformers import SentenceTransformer
+except ImportError:
+    SentenceTransformer = None
+
+try:
+    import faiss
+except ImportError:
+    faiss = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # falls back to the stdlib json module
+
 
 # =============================================================================
 # Logging
@@ -59,8 +98,13 @@ def log(msg: str) -> None:
 # =============================================================================
 # Data Models
 # =============================================================================
+# Slotted to drop the per-instance __dict__ (thousands of these per plan);
+# dataclass(slots=True) needs Python 3.10+, older versions keep plain classes
+
+DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
 
-@dataclass
+@dataclass(frozen=True, **DATACLASS_SLOTS)
 class RuleCandidate:
     """A candidate rule matched to a component."""
     rule_id: str
@@ -69,7 +113,29 @@ class RuleCandidate:
     metadata: Dict[str, Any] = field(default_factory=dict)
 
 
-@dataclass
+# Fixed requirement keywords the evaluators test for, as bits of
+# RuleDetail.keyword_flags (set once per rule instead of scanning the
+# requirement text for each evaluation)
+KW_FRONT = 1 << 0
+KW_SIDE = 1 << 1
+KW_REAR = 1 << 2
+KW_DOOR = 1 << 3
+KW_EGRESS = 1 << 4
+KW_EXIT = 1 << 5
+KW_ACCESSIBLE = 1 << 6
+KW_ADA = 1 << 7
+KW_BEDROOM = 1 << 8
+KW_SIZE = 1 << 9
+KW_CREEK = 1 << 10
+KW_RIVER = 1 << 11
+RULE_KEYWORD_FLAGS = {
+    "FRONT": KW_FRONT, "SIDE": KW_SIDE, "REAR": KW_REAR, "DOOR": KW_DOOR,
+    "EGRESS": KW_EGRESS, "EXIT": KW_EXIT, "ACCESSIBLE": KW_ACCESSIBLE, "ADA": KW_ADA,
+    "BEDROOM": KW_BEDROOM, "SIZE": KW_SIZE, "CREEK": KW_CREEK, "RIVER": KW_RIVER,
+}
+
+
+@dataclass(frozen=True, **DATACLASS_SLOTS)
 class RuleDetail:
     """Full rule details from Neo4j."""
     rule_id: str
@@ -80,9 +146,27 @@ class RuleDetail:
     attribute: Optional[str]
     value: Any
     zones: List[str]
+    # Derived once per rule, not once per (component, rule) evaluation
+    requirement_upper: str = field(init=False, repr=False, compare=False)
+    attribute_lower: str = field(init=False, repr=False, compare=False)
+    min_value: Optional[float] = field(init=False, repr=False, compare=False)  # value as a number, None if unparseable
+    keyword_flags: int = field(init=False, repr=False, compare=False)  # KW_* bits found in requirement_upper
+
+    def __post_init__(self):
+        requirement_upper = (self.requirement or "").upper()
+        object.__setattr__(self, "requirement_upper", requirement_upper)
+        object.__setattr__(self, "keyword_flags", sum(
+            bit for keyword, bit in RULE_KEYWORD_FLAGS.items() if keyword in requirement_upper
+        ))
+        object.__setattr__(self, "attribute_lower", (self.attribute or "").lower())
+        try:
+            min_value = float(self.value)
+        except (ValueError, TypeError):
+            min_value = None
+        object.__setattr__(self, "min_value", min_value)
 
 
-@dataclass
+@dataclass(frozen=True, **DATACLASS_SLOTS)
 class ComplianceEvaluation:
     """Result of evaluating a component against a rule."""
     component_id: str
@@ -97,11 +181,34 @@ class ComplianceEvaluation:
     actual_value: Any
     status: str  # PASS, FAIL, REVIEW, NOT_APPLICABLE, NO_APPLICABLE_RULES
     confidence: float
-    notes: List[str]
+    notes: tuple[str, ...]
     zones: List[str]
     source: str
 
 
+@dataclass(**DATACLASS_SLOTS)
+class PendingEvaluation:
+    """A (component, candidate rule) pair waiting on rule details, evaluation and relevance."""
+    component_type: str  # type passed to the relevance check
+    component: Dict[str, Any]
+    candidate: RuleCandidate
+    evaluate: Callable[[Dict[str, Any], RuleDetail, RuleCandidate], Optional[ComplianceEvaluation]]
+    label: str  # used in the "filtered irrelevant rule" log line
+    rule: Optional[RuleDetail] = None  # filled in from one Neo4j fetch for all candidates
+    result: Optional[ComplianceEvaluation] = None  # kept if the relevance check passes
+
+
+@dataclass(frozen=True)
+class ComponentKind:
+    """Where one kind of component sits on a sheet and how it is checked."""
+    sheet_key: str  # sheet field holding the components
+    component_type: str  # type used for retrieval and the relevance check
+    evaluate: Callable[[Dict[str, Any], RuleDetail, RuleCandidate], Optional[ComplianceEvaluation]]
+    label: Callable[[Dict[str, Any]], str]  # used in the "filtered irrelevant rule" log line
+    progress: Optional[str] = None  # tqdm description; None shows no progress bar
+    single: bool = False  # sheet_key holds one component rather than a list
+
+
 # =============================================================================
 # Component Type Mapping
 # =============================================================================
@@ -126,9 +233,12 @@ COMPONENT_TYPE_KEYWORDS = {
 # =============================================================================
 # Database Connections
 # =============================================================================
+# Clients are created once per process and reused across runs, so repeated
+# in-process pipeline runs don't redo the TLS/auth handshake each time.
 
+@functools.lru_cache(maxsize=1)
 def get_neo4j_driver() -> Any:
-    """Connect to Neo4j database."""
+    """Connect to Neo4j database (shared driver, closed at exit)."""
     uri = os.getenv("NEO4J_URI")
     user = os.getenv("NEO4J_USER")
     pwd = os.getenv("NEO4J_PASSWORD")
@@ -137,18 +247,32 @@ def get_neo4j_driver() -> Any:
     if missing:
         raise EnvironmentError(f"Missing Neo4j environment vars: {', '.join(missing)}")
 
-    return GraphDatabase.driver(uri, auth=(user, pwd))
+    driver = GraphDatabase.driver(uri, auth=(user, pwd))
+    atexit.register(driver.close)
+    return driver
 
 
+@functools.lru_cache(maxsize=1)
 def get_pinecone_client() -> Optional[Pinecone]:
-    """Connect to Pinecone vector database."""
+    """Connect to Pinecone vector database (over gRPC when pinecone[grpc] is installed)."""
     key = os.getenv("PINECONE_API_KEY")
     if not key:
         log("Warning: PINECONE_API_KEY not set, skipping Pinecone queries")
         return None
-    return Pinecone(api_key=key)
+    return (PineconeGRPC or Pinecone)(api_key=key)
+
+
+@functools.lru_cache(maxsize=8)
+def get_pinecone_index(pinecone_client: Any, index_name: str) -> Any:
+    """
+    Index handle for a client, resolved once instead of per query. Bounded
+    because a LocalRuleIndex client (its own Index) can differ between runs
+    in one process, and each entry keeps the whole index alive.
+    """
+    return pinecone_client.Index(index_name)
 
 
+@functools.lru_cache(maxsize=1)
 def get_openai_client() -> Optional[OpenAI]:
     """Connect to OpenAI for embeddings."""
     key = os.getenv("OPENAI_API_KEY")
@@ -172,6 +296,9 @@ def check_rule_relevance(
     """
     Use LLM to determine if a rule is actually relevant to a component.
 
+    Single-pair convenience wrapper; callers with many pairs should collect
+    them and call check_rules_relevance_batch once instead.
+
     Args:
         component_type: Type of component being checked
         component_data: Data about the component
@@ -182,56 +309,305 @@ def check_rule_relevance(
     Returns:
         (is_relevant, confidence, reasoning)
     """
+    return check_rules_relevance_batch(
+        [(component_type, component_data, rule)], openai_client, plan_context
+    )[0]
+
+
+def check_rules_relevance_batch(
+    pairs: Sequence[tuple],
+    openai_client: Optional[OpenAI],
+    plan_context: str = "unknown",
+    batch_size: Optional[int] = None,
+    max_workers: int = 8
+) -> List[tuple[bool, float, str]]:
+    """
+    Check many (component_type, component_data, rule) pairs for relevance.
+
+    Pairs are sent batch_size (default RELEVANCE_BATCH_SIZE) at a time in a
+    single JSON-mode prompt each, and the batches run concurrently. Pairs are
+    checked in the order given, so a component's candidate rules (queued
+    together by process_components) share a batch. Pairs with the same rule
+    and the same canonical_component (e.g. repeated rooms of about the same
+    size) are only checked once, with the first such pair's exact description
+    in the prompt, and verdicts cached on disk by earlier runs are reused (see
+    load_relevance_verdicts). Verdicts RELEVANCE_MODEL is unsure about are asked
+    again of RELEVANCE_ESCALATION_MODEL, but only for component types it has
+    already been unsure about (see escalate_relevance). Returns one (is_relevant, confidence,
+    reasoning) per pair, in order. Without an LLM every pair is assumed relevant, and pairs missing
+    from a response or in a failed batch also default to relevant so valid
+    rules are never filtered out by an error.
+    """
     if not openai_client:
-        # Without LLM, assume all retrieved rules are relevant
-        return (True, 0.5, "LLM unavailable, defaulting to relevant")
+        return [(True, 0.5, "LLM unavailable, defaulting to relevant")] * len(pairs)
+    if not pairs:
+        return []
+
+    context_note = relevance_context_note(plan_context)
+    batch_size = batch_size or RELEVANCE_BATCH_SIZE
+
+    # Verdicts are shared by pairs with the same bucketed description; the
+    # prompt shows the exact description of the first pair with each key
+    keys = []
+    prompt_by_key = {}
+    type_by_key = {}
+    for component_type, component_data, rule in pairs:
+        rule_desc = describe_rule(rule)
+        key = (canonical_component(component_type, component_data), rule_desc)
+        keys.append(key)
+        if key not in prompt_by_key:
+            prompt_by_key[key] = (describe_component(component_type, component_data), rule_desc)
+            type_by_key[key] = component_type
+    unique_keys = list(prompt_by_key)
+
+    # Verdicts from earlier runs; failed checks below are never cached
+    cache_keys = {key: relevance_cache_key(context_note, *key) for key in unique_keys}
+    cached = load_relevance_verdicts(list(cache_keys.values()))
+    verdict_by_key = {
+        key: cached[cache_key]
+        for key, cache_key in cache_keys.items() if cache_key in cached
+    }
+    to_check = [key for key in unique_keys if key not in verdict_by_key]
+    if verdict_by_key:
+        log(f"Reusing {len(verdict_by_key)} cached relevance verdicts")
+
+    def check_batch(batch: Sequence[tuple], model: str) -> List[Optional[tuple[bool, float, str]]]:
+        items = "\n\n".join(
+            f"[{idx}]\nComponent: {component_desc}\n"
+            f"Rule: {rule_desc}"
+            for idx, (component_desc, rule_desc) in enumerate(prompt_by_key[key] for key in batch)
+        )
 
-    # Build component description
+        try:
+            response = openai_client.chat.completions.create(
+                model=model,
+                messages=[
+                    {"role": "system", "content": RELEVANCE_SYSTEM_PROMPT},
+                    {"role": "user", "content": f"{context_note.lstrip()}\n\n{items}".lstrip()}
+                ],
+                temperature=0.0,
+                max_tokens=80 * len(batch) + 100,
+                response_format={"type": "json_object"},
+                # Routes requests sharing the system prompt to the same cache
+                extra_body={"prompt_cache_key": f"relevance-{plan_context}"}
+            )
+            results = json.loads(response.choices[0].message.content).get("results", [])
+        except Exception as exc:
+            log(f"LLM relevance batch error: {exc}")
+            return [(True, 0.3, f"LLM error: {str(exc)[:100]}")] * len(batch)
+
+        verdicts: List[Optional[tuple]] = [None] * len(batch)
+        for result in results:
+            idx = result.get("idx") if isinstance(result, dict) else None
+            if isinstance(idx, int) and 0 <= idx < len(batch):
+                verdicts[idx] = (
+                    result.get("relevant", False),
+                    result.get("confidence", 0.5),
+                    result.get("reasoning", "No reasoning provided")
+                )
+        return verdicts
+
+    def check_all(batch_keys: List[tuple], model: str) -> List[Optional[tuple[bool, float, str]]]:
+        batches = [batch_keys[start:start + batch_size] for start in range(0, len(batch_keys), batch_size)]
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return [
+                verdict
+                for verdicts in executor.map(check_batch, batches, [model] * len(batches))
+                for verdict in verdicts
+            ]
+
+    def answered(verdict: Optional[tuple]) -> bool:
+        return verdict is not None and not verdict[2].startswith("LLM error:")
+
+    checked = dict(zip(to_check, check_all(to_check, RELEVANCE_MODEL)))
+
+    # Second opinion from the stronger model only where the first was unsure
+    if RELEVANCE_ESCALATION_MODEL:
+        unsure = escalate_relevance([
+            (key, type_by_key[key]) for key, verdict in checked.items()
+            if answered(verdict) and isinstance(verdict[1], (int, float))
+            and verdict[1] < RELEVANCE_ESCALATION_CONFIDENCE
+        ])
+        if unsure:
+            log(f"Escalating {len(unsure)} low-confidence relevance checks to {RELEVANCE_ESCALATION_MODEL}")
+            for key, verdict in zip(unsure, check_all(unsure, RELEVANCE_ESCALATION_MODEL)):
+                if answered(verdict):
+                    checked[key] = verdict
+
+    new_entries = {}
+    for key, verdict in checked.items():
+        if verdict is None:
+            verdict = (True, 0.3, "Missing from LLM batch response, defaulting to relevant")
+        elif answered(verdict):
+            new_entries[cache_keys[key]] = verdict
+        verdict_by_key[key] = verdict
+    if new_entries:
+        save_relevance_verdicts(new_entries)
+
+    return [verdict_by_key[key] for key in keys]
+
+
+# Relevance is asked of RELEVANCE_MODEL; answers below
+# RELEVANCE_ESCALATION_CONFIDENCE are re-asked of RELEVANCE_ESCALATION_MODEL
+# once their component type has been ambiguous RELEVANCE_ESCALATION_AFTER
+# times before (RELEVANCE_ESCALATION_MODEL="" turns escalation off)
+RELEVANCE_MODEL = os.getenv("RELEVANCE_MODEL", "gpt-4o-mini")
+# Pairs per relevance prompt; smaller batches cost more calls but give the
+# model less to keep track of per answer
+RELEVANCE_BATCH_SIZE = max(1, int(os.getenv("RELEVANCE_BATCH_SIZE", "40")))
+RELEVANCE_ESCALATION_MODEL = os.getenv("RELEVANCE_ESCALATION_MODEL", "gpt-4o")
+RELEVANCE_ESCALATION_CONFIDENCE = float(os.getenv("RELEVANCE_ESCALATION_CONFIDENCE", "0.4"))
+RELEVANCE_ESCALATION_AFTER = int(os.getenv("RELEVANCE_ESCALATION_AFTER", "3"))
+
+# Low-confidence first-tier verdicts seen so far in this process, by component type
+_ambiguous_types: Counter = Counter()
+_ambiguous_types_lock = threading.Lock()
+
+
+def escalate_relevance(unsure: Sequence[tuple]) -> List[tuple]:
+    """
+    Of the (key, component_type) pairs RELEVANCE_MODEL was unsure about,
+    the keys whose component type was already ambiguous at least
+    RELEVANCE_ESCALATION_AFTER times; every pair counts towards its type.
+    """
+    escalate = []
+    with _ambiguous_types_lock:
+        for key, component_type in unsure:
+            if _ambiguous_types[component_type] >= RELEVANCE_ESCALATION_AFTER:
+                escalate.append(key)
+            _ambiguous_types[component_type] += 1
+    return escalate
+
+# Relevance verdicts are cached on disk, in the embedding cache database (see
+# EmbeddingStore), keyed by the system prompt, plan-type note, canonical
+# component and rule descriptions and the models asked, so a prompt or model
+# change invalidates old verdicts. RELEVANCE_CACHE_TTL_HOURS=0 disables the cache
+RELEVANCE_CACHE_TTL_HOURS = float(os.getenv("RELEVANCE_CACHE_TTL_HOURS", "168"))
+
+
+def relevance_cache_key(context_note: str, component_desc: str, rule_desc: str) -> str:
+    """Cache key for one relevance verdict."""
+    payload = json.dumps([RELEVANCE_MODEL, RELEVANCE_ESCALATION_MODEL, RELEVANCE_SYSTEM_PROMPT,
+                          context_note, component_desc, rule_desc])
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+def load_relevance_verdicts(cache_keys: Sequence[str]) -> Dict[str, tuple]:
+    """Unexpired cached relevance verdicts for these cache keys (empty if disabled)."""
+    store = get_embedding_store()
+    if RELEVANCE_CACHE_TTL_HOURS <= 0 or store is None:
+        return {}
+    return store.get_verdicts(cache_keys, time.time() - RELEVANCE_CACHE_TTL_HOURS * 3600)
+
+
+def save_relevance_verdicts(verdicts: Dict[str, tuple]) -> None:
+    """Cache relevance verdicts by cache key, one row each."""
+    store = get_embedding_store()
+    if RELEVANCE_CACHE_TTL_HOURS <= 0 or store is None:
+        return
+    try:
+        store.put_verdicts(verdicts, time.time())
+    except sqlite3.Error as exc:
+        log(f"Could not write relevance cache: {exc}")
+
+
+def approx(value: Any) -> Any:
+    """
+    Round a measurement to two significant figures (one of ~90 bins per
+    decade). Non-numeric values are returned unchanged.
+    """
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not value:
+        return value
+    rounded = float(f"{value:.2g}")
+    return int(rounded) if rounded.is_integer() else rounded
+
+
+# Continuous component fields bucketed by canonical_component
+MEASUREMENT_FIELDS = ("area", "avg_distance", "distance", "width", "length")
+
+
+def canonical_component(component_type: str, component_data: Dict[str, Any]) -> str:
+    """
+    describe_component with its measurements bucketed by approx. Relevance
+    verdicts are deduplicated and cached under this, so near-identical
+    components (a 143.7 and a 144.2 sq ft bedroom) share one check; the
+    prompt itself still shows the exact values.
+    """
+    bucketed = dict(component_data)
+    for field in MEASUREMENT_FIELDS:
+        if field in bucketed:
+            bucketed[field] = approx(bucketed[field])
+    return describe_component(component_type, bucketed)
+
+
+def describe_room(room: Dict[str, Any]) -> str:
+    """Room details for describe_component."""
+    details = ""
+    if room.get("area"):
+        details += f", area={room['area']} sq ft"
+    if room.get("room_type"):
+        details += f", type={room['room_type']}"
+    return details
+
+
+def describe_setback(setback: Dict[str, Any]) -> str:
+    """Setback details for describe_component."""
+    distance = setback.get("avg_distance", setback.get("distance", "unknown"))
+    return f", direction={setback.get('direction', 'unknown')}, distance={distance} units"
+
+
+def describe_opening(opening: Dict[str, Any]) -> str:
+    """Opening details for describe_component."""
+    details = f", type={opening.get('opening_type', 'unknown')}, width={opening.get('width', 'unknown')} ft"
+    if opening.get("is_egress"):
+        details += ", egress=true"
+    return details
+
+
+def describe_parking(parking: Dict[str, Any]) -> str:
+    """Parking details for describe_component."""
+    return (f", type={parking.get('space_type', 'unknown')}"
+            f", dimensions={parking.get('width', '?')}x{parking.get('length', '?')} ft")
+
+
+# Per-type details appended to "<type>: <name>"; other types get the name only
+COMPONENT_DESCRIBERS: Dict[str, Callable[[Dict[str, Any]], str]] = {
+    "room": describe_room,
+    "setback": describe_setback,
+    "geometric_setback": describe_setback,
+    "opening": describe_opening,
+    "parking": describe_parking,
+}
+
+
+def describe_component(component_type: str, component_data: Dict[str, Any]) -> str:
+    """One-line component description for relevance prompts."""
     component_desc = f"{component_type}: {component_data.get('name', 'unnamed')}"
-    if component_type == "room":
-        if component_data.get("area"):
-            component_desc += f", area={component_data['area']} sq ft"
-        if component_data.get("room_type"):
-            component_desc += f", type={component_data['room_type']}"
-    elif component_type in ["setback", "geometric_setback"]:
-        component_desc += f", direction={component_data.get('direction', 'unknown')}"
-        component_desc += f", distance={component_data.get('avg_distance', component_data.get('distance', 'unknown'))} units"
-    elif component_type == "opening":
-        component_desc += f", type={component_data.get('opening_type', 'unknown')}"
-        component_desc += f", width={component_data.get('width', 'unknown')} ft"
-        if component_data.get("is_egress"):
-            component_desc += ", egress=true"
-    elif component_type == "parking":
-        component_desc += f", type={component_data.get('space_type', 'unknown')}"
-        component_desc += f", dimensions={component_data.get('width', '?')}x{component_data.get('length', '?')} ft"
-
-    # Build rule description
+    describer = COMPONENT_DESCRIBERS.get(component_type)
+    return component_desc + describer(component_data) if describer else component_desc
+
+
+def describe_rule(rule: RuleDetail) -> str:
+    """One-line rule description for relevance prompts."""
     rule_desc = f"Rule {rule.rule_id}: {rule.requirement}"
     if rule.topic:
         rule_desc += f" (Topic: {rule.topic})"
+    return rule_desc
+
 
-    # Add plan context to prompt
-    context_note = ""
+def relevance_context_note(plan_context: str) -> str:
+    """Plan-type note added to relevance prompts."""
     if plan_context == "site_plan":
-        context_note = """
+        return """
 IMPORTANT CONTEXT: This is a SITE PLAN (lot layout), not a building floor plan.
 - REJECT rules about: dwelling houses, building work, building height, roofed areas, site cover, floor areas
 - ACCEPT rules about: lot sizes, setbacks from boundaries, environmental/water features, lot dimensions"""
     elif plan_context == "building_plan":
-        context_note = "\nCONTEXT: This is a building floor plan."
-
-    # Create prompt
-    prompt = f"""You are a building code compliance expert. Determine if the following building code rule is applicable and relevant to check against the given component.{context_note}
-
-Component:
-{component_desc}
-
-Rule:
-{rule_desc}
+        return "\nCONTEXT: This is a building floor plan."
+    return ""
 
-Question: Is this rule actually applicable and relevant for checking this specific component?
 
-Consider:
+RELEVANCE_GUIDELINES = """Consider:
 - Does the rule's requirement logically apply to this type of component?
 - Is the rule about something this component can actually satisfy or violate?
 - Would a human building plan reviewer check this component against this rule?
@@ -248,60 +624,187 @@ Examples of RELEVANT matches:
 - Checking a "bedroom" against "minimum room area requirements"
 - Checking a "setback" against "boundary clearance requirements"
 - Checking an "egress door" against "minimum door width requirements"
-- Checking a "site plan setback" against "riparian setback requirements"
+- Checking a "site plan setback" against "riparian setback requirements\""""
 
-Respond in JSON format:
+# Static instructions sent as the system message of every relevance batch.
+# Only the numbered pairs vary, and they go last in the user message so
+# OpenAI's automatic prompt caching can reuse this prefix across calls.
+# Caching only starts at 1024 prompt tokens, which this prefix alone doesn't
+# reach; the cached prefix extends into the user message (plan-type note and
+# leading pairs), so it applies once a batch holds a few dozen pairs (see
+# RELEVANCE_BATCH_SIZE).
+RELEVANCE_SYSTEM_PROMPT = f"""You are a building code compliance expert. For each numbered (component, rule) pair in the user message, determine if the building code rule is applicable and relevant to check against the component. The user message may start with context about the plan type; apply it to every pair.
+
+For each pair: is this rule actually applicable and relevant for checking this specific component?
+
+{RELEVANCE_GUIDELINES}
+
+Respond in JSON format with one entry per pair, using the pair's number as idx:
 {{
-  "relevant": true/false,
-  "confidence": 0.0-1.0,
-  "reasoning": "brief explanation"
+  "results": [
+    {{"idx": 0, "relevant": true/false, "confidence": 0.0-1.0, "reasoning": "brief explanation"}}
+  ]
 }}"""
 
-    try:
-        response = openai_client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.0,
-            max_tokens=200
+
+# =============================================================================
+# Embedding & Vector Search
+# =============================================================================
+
+# Query embeddings come from OpenAI by default. EMBEDDING_BACKEND=local embeds
+# on CPU with sentence-transformers instead (no API cost or round trip); the
+# vector index queried must then have been built with the same local model.
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "openai").lower()
+LOCAL_EMBEDDING_MODEL = os.getenv("LOCAL_EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+EMBEDDING_MODEL = LOCAL_EMBEDDING_MODEL if EMBEDDING_BACKEND == "local" else "text-embedding-3-small"
+
+
+@functools.lru_cache(maxsize=1)
+def get_local_embedder() -> Any:
+    """Load the sentence-transformers model once per process."""
+    if SentenceTransformer is None:
+        raise ImportError("sentence-transformers not installed. Run: pip install sentence-transformers")
+    log(f"Loading local embedding model {LOCAL_EMBEDDING_MODEL}...")
+    return SentenceTransformer(LOCAL_EMBEDDING_MODEL)
+
+
+# Embeddings are kept on disk across runs, so each distinct text is only ever
+# embedded once per model. EMBEDDING_CACHE_PATH="" keeps them in memory only
+EMBEDDING_CACHE_PATH = os.getenv(
+    "EMBEDDING_CACHE_PATH",
+    str(Path(__file__).resolve().parents[1] / ".cache" / "embeddings.sqlite")
+)
+# Most recently used embeddings held in memory in front of the SQLite file
+# (about 50 KB each as float lists, so the default stays around 100 MB)
+EMBEDDING_MEMORY_CACHE_SIZE = int(os.getenv("EMBEDDING_MEMORY_CACHE_SIZE", "2048"))
+
+
+class EmbeddingStore:
+    """
+    SQLite-backed embedding cache keyed by (model, text), usable wherever
+    embed_text/embed_texts take a cache dict. Vectors are stored normalized
+    and int8-quantized (see quantize_rows), a float32 scale followed by one
+    byte per dimension; the EMBEDDING_MEMORY_CACHE_SIZE most recently used
+    are also kept in memory, so a long-lived process doesn't grow without
+    bound. The same database holds cached relevance verdicts.
+    """
+
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS emb_i8 (key BLOB PRIMARY KEY, vec BLOB)")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS relevance (key TEXT PRIMARY KEY, verdict TEXT, saved_at REAL)"
         )
+        self.lock = threading.Lock()
+        self.memory: OrderedDict[Any, List[float]] = OrderedDict()
+
+    @staticmethod
+    def _db_key(key: tuple) -> bytes:
+        model, text = key
+        return hashlib.sha256(f"{model}\0{text}".encode()).digest()
+
+    def _remember(self, key: tuple, vector: List[float]) -> None:
+        with self.lock:
+            self.memory[key] = vector
+            self.memory.move_to_end(key)
+            while len(self.memory) > EMBEDDING_MEMORY_CACHE_SIZE:
+                self.memory.popitem(last=False)
+
+    def get(self, key: tuple, default: Any = None) -> Any:
+        with self.lock:
+            vector = self.memory.get(key)
+            if vector is not None:
+                self.memory.move_to_end(key)
+                return vector
+            row = self.conn.execute(
+                "SELECT vec FROM emb_i8 WHERE key = ?", (self._db_key(key),)
+            ).fetchone()
+        if row is None:
+            return default
+        scale = np.frombuffer(row[0], dtype=np.float32, count=1)
+        codes = np.frombuffer(row[0], dtype=np.int8, offset=4)
+        vector = dequantize_rows(codes, scale).tolist()
+        self._remember(key, vector)
+        return vector
+
+    def __contains__(self, key: tuple) -> bool:
+        return self.get(key) is not None
+
+    def __getitem__(self, key: tuple) -> List[float]:
+        vector = self.get(key)
+        if vector is None:
+            raise KeyError(key)
+        return vector
+
+    def __setitem__(self, key: tuple, vector: Sequence[float]) -> None:
+        self._remember(key, list(vector))
+        codes, scales = quantize_rows([vector])
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR IGNORE INTO emb_i8 (key, vec) VALUES (?, ?)",
+                (self._db_key(key), scales[0].tobytes() + codes[0].tobytes())
+            )
 
-        result_text = response.choices[0].message.content.strip()
-
-        # Try to parse JSON response
-        import re
-        json_match = re.search(r'\{.*\}', result_text, re.DOTALL)
-        if json_match:
-            result = json.loads(json_match.group())
-            return (
-                result.get("relevant", False),
-                result.get("confidence", 0.5),
-                result.get("reasoning", "No reasoning provided")
+    def get_verdicts(self, keys: Sequence[str], saved_after: float) -> Dict[str, tuple]:
+        """Relevance verdicts by cache key, for the keys saved after saved_after."""
+        verdicts = {}
+        # Stay under SQLite's bound-parameter limit
+        for start in range(0, len(keys), 500):
+            chunk = list(keys[start:start + 500])
+            with self.lock:
+                rows = self.conn.execute(
+                    f"SELECT key, verdict FROM relevance WHERE saved_at > ? "
+                    f"AND key IN ({','.join('?' * len(chunk))})",
+                    [saved_after, *chunk]
+                ).fetchall()
+            verdicts.update((key, tuple(json.loads(verdict))) for key, verdict in rows)
+        return verdicts
+
+    def put_verdicts(self, verdicts: Dict[str, tuple], saved_at: float) -> None:
+        """Store relevance verdicts by cache key, replacing older ones."""
+        with self.lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO relevance (key, verdict, saved_at) VALUES (?, ?, ?)",
+                [(key, json.dumps(list(verdict)), saved_at) for key, verdict in verdicts.items()]
             )
-        else:
-            # Fallback: check if response contains "relevant" or "not relevant"
-            is_relevant = "relevant" in result_text.lower() and "not relevant" not in result_text.lower()
-            return (is_relevant, 0.5, result_text[:200])
 
-    except Exception as exc:
-        log(f"LLM relevance check error: {exc}")
-        # On error, default to relevant to avoid filtering out valid rules
-        return (True, 0.3, f"LLM error: {str(exc)[:100]}")
+
+@functools.lru_cache(maxsize=1)
+def get_embedding_store() -> Optional[EmbeddingStore]:
+    """Open the on-disk embedding cache once per process (None if disabled or unusable)."""
+    if not EMBEDDING_CACHE_PATH:
+        return None
+    try:
+        store = EmbeddingStore(Path(EMBEDDING_CACHE_PATH))
+    except (OSError, sqlite3.Error) as exc:
+        log(f"Could not open embedding cache, embedding in memory only: {exc}")
+        return None
+    atexit.register(store.conn.close)
+    return store
 
 
-# =============================================================================
-# Embedding & Vector Search
-# =============================================================================
+def embeddings_available(openai_client: Optional[OpenAI]) -> bool:
+    """Whether query embeddings can be generated with the configured backend."""
+    return EMBEDDING_BACKEND == "local" or openai_client is not None
+
 
 def embed_text(openai_client: Optional[OpenAI], text: str, cache: Dict[str, List[float]],
-               model: str = "text-embedding-3-small") -> Optional[List[float]]:
-    """Generate embedding for text using OpenAI."""
-    if not openai_client:
+               model: str = EMBEDDING_MODEL) -> Optional[List[float]]:
+    """Generate embedding for text using OpenAI (or the local model)."""
+    if not embeddings_available(openai_client):
         return None
 
     key = (model, text)
     if key in cache:
         return cache[key]
 
+    if EMBEDDING_BACKEND == "local":
+        embed_texts(openai_client, [text], cache, model)
+        return cache.get(key)
+
     try:
         result = openai_client.embeddings.create(input=text, model=model)
         embedding = result.data[0].embedding
@@ -312,11 +815,121 @@ def embed_text(openai_client: Optional[OpenAI], text: str, cache: Dict[str, List
         return None
 
 
-def cosine_sim(a: Sequence[float], b: Sequence[float]) -> float:
-    """Calculate cosine similarity between two vectors."""
-    a_vec, b_vec = np.array(a), np.array(b)
-    denom = (np.linalg.norm(a_vec) * np.linalg.norm(b_vec)) + 1e-9
-    return float(np.dot(a_vec, b_vec) / denom)
+def embed_texts(openai_client: Optional[OpenAI], texts: Sequence[str], cache: Dict[str, List[float]],
+                model: str = EMBEDDING_MODEL, batch_size: int = 2048) -> None:
+    """Embed many texts with one API call per batch, storing results in cache."""
+    if not embeddings_available(openai_client):
+        return
+
+    pending = list(dict.fromkeys(t for t in texts if (model, t) not in cache))
+
+    if EMBEDDING_BACKEND == "local":
+        try:
+            vectors = get_local_embedder().encode(
+                pending, batch_size=64, normalize_embeddings=True, convert_to_numpy=True
+            )
+        except Exception as exc:
+            log(f"Local embedding error: {exc}")
+            return
+        for text, vector in zip(pending, vectors):
+            cache[(model, text)] = vector.tolist()
+        return
+
+    for start in range(0, len(pending), batch_size):
+        batch = pending[start:start + batch_size]
+        try:
+            result = openai_client.embeddings.create(input=batch, model=model)
+        except Exception as exc:
+            log(f"Batch embedding error: {exc}")
+            return
+        for item in result.data:
+            cache[(model, batch[item.index])] = item.embedding
+
+
+def normalize_rows(vectors: Sequence[Sequence[float]]) -> np.ndarray:
+    """Stack vectors into a float32 matrix with L2-normalized rows."""
+    mat = np.asarray(vectors, dtype=np.float32)
+    return mat / (np.linalg.norm(mat, axis=-1, keepdims=True) + 1e-9)
+
+
+# Pairs whose component/rule description embeddings are clearly similar (or
+# clearly unrelated) are decided without an LLM call; only pairs in between
+# go to the relevance LLM. Set RELEVANCE_GATE_LOW=0 and RELEVANCE_GATE_HIGH=1
+# to send every pair to the LLM.
+RELEVANCE_GATE_LOW = float(os.getenv("RELEVANCE_GATE_LOW", "0.3"))
+RELEVANCE_GATE_HIGH = float(os.getenv("RELEVANCE_GATE_HIGH", "0.6"))
+# Pinecone candidates whose retrieval score alone settles relevance, checked
+# before the embedding gate; defaults for --relevance-high/--relevance-low
+# (1 and 0 turn the shortcut off)
+RELEVANCE_SCORE_HIGH = float(os.getenv("RELEVANCE_SCORE_HIGH", "0.85"))
+RELEVANCE_SCORE_LOW = float(os.getenv("RELEVANCE_SCORE_LOW", "0.3"))
+
+
+def pinecone_score_verdict(
+    candidate: RuleCandidate,
+    high: float = RELEVANCE_SCORE_HIGH,
+    low: float = RELEVANCE_SCORE_LOW
+) -> Optional[tuple[bool, float, str]]:
+    """
+    Relevance verdict from a Pinecone match score (relevant at or above high,
+    irrelevant at or below low), or None when it isn't decisive.
+    """
+    if candidate.source != "pinecone" or candidate.score is None:
+        return None
+    if candidate.score >= high:
+        return True, candidate.score, f"Pinecone score {candidate.score:.2f}, relevant without LLM check"
+    if candidate.score <= low:
+        return False, 1 - candidate.score, f"Pinecone score {candidate.score:.2f}, irrelevant without LLM check"
+    return None
+
+
+def embedding_relevance_gate(
+    pairs: Sequence[tuple],
+    openai_client: Optional[OpenAI],
+    embed_cache: Dict[str, List[float]]
+) -> List[Optional[tuple[bool, float, str]]]:
+    """
+    Cheap relevance pre-filter for (component_type, component_data, rule) pairs.
+
+    Embeds every distinct component and rule description in one batch and
+    compares them. Returns a verdict per pair when the similarity is above
+    RELEVANCE_GATE_HIGH or below RELEVANCE_GATE_LOW, and None for ambiguous
+    pairs (or all pairs, when embeddings are unavailable).
+    """
+    if not pairs or not embeddings_available(openai_client):
+        return [None] * len(pairs)
+
+    descs = [
+        (describe_component(component_type, component_data), describe_rule(rule))
+        for component_type, component_data, rule in pairs
+    ]
+    embed_texts(openai_client, [text for desc in descs for text in desc], embed_cache)
+
+    # One matrix product gives every component/rule similarity at once
+    component_texts = [text for text in dict.fromkeys(desc[0] for desc in descs)
+                       if (EMBEDDING_MODEL, text) in embed_cache]
+    rule_texts = [text for text in dict.fromkeys(desc[1] for desc in descs)
+                  if (EMBEDDING_MODEL, text) in embed_cache]
+    if not component_texts or not rule_texts:
+        return [None] * len(pairs)
+    sims = normalize_rows([embed_cache[(EMBEDDING_MODEL, t)] for t in component_texts]) @ \
+        normalize_rows([embed_cache[(EMBEDDING_MODEL, t)] for t in rule_texts]).T
+    component_row = {text: row for row, text in enumerate(component_texts)}
+    rule_col = {text: col for col, text in enumerate(rule_texts)}
+
+    verdicts: List[Optional[tuple]] = []
+    for component_desc, rule_desc in descs:
+        if component_desc not in component_row or rule_desc not in rule_col:
+            verdicts.append(None)
+            continue
+        sim = float(sims[component_row[component_desc], rule_col[rule_desc]])
+        if sim > RELEVANCE_GATE_HIGH:
+            verdicts.append((True, sim, f"Embedding similarity {sim:.2f}, relevant without LLM check"))
+        elif sim < RELEVANCE_GATE_LOW:
+            verdicts.append((False, 1 - sim, f"Embedding similarity {sim:.2f}, irrelevant without LLM check"))
+        else:
+            verdicts.append(None)
+    return verdicts
 
 
 def query_pinecone_for_component(
@@ -326,35 +939,48 @@ def query_pinecone_for_component(
     openai_client: Optional[OpenAI],
     index_name: str,
     top_k: int,
-    embed_cache: Dict[str, List[float]]
+    embed_cache: Dict[str, List[float]],
+    query_cache: Optional[Dict[str, List[RuleCandidate]]] = None
 ) -> List[RuleCandidate]:
     """Query Pinecone for relevant rules for a component."""
-    if not pinecone_client or not openai_client:
+    if not pinecone_client or not embeddings_available(openai_client):
         return []
 
-    # Build query text from component
-    query_parts = [component_type, component_data.get("name", "")]
-    if component_type == "room":
-        query_parts.append(f"area {component_data.get('area', '')} sq ft")
-    elif component_type in ["setback", "geometric_setback"]:
-        query_parts.append(f"{component_data.get('direction', '')} setback")
-
-    query_text = " ".join(str(p) for p in query_parts if p)
+    query_text = build_component_query(component_type, component_data)
+    if query_cache is not None and query_text in query_cache:
+        return list(query_cache[query_text])
 
     # Generate embedding
     embedding = embed_text(openai_client, query_text, embed_cache)
     if not embedding:
         return []
 
-    # Query Pinecone
+    return query_pinecone_index(get_pinecone_index(pinecone_client, index_name), embedding, top_k)
+
+
+def build_component_query(component_type: str, component_data: Dict[str, Any]) -> str:
+    """
+    Build the Pinecone query text for a component. This is the relevance
+    description, so the embedding fetched for the query is the one the
+    relevance gate compares against rules, and each component is embedded
+    once.
+    """
+    return describe_component(component_type, component_data)
+
+
+def query_pinecone_index(index: Any, embedding: List[float], top_k: int) -> List[RuleCandidate]:
+    """Run one Pinecone vector query and parse the matches into candidates."""
     try:
-        idx = pinecone_client.Index(index_name)
-        response = idx.query(vector=embedding, top_k=top_k, include_metadata=True)
+        response = index.query(vector=embedding, top_k=top_k, include_metadata=True)
     except Exception as exc:
         log(f"Pinecone query failed: {exc}")
         return []
 
-    # Parse results
+    return parse_pinecone_matches(response)
+
+
+def parse_pinecone_matches(response: Any) -> List[RuleCandidate]:
+    """Parse a Pinecone-style query response into rule candidates."""
     candidates = []
     for match in response.get("matches", []):
         metadata = match.get("metadata") or {}
@@ -370,6 +996,197 @@ def query_pinecone_for_component(
     return candidates
 
 
+def iter_pinecone_components(components_data: Dict[str, Any]):
+    """Yield (component_type, component) for every component process_components queries."""
+    for sheet in components_data.get("sheets", []):
+        for kind in COMPONENT_KINDS:
+            for component in sheet_components(sheet, kind):
+                yield kind.component_type, component
+
+
+def prefetch_pinecone_candidates(
+    components_data: Dict[str, Any],
+    pinecone_client: Optional[Pinecone],
+    openai_client: Optional[OpenAI],
+    index_name: str,
+    top_k: int,
+    embed_cache: Dict[str, List[float]],
+    max_workers: int = 16
+) -> Dict[str, List[RuleCandidate]]:
+    """
+    Run the Pinecone lookups for all components up front.
+
+    Components with the same query text share one lookup; all query texts are
+    embedded in one batched OpenAI call and the Pinecone queries run
+    concurrently. Returns candidates keyed by query text.
+    """
+    if not pinecone_client or not embeddings_available(openai_client):
+        return {}
+
+    query_texts = list(dict.fromkeys(
+        build_component_query(component_type, component)
+        for component_type, component in iter_pinecone_components(components_data)
+    ))
+    if not query_texts:
+        return {}
+
+    embed_texts(openai_client, query_texts, embed_cache)
+    embedded = [
+        (text, embed_cache[(EMBEDDING_MODEL, text)])
+        for text in query_texts if (EMBEDDING_MODEL, text) in embed_cache
+    ]
+
+    index = get_pinecone_index(pinecone_client, index_name)
+    if isinstance(index, LocalRuleIndex):
+        # One matrix search over all query vectors
+        responses = index.query_many([vector for _, vector in embedded], top_k)
+        results = [parse_pinecone_matches(response) for response in responses]
+        query_cache = {text: candidates for (text, _), candidates in zip(embedded, results)}
+    else:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = executor.map(
+                lambda item: query_pinecone_index(index, item[1], top_k), embedded
+            )
+            query_cache = {text: candidates for (text, _), candidates in zip(embedded, results)}
+
+    log(f"Prefetched Pinecone rules for {len(query_cache)} unique component queries")
+    return query_cache
+
+
+# =============================================================================
+# Local Rule Index
+# =============================================================================
+
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "pinecone").lower()
+RULE_INDEX_CACHE_DIR = Path(__file__).resolve().parents[1] / ".cache" / "rule_index"
+
+# The last index built in this process, as (digest, index): in-process runs
+# (compliCheckV2, the backend) reuse it while the rules are unchanged
+_local_rule_index: Optional[tuple] = None
+_local_rule_index_lock = threading.Lock()
+
+
+class LocalRuleIndex:
+    """
+    In-process vector index over all Neo4j rules, used in place of Pinecone.
+
+    The rules corpus is small and static, so an exact inner-product search
+    (FAISS IndexFlatIP, or NumPy when faiss isn't installed) over normalized
+    vectors is sub-millisecond. Exposes the part of the Pinecone client API
+    this script uses: Index(name) and index.query(...).
+    """
+
+    def __init__(self, rule_ids: List[str], vectors: np.ndarray):
+        self.rule_ids = rule_ids
+        self.vectors = np.ascontiguousarray(normalize_rows(vectors))
+        self.faiss_index = None
+        if faiss is not None:
+            self.faiss_index = faiss.IndexFlatIP(self.vectors.shape[1])
+            self.faiss_index.add(self.vectors)
+
+    def Index(self, name: str) -> "LocalRuleIndex":
+        return self
+
+    def query(self, vector: Sequence[float], top_k: int, include_metadata: bool = True) -> Dict[str, Any]:
+        return self.query_many([vector], top_k)[0]
+
+    def query_many(self, vectors: Sequence[Sequence[float]], top_k: int) -> List[Dict[str, Any]]:
+        """Search for several query vectors at once; Pinecone-style responses."""
+        queries = normalize_rows(vectors)
+        top_k = min(top_k, len(self.rule_ids))
+
+        if self.faiss_index is not None:
+            scores, indices = self.faiss_index.search(np.ascontiguousarray(queries), top_k)
+        else:
+            similarity = queries @ self.vectors.T
+            indices = np.argsort(-similarity, axis=1)[:, :top_k]
+            scores = np.take_along_axis(similarity, indices, axis=1)
+
+        return [
+            {"matches": [
+                {"id": self.rule_ids[i], "score": float(score), "metadata": {"rule_id": self.rule_ids[i]}}
+                for i, score in zip(row_indices, row_scores) if i >= 0
+            ]}
+            for row_indices, row_scores in zip(indices, scores)
+        ]
+
+
+def quantize_rows(vectors: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Quantize normalized rows to int8 with one scale per row. Cosine scores
+    from the dequantized vectors stay within about 0.01 of the originals,
+    well inside what rule retrieval can tell apart.
+    """
+    mat = normalize_rows(vectors)
+    scales = np.abs(mat).max(axis=1, keepdims=True) / 127.0 + 1e-12
+    return np.round(mat / scales).astype(np.int8), scales.astype(np.float32)
+
+
+def dequantize_rows(codes: np.ndarray, scales: np.ndarray) -> np.ndarray:
+    """Inverse of quantize_rows (up to rounding), as float32."""
+    return codes.astype(np.float32) * scales
+
+
+def build_local_rule_index(driver: Any, openai_client: Optional[OpenAI]) -> Optional[LocalRuleIndex]:
+    """
+    Build the local rule index from Neo4j. Rule embeddings are cached under
+    RULE_INDEX_CACHE_DIR, keyed by embedding model and rule text, so they are
+    only recomputed when the rules change. The cache stores them as int8 (see
+    quantize_rows), a quarter the size of float32. The built index is kept
+    for the life of the process and returned again while the rules match.
+    """
+    global _local_rule_index
+
+    if not embeddings_available(openai_client):
+        log("Warning: no embedding backend available, skipping local rule index")
+        return None
+
+    query = """
+    MATCH (r:Rule)
+    RETURN r.id AS rule_id, r.section_title AS section_title,
+           r.topic AS topic, r.requirement AS requirement
+    ORDER BY r.id
+    """
+    with driver.session() as session:
+        rows = [row.data() for row in session.run(query)]
+
+    rule_ids = []
+    texts = []
+    for row in rows:
+        if row.get("rule_id"):
+            rule_ids.append(str(row["rule_id"]))
+            texts.append(" ".join(str(row.get(k) or "") for k in ("section_title", "topic", "requirement")).strip())
+    if not rule_ids:
+        return None
+
+    digest = hashlib.sha256(json.dumps([EMBEDDING_MODEL, rule_ids, texts]).encode()).hexdigest()[:16]
+    with _local_rule_index_lock:
+        if _local_rule_index and _local_rule_index[0] == digest:
+            return _local_rule_index[1]
+
+    cache_path = RULE_INDEX_CACHE_DIR / f"{digest}.npz"
+    if cache_path.exists():
+        with np.load(cache_path) as cached:
+            vectors = dequantize_rows(cached["codes"], cached["scales"])
+        log(f"Loaded local rule index ({len(rule_ids)} rules) from cache")
+    else:
+        log(f"Embedding {len(rule_ids)} rules for the local rule index...")
+        cache = get_embedding_store() or {}
+        embed_texts(openai_client, texts, cache)
+        if any((EMBEDDING_MODEL, text) not in cache for text in texts):
+            log("Warning: could not embed all rules, skipping local rule index")
+            return None
+        vectors = np.asarray([cache[(EMBEDDING_MODEL, text)] for text in texts], dtype=np.float32)
+        RULE_INDEX_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        codes, scales = quantize_rows(vectors)
+        np.savez(cache_path, codes=codes, scales=scales)
+
+    index = LocalRuleIndex(rule_ids, vectors)
+    with _local_rule_index_lock:
+        _local_rule_index = (digest, index)
+    return index
+
+
 # =============================================================================
 # Neo4j Rule Queries
 # =============================================================================
@@ -381,41 +1198,201 @@ def search_rules_by_keywords(
     limit: int = 3
 ) -> List[str]:
     """Search Neo4j for rules matching keywords."""
-    # Build keyword list
-    type_keywords = COMPONENT_TYPE_KEYWORDS.get(component_type, [])
-    all_keywords = list(set([kw.upper() for kw in keywords] + [kw.upper() for kw in type_keywords]))
+    return search_rules_by_keywords_many(driver, [(component_type, keywords)], limit)[0]
 
-    if not all_keywords:
-        return []
 
-    query = """
-    WITH $keywords AS keywords
-    MATCH (r:Rule)
-    WHERE any(kw IN keywords WHERE
-        kw <> '' AND (
-            toUpper(coalesce(r.requirement,'')) CONTAINS kw OR
-            toUpper(coalesce(r.topic,'')) CONTAINS kw OR
-            toUpper(coalesce(r.section_title,'')) CONTAINS kw OR
-            toUpper(coalesce(r.attribute,'')) CONTAINS kw
-        )
-    )
-    RETURN DISTINCT r.id AS rule_id
+KEYWORD_FULLTEXT_QUERY = """
+UNWIND $searches AS search
+CALL {
+    WITH search
+    CALL db.index.fulltext.queryNodes($index, search.query) YIELD node
+    WITH node WHERE node.id IS NOT NULL
+    RETURN node.id AS rule_id
     LIMIT $limit
+}
+RETURN search.idx AS idx, collect(rule_id) AS rule_ids
+"""
+
+KEYWORD_SCAN_QUERY = """
+WITH $keywords AS keywords
+MATCH (r:Rule)
+WHERE any(kw IN keywords WHERE
+    kw <> '' AND (
+        toUpper(coalesce(r.requirement,'')) CONTAINS kw OR
+        toUpper(coalesce(r.topic,'')) CONTAINS kw OR
+        toUpper(coalesce(r.section_title,'')) CONTAINS kw OR
+        toUpper(coalesce(r.attribute,'')) CONTAINS kw
+    )
+)
+RETURN DISTINCT r.id AS rule_id
+LIMIT $limit
+"""
+
+
+def search_rules_by_keywords_many(
+    driver: Any,
+    searches: Sequence[tuple[str, Sequence[str]]],
+    limit: int = 3
+) -> List[List[str]]:
+    """
+    Run several (component_type, keywords) rule searches in one session and
+    read transaction. With the Rule full-text index they are sent as a single
+    query (best matches first); otherwise each is a substring scan.
     """
+    keyword_lists = []
+    for component_type, keywords in searches:
+        type_keywords = COMPONENT_TYPE_KEYWORDS.get(component_type, [])
+        keyword_lists.append(sorted(set([kw.upper() for kw in keywords] + [kw.upper() for kw in type_keywords])))
+
+    results: List[List[str]] = [[] for _ in searches]
+    fulltext = {}
+    scans = []
+    use_fulltext = rule_fulltext_index_ready(driver)
+    for idx, keyword_list in enumerate(keyword_lists):
+        lucene_query = lucene_keyword_query(keyword_list) if use_fulltext else ""
+        if lucene_query:
+            fulltext[idx] = lucene_query
+        elif any(keyword_list):
+            scans.append(idx)
+    if not fulltext and not scans:
+        return results
+
+    def run_searches(tx: Any) -> None:
+        if fulltext:
+            rows = tx.run(
+                KEYWORD_FULLTEXT_QUERY, index=RULE_FULLTEXT_INDEX, limit=limit,
+                searches=[{"idx": idx, "query": query} for idx, query in fulltext.items()]
+            )
+            for row in rows:
+                results[row["idx"]] = list(row["rule_ids"])
+        for idx in scans:
+            rows = tx.run(KEYWORD_SCAN_QUERY, keywords=keyword_lists[idx], limit=limit)
+            results[idx] = [row["rule_id"] for row in rows if row.get("rule_id")]
 
     with driver.session() as session:
-        rows = session.run(query, keywords=all_keywords, limit=limit)
-        return [row["rule_id"] for row in rows if row.get("rule_id")]
+        session.execute_read(run_searches)
+    return results
 
 
-def fetch_rules_by_ids(driver: Any, rule_ids: Sequence[str]) -> Dict[str, RuleDetail]:
-    """Fetch full rule details from Neo4j by rule IDs."""
+def component_search_keywords(component_type: str, component: Dict[str, Any]) -> tuple[str, List[str]]:
+    """(search type, keywords) for a component's Neo4j keyword search."""
+    if component_type == "room":
+        return "room", [component.get("room_type", ""), component.get("name", "")]
+    if component_type in ("setback", "geometric_setback"):
+        return "setback", ["setback", component.get("direction", "")]
+    if component_type == "opening":
+        return "opening", [component.get("opening_type", ""), "egress" if component.get("is_egress") else ""]
+    if component_type == "parking":
+        return "parking", ["parking", component.get("space_type", ""),
+                           "accessible" if component.get("accessible") else ""]
+    if component_type == "lot_info":
+        return "lot", ["lot", "site", "parcel", "area", "minimum lot size"]
+    if component_type == "water_feature":
+        return "water", ["water", "creek", "river", "stream", "setback", "riparian", "environmental"]
+    raise ValueError(f"No keyword search for component type {component_type!r}")
+
+
+def keyword_search_key(search_type: str, keywords: Sequence[str]) -> tuple:
+    """Searches with the same key return the same rules (keyword case and order don't matter)."""
+    return search_type, frozenset(kw.upper() for kw in keywords)
+
+
+def prefetch_keyword_rules(
+    driver: Any,
+    components_data: Dict[str, Any],
+    top_k: int
+) -> Dict[tuple, List[str]]:
+    """
+    Run the Neo4j keyword searches for all components up front, in one
+    transaction. Components with the same keywords (e.g. every window) share
+    one search. Returns rule ids keyed by keyword_search_key.
+    """
+    searches = {}
+    for component_type, component in iter_pinecone_components(components_data):
+        search_type, keywords = component_search_keywords(component_type, component)
+        searches.setdefault(keyword_search_key(search_type, keywords), (search_type, keywords))
+    if not searches:
+        return {}
+
+    results = search_rules_by_keywords_many(driver, list(searches.values()), limit=top_k)
+    return dict(zip(searches, results))
+
+
+def keyword_rules_for_component(
+    driver: Any,
+    component_type: str,
+    component: Dict[str, Any],
+    top_k: int,
+    keyword_cache: Dict[tuple, List[str]]
+) -> List[str]:
+    """Rule ids from a component's keyword search, prefetched where possible."""
+    search_type, keywords = component_search_keywords(component_type, component)
+    key = keyword_search_key(search_type, keywords)
+    if key not in keyword_cache:
+        keyword_cache[key] = search_rules_by_keywords(driver, search_type, keywords, limit=top_k)
+    return keyword_cache[key]
+
+
+RULE_FULLTEXT_INDEX = "rule_text"
+
+
+@functools.lru_cache(maxsize=None)
+def rule_fulltext_index_ready(driver: Any) -> bool:
+    """
+    Create the Rule full-text index if it doesn't exist and wait for it to
+    come online (once per driver). False if the database doesn't support it
+    or the user can't create indexes; keyword search then scans instead.
+    """
+    try:
+        with driver.session() as session:
+            session.run(
+                f"CREATE FULLTEXT INDEX {RULE_FULLTEXT_INDEX} IF NOT EXISTS FOR (r:Rule) "
+                "ON EACH [r.requirement, r.topic, r.section_title, r.attribute]"
+            ).consume()
+            session.run("CALL db.awaitIndex($name, 60)", name=RULE_FULLTEXT_INDEX).consume()
+        return True
+    except Exception as exc:
+        log(f"Rule full-text index unavailable, using substring keyword search: {exc}")
+        return False
+
+
+def lucene_keyword_query(keywords: Sequence[str]) -> str:
+    """
+    Lucene query matching any keyword: single words as prefixes (so "bedroom"
+    still matches "bedrooms"), multi-word keywords as phrases.
+    """
+    terms = []
+    for keyword in keywords:
+        words = re.sub(r"[^\w\s]", " ", keyword.lower()).split()
+        if len(words) == 1:
+            terms.append(f"{words[0]}*")
+        elif words:
+            terms.append('"' + " ".join(words) + '"')
+    return " OR ".join(terms)
+
+
+@functools.lru_cache(maxsize=None)
+def ensure_rule_id_index(driver: Any) -> None:
+    """Create the Rule.id index the rule fetch seeks on, if missing (once per driver)."""
+    try:
+        with driver.session() as session:
+            session.run("CREATE INDEX rule_id IF NOT EXISTS FOR (r:Rule) ON (r.id)").consume()
+    except Exception as exc:
+        # e.g. a uniqueness constraint already indexes Rule.id, or a read-only user
+        log(f"Could not create Rule.id index: {exc}")
+
+
+def fetch_rules_by_ids(driver: Any, rule_ids: Sequence[str],
+                       chunk_size: int = 1000) -> Dict[str, RuleDetail]:
+    """Fetch full rule details from Neo4j by rule IDs, chunk_size IDs per query in one session."""
+    rule_ids = list(dict.fromkeys(rule_ids))
     if not rule_ids:
         return {}
+    ensure_rule_id_index(driver)
 
     query = """
-    MATCH (r:Rule)
-    WHERE r.id IN $ids
+    UNWIND $ids AS rid
+    MATCH (r:Rule {id: rid})
     OPTIONAL MATCH (r)-[:APPLIES_TO]->(z:Zone)
     RETURN r.id AS rule_id,
            r.section_id AS section_id,
@@ -429,24 +1406,89 @@ def fetch_rules_by_ids(driver: Any, rule_ids: Sequence[str]) -> Dict[str, RuleDe
 
     details = {}
     with driver.session() as session:
-        result = session.run(query, ids=list(rule_ids))
-        for row in result:
-            rid = row.get("rule_id")
-            if rid:
-                details[rid] = RuleDetail(
-                    rule_id=rid,
-                    section_id=row.get("section_id"),
-                    section_title=row.get("section_title"),
-                    requirement=row.get("requirement"),
-                    topic=row.get("topic"),
-                    attribute=row.get("attribute"),
-                    value=row.get("value"),
-                    zones=[z for z in row.get("zones") or [] if z]
-                )
+        for start in range(0, len(rule_ids), chunk_size):
+            result = session.run(query, ids=rule_ids[start:start + chunk_size])
+            for row in result:
+                rid = row.get("rule_id")
+                if rid:
+                    details[rid] = RuleDetail(
+                        rule_id=rid,
+                        section_id=row.get("section_id"),
+                        section_title=row.get("section_title"),
+                        requirement=row.get("requirement"),
+                        topic=row.get("topic"),
+                        attribute=row.get("attribute"),
+                        value=row.get("value"),
+                        zones=[z for z in row.get("zones") or [] if z]
+                    )
 
     return details
 
 
+# Rule details fetched from Neo4j are snapshotted on disk per database, so
+# repeat runs over similar plans skip the fetch for rules already seen.
+# RULE_CACHE_TTL_HOURS=0 disables the cache
+RULE_CACHE_DIR = Path(__file__).resolve().parents[1] / ".cache" / "rules"
+RULE_CACHE_TTL_HOURS = float(os.getenv("RULE_CACHE_TTL_HOURS", "24"))
+RULE_DETAIL_FIELDS = ("rule_id", "section_id", "section_title", "requirement",
+                      "topic", "attribute", "value", "zones")
+
+# The snapshot last read or written by this process, with its rules already
+# built as RuleDetails, so repeat in-process runs skip the disk read and parse
+_rule_snapshot: Dict[str, Any] = {}
+_rule_snapshot_lock = threading.Lock()
+
+
+def rule_cache_path() -> Path:
+    """Rule snapshot file for the configured Neo4j database."""
+    digest = hashlib.sha256(os.getenv("NEO4J_URI", "").encode()).hexdigest()[:16]
+    return RULE_CACHE_DIR / f"{digest}.json"
+
+
+def fetch_rules_cached(driver: Any, rule_ids: Sequence[str]) -> Dict[str, RuleDetail]:
+    """
+    fetch_rules_by_ids, answered from the on-disk rule snapshot where possible
+    (kept in memory between runs in the same process). The snapshot expires
+    RULE_CACHE_TTL_HOURS after it was started, so rule edits in Neo4j are
+    picked up within that time.
+    """
+    if RULE_CACHE_TTL_HOURS <= 0:
+        return fetch_rules_by_ids(driver, rule_ids)
+
+    with _rule_snapshot_lock:
+        cache_path = rule_cache_path()
+        snapshot = _rule_snapshot.get(cache_path)
+        if snapshot is None or time.time() - snapshot["saved_at"] >= RULE_CACHE_TTL_HOURS * 3600:
+            snapshot = {"saved_at": time.time(), "rules": {}}
+            try:
+                cached = read_json(cache_path)
+                if time.time() - cached["saved_at"] < RULE_CACHE_TTL_HOURS * 3600:
+                    snapshot = cached
+            except (OSError, ValueError, KeyError, TypeError):
+                pass
+            snapshot["details"] = {rid: RuleDetail(**fields) for rid, fields in snapshot["rules"].items()}
+            _rule_snapshot[cache_path] = snapshot
+
+        cached_rules = snapshot["rules"]
+        details = snapshot["details"]
+        missing = [rid for rid in dict.fromkeys(rule_ids) if rid not in cached_rules]
+        if missing:
+            fetched = fetch_rules_by_ids(driver, missing)
+            for rid, rule in fetched.items():
+                cached_rules[rid] = {name: getattr(rule, name) for name in RULE_DETAIL_FIELDS}
+            details.update(fetched)
+            # Written to a temp file and renamed, so concurrent runs never read a partial file
+            tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+            try:
+                cache_path.parent.mkdir(parents=True, exist_ok=True)
+                write_json(tmp_path, {"saved_at": snapshot["saved_at"], "rules": cached_rules})
+                os.replace(tmp_path, cache_path)
+            except (OSError, TypeError) as exc:
+                log(f"Could not write rule cache: {exc}")
+
+        return {rid: details[rid] for rid in rule_ids if rid in details}
+
+
 # =============================================================================
 # Component-Specific Evaluation Logic
 # =============================================================================
@@ -463,13 +1505,13 @@ def evaluate_room_component(
     length = component.get("length")
 
     # Check if rule applies to this room type
-    requirement_upper = (rule.requirement or "").upper()
-    if room_type.upper() not in requirement_upper and "BEDROOM" not in requirement_upper:
+    requirement_upper = rule.requirement_upper
+    if room_type.upper() not in requirement_upper and not rule.keyword_flags & KW_BEDROOM:
         return None  # Rule doesn't apply
 
     # Extract expected value from rule
     expected_value = rule.value
-    attribute = (rule.attribute or "").lower()
+    attribute = rule.attribute_lower
 
     # Determine what to check
     actual_value = None
@@ -479,30 +1521,28 @@ def evaluate_room_component(
     if "area" in attribute or "size" in attribute:
         actual_value = area
         if area and expected_value:
-            try:
-                min_area = float(expected_value)
-                if area >= min_area:
-                    status = "PASS"
-                    notes.append(f"Room area {area} sq ft meets minimum {min_area} sq ft")
-                else:
-                    status = "FAIL"
-                    notes.append(f"Room area {area} sq ft below minimum {min_area} sq ft")
-            except (ValueError, TypeError):
+            min_area = rule.min_value
+            if min_area is None:
                 notes.append("Could not parse minimum area requirement")
+            elif area >= min_area:
+                status = "PASS"
+                notes.append(f"Room area {area} sq ft meets minimum {min_area} sq ft")
+            else:
+                status = "FAIL"
+                notes.append(f"Room area {area} sq ft below minimum {min_area} sq ft")
 
     elif "dimension" in attribute or "width" in attribute:
         actual_value = width or length
         if actual_value and expected_value:
-            try:
-                min_dim = float(expected_value)
-                if actual_value >= min_dim:
-                    status = "PASS"
-                    notes.append(f"Dimension {actual_value} ft meets minimum {min_dim} ft")
-                else:
-                    status = "FAIL"
-                    notes.append(f"Dimension {actual_value} ft below minimum {min_dim} ft")
-            except (ValueError, TypeError):
+            min_dim = rule.min_value
+            if min_dim is None:
                 notes.append("Could not parse minimum dimension requirement")
+            elif actual_value >= min_dim:
+                status = "PASS"
+                notes.append(f"Dimension {actual_value} ft meets minimum {min_dim} ft")
+            else:
+                status = "FAIL"
+                notes.append(f"Dimension {actual_value} ft below minimum {min_dim} ft")
 
     else:
         notes.append("Rule attribute not directly measurable from extracted data")
@@ -520,7 +1560,7 @@ def evaluate_room_component(
         actual_value=actual_value,
         status=status,
         confidence=candidate.score or 0.5,
-        notes=notes,
+        notes=tuple(notes),
         zones=rule.zones,
         source=candidate.source
     )
@@ -537,13 +1577,11 @@ def evaluate_setback_component(
     distance = component.get("avg_distance" if is_geometric else "distance")
 
     # Check if rule applies to this setback direction
-    requirement_upper = (rule.requirement or "").upper()
     direction_upper = direction.upper()
 
     # Match direction
-    if "FRONT" in direction_upper and "FRONT" not in requirement_upper:
-        if "SIDE" not in requirement_upper and "REAR" not in requirement_upper:
-            return None
+    if "FRONT" in direction_upper and not rule.keyword_flags & (KW_FRONT | KW_SIDE | KW_REAR):
+        return None
 
     # Extract minimum setback from rule
     expected_value = rule.value
@@ -551,16 +1589,15 @@ def evaluate_setback_component(
     notes = []
 
     if distance is not None and expected_value:
-        try:
-            min_setback = float(expected_value)
-            if distance >= min_setback:
-                status = "PASS"
-                notes.append(f"{direction} setback {distance:.1f} ft meets minimum {min_setback} ft")
-            else:
-                status = "FAIL"
-                notes.append(f"{direction} setback {distance:.1f} ft below minimum {min_setback} ft")
-        except (ValueError, TypeError):
+        min_setback = rule.min_value
+        if min_setback is None:
             notes.append("Could not parse minimum setback requirement")
+        elif distance >= min_setback:
+            status = "PASS"
+            notes.append(f"{direction} setback {distance:.1f} ft meets minimum {min_setback} ft")
+        else:
+            status = "FAIL"
+            notes.append(f"{direction} setback {distance:.1f} ft below minimum {min_setback} ft")
     else:
         notes.append("Setback distance or requirement value missing")
 
@@ -579,7 +1616,7 @@ def evaluate_setback_component(
         actual_value=distance,
         status=status,
         confidence=candidate.score or 0.7,
-        notes=notes,
+        notes=tuple(notes),
         zones=rule.zones,
         source=candidate.source
     )
@@ -595,12 +1632,10 @@ def evaluate_opening_component(
     width = component.get("width")
     is_egress = component.get("is_egress", False)
 
-    requirement_upper = (rule.requirement or "").upper()
-
     # Check if rule applies
-    if opening_type == "door" and "DOOR" not in requirement_upper:
+    if opening_type == "door" and not rule.keyword_flags & KW_DOOR:
         return None
-    if is_egress and "EGRESS" not in requirement_upper and "EXIT" not in requirement_upper:
+    if is_egress and not rule.keyword_flags & (KW_EGRESS | KW_EXIT):
         return None
 
     expected_value = rule.value
@@ -608,16 +1643,15 @@ def evaluate_opening_component(
     notes = []
 
     if width is not None and expected_value:
-        try:
-            min_width = float(expected_value)
-            if width >= min_width:
-                status = "PASS"
-                notes.append(f"{opening_type} width {width} ft meets minimum {min_width} ft")
-            else:
-                status = "FAIL"
-                notes.append(f"{opening_type} width {width} ft below minimum {min_width} ft")
-        except (ValueError, TypeError):
+        min_width = rule.min_value
+        if min_width is None:
             notes.append("Could not parse minimum width requirement")
+        elif width >= min_width:
+            status = "PASS"
+            notes.append(f"{opening_type} width {width} ft meets minimum {min_width} ft")
+        else:
+            status = "FAIL"
+            notes.append(f"{opening_type} width {width} ft below minimum {min_width} ft")
 
     return ComplianceEvaluation(
         component_id=f"opening_{opening_type}_{component.get('location', ['0','0'])[0]}",
@@ -632,7 +1666,7 @@ def evaluate_opening_component(
         actual_value=width,
         status=status,
         confidence=candidate.score or 0.6,
-        notes=notes,
+        notes=tuple(notes),
         zones=rule.zones,
         source=candidate.source
     )
@@ -648,40 +1682,36 @@ def evaluate_parking_component(
     length = component.get("length")
     accessible = component.get("accessible", False)
 
-    requirement_upper = (rule.requirement or "").upper()
-
     # Check if rule applies to accessible parking
-    if accessible and "ACCESSIBLE" not in requirement_upper and "ADA" not in requirement_upper:
+    if accessible and not rule.keyword_flags & (KW_ACCESSIBLE | KW_ADA):
         return None
 
     expected_value = rule.value
-    attribute = (rule.attribute or "").lower()
+    attribute = rule.attribute_lower
     status = "REVIEW"
     notes = []
 
     if "width" in attribute and width is not None and expected_value:
-        try:
-            min_width = float(expected_value)
-            if width >= min_width:
-                status = "PASS"
-                notes.append(f"Parking width {width} ft meets minimum {min_width} ft")
-            else:
-                status = "FAIL"
-                notes.append(f"Parking width {width} ft below minimum {min_width} ft")
-        except (ValueError, TypeError):
+        min_width = rule.min_value
+        if min_width is None:
             notes.append("Could not parse minimum width")
+        elif width >= min_width:
+            status = "PASS"
+            notes.append(f"Parking width {width} ft meets minimum {min_width} ft")
+        else:
+            status = "FAIL"
+            notes.append(f"Parking width {width} ft below minimum {min_width} ft")
 
     elif "length" in attribute and length is not None and expected_value:
-        try:
-            min_length = float(expected_value)
-            if length >= min_length:
-                status = "PASS"
-                notes.append(f"Parking length {length} ft meets minimum {min_length} ft")
-            else:
-                status = "FAIL"
-                notes.append(f"Parking length {length} ft below minimum {min_length} ft")
-        except (ValueError, TypeError):
+        min_length = rule.min_value
+        if min_length is None:
             notes.append("Could not parse minimum length")
+        elif length >= min_length:
+            status = "PASS"
+            notes.append(f"Parking length {length} ft meets minimum {min_length} ft")
+        else:
+            status = "FAIL"
+            notes.append(f"Parking length {length} ft below minimum {min_length} ft")
 
     return ComplianceEvaluation(
         component_id=f"parking_{component.get('space_type', 'unknown')}",
@@ -696,7 +1726,7 @@ def evaluate_parking_component(
         actual_value={"width": width, "length": length},
         status=status,
         confidence=candidate.score or 0.6,
-        notes=notes,
+        notes=tuple(notes),
         zones=rule.zones,
         source=candidate.source
     )
@@ -714,24 +1744,22 @@ def evaluate_lot_info_component(
     boundary_dims = component.get("boundary_dimensions", [])
 
     expected_value = rule.value
-    attribute = (rule.attribute or "").lower()
-    requirement_upper = (rule.requirement or "").upper()
+    attribute = rule.attribute_lower
     status = "REVIEW"
     notes = []
 
     # Check minimum lot size requirements
-    if "area" in attribute or "SIZE" in requirement_upper:
+    if "area" in attribute or rule.keyword_flags & KW_SIZE:
         if lot_area and expected_value:
-            try:
-                min_area = float(expected_value)
-                if lot_area >= min_area:
-                    status = "PASS"
-                    notes.append(f"Lot area {lot_area} {lot_area_unit} meets minimum {min_area} {lot_area_unit}")
-                else:
-                    status = "FAIL"
-                    notes.append(f"Lot area {lot_area} {lot_area_unit} below minimum {min_area} {lot_area_unit}")
-            except (ValueError, TypeError):
+            min_area = rule.min_value
+            if min_area is None:
                 notes.append("Could not parse minimum area requirement")
+            elif lot_area >= min_area:
+                status = "PASS"
+                notes.append(f"Lot area {lot_area} {lot_area_unit} meets minimum {min_area} {lot_area_unit}")
+            else:
+                status = "FAIL"
+                notes.append(f"Lot area {lot_area} {lot_area_unit} below minimum {min_area} {lot_area_unit}")
         else:
             notes.append("Lot area not specified on plan")
 
@@ -748,7 +1776,7 @@ def evaluate_lot_info_component(
         actual_value={"area": lot_area, "unit": lot_area_unit, "dimensions_count": len(boundary_dims)},
         status=status,
         confidence=candidate.score or 0.6,
-        notes=notes,
+        notes=tuple(notes),
         zones=rule.zones,
         source=candidate.source
     )
@@ -763,15 +1791,14 @@ def evaluate_water_feature_component(
     feature_type = component.get("feature_type", "")
     feature_name = component.get("name", "")
 
-    requirement_upper = (rule.requirement or "").upper()
     expected_value = rule.value
     status = "REVIEW"
     notes = []
 
     # Check if this rule applies to this type of water feature
-    if "CREEK" in requirement_upper and feature_type != "creek":
+    if rule.keyword_flags & KW_CREEK and feature_type != "creek":
         return None
-    if "RIVER" in requirement_upper and feature_type != "river":
+    if rule.keyword_flags & KW_RIVER and feature_type != "river":
         return None
 
     # Water feature rules typically require manual review for environmental compliance
@@ -791,7 +1818,7 @@ def evaluate_water_feature_component(
         actual_value={"type": feature_type, "name": feature_name},
         status=status,
         confidence=candidate.score or 0.5,
-        notes=notes,
+        notes=tuple(notes),
         zones=rule.zones,
         source=candidate.source
     )
@@ -801,17 +1828,52 @@ def evaluate_water_feature_component(
 # Main Processing Logic
 # =============================================================================
 
+# Component kinds in the order process_components checks them on each sheet
+COMPONENT_KINDS: List[ComponentKind] = [
+    ComponentKind("rooms", "room", evaluate_room_component,
+                  lambda room: f"room {room.get('name')}", progress="Rooms"),
+    ComponentKind("geometric_setbacks", "geometric_setback",
+                  functools.partial(evaluate_setback_component, is_geometric=True),
+                  lambda setback: f"setback {setback.get('direction')}", progress="Setbacks"),
+    ComponentKind("openings", "opening", evaluate_opening_component,
+                  lambda opening: f"opening {opening.get('opening_type')}", progress="Openings"),
+    ComponentKind("parking", "parking", evaluate_parking_component,
+                  lambda parking: "parking", progress="Parking"),
+    ComponentKind("lot_info", "lot_info", evaluate_lot_info_component,
+                  lambda lot_info: "lot info", single=True),
+    ComponentKind("water_features", "water_feature", evaluate_water_feature_component,
+                  lambda water_feature: "water feature"),
+]
+
+
+def sheet_components(sheet: Dict[str, Any], kind: ComponentKind) -> List[Dict[str, Any]]:
+    """The components of one kind on a sheet."""
+    if kind.single:
+        return [sheet[kind.sheet_key]] if sheet.get(kind.sheet_key) else []
+    return sheet.get(kind.sheet_key, [])
+
+
 def process_components(
     components_data: Dict[str, Any],
     driver: Any,
     pinecone_client: Optional[Pinecone],
     openai_client: Optional[OpenAI],
     pinecone_index: str,
-    top_k: int
-) -> List[ComplianceEvaluation]:
-    """Process all components and evaluate against rules."""
+    top_k: int,
+    concurrency: int = 16,
+    relevance_high: float = RELEVANCE_SCORE_HIGH,
+    relevance_low: float = RELEVANCE_SCORE_LOW
+) -> tuple[List[ComplianceEvaluation], Dict[str, int]]:
+    """
+    Process all components and evaluate against rules. concurrency bounds
+    the Pinecone queries and relevance LLM calls in flight at once;
+    relevance_high/low are the Pinecone scores that settle relevance
+    without further checks (see pinecone_score_verdict). Returns the
+    evaluations and counts of how their relevance was decided.
+    """
     evaluations = []
-    embed_cache = {}
+    pending: List[PendingEvaluation] = []
+    embed_cache = get_embedding_store() or {}
 
     # Check if enriched data is available
     has_enrichment = "llm_enrichment" in components_data
@@ -860,227 +1922,98 @@ def process_components(
             plan_context = "building_plan"
             log(f"Detected BUILDING PLAN")
 
+    # Batch the Pinecone lookups and the Neo4j keyword searches for every
+    # component before the per-component loop; the two run side by side
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        keyword_future = executor.submit(prefetch_keyword_rules, driver, components_data, top_k)
+        pinecone_cache = prefetch_pinecone_candidates(
+            components_data, pinecone_client, openai_client,
+            pinecone_index, top_k, embed_cache, max_workers=concurrency
+        )
+        keyword_cache = keyword_future.result()
+
     for sheet in components_data.get("sheets", []):
         sheet_num = sheet.get("sheet_number", 1)
 
-        # Process rooms
-        for room in tqdm(sheet.get("rooms", []), desc=f"Sheet {sheet_num} - Rooms"):
-            candidates = []
-
-            # Query Pinecone
-            if pinecone_client:
-                candidates.extend(query_pinecone_for_component(
-                    "room", room, pinecone_client, openai_client,
-                    pinecone_index, top_k, embed_cache
-                ))
-
-            # Query Neo4j by keywords
-            keywords = [room.get("room_type", ""), room.get("name", "")]
-            neo4j_rules = search_rules_by_keywords(driver, "room", keywords, limit=top_k)
-            for rid in neo4j_rules:
-                if rid not in {c.rule_id for c in candidates}:
-                    candidates.append(RuleCandidate(rule_id=rid, source="neo4j_keyword"))
-
-            # Fetch rule details and evaluate
-            if candidates:
-                rule_ids = [c.rule_id for c in candidates]
-                rules = fetch_rules_by_ids(driver, rule_ids)
-
-                for candidate in candidates:
-                    if candidate.rule_id in rules:
-                        rule = rules[candidate.rule_id]
-
-                        # Check relevance with LLM
-                        is_relevant, relevance_conf, reasoning = check_rule_relevance(
-                            "room", room, rule, openai_client, plan_context
-                        )
-
-                        if not is_relevant:
-                            log(f"  Filtered irrelevant rule {rule.rule_id} for room {room.get('name')}: {reasoning}")
-                            continue
-
-                        eval_result = evaluate_room_component(room, rule, candidate)
-                        if eval_result:
-                            evaluations.append(eval_result)
-
-        # Process geometric setbacks
-        for setback in tqdm(sheet.get("geometric_setbacks", []), desc=f"Sheet {sheet_num} - Setbacks"):
-            candidates = []
-
-            # Query Pinecone
-            if pinecone_client:
-                candidates.extend(query_pinecone_for_component(
-                    "setback", setback, pinecone_client, openai_client,
-                    pinecone_index, top_k, embed_cache
-                ))
-
-            # Query Neo4j
-            keywords = ["setback", setback.get("direction", "")]
-            neo4j_rules = search_rules_by_keywords(driver, "setback", keywords, limit=top_k)
-            for rid in neo4j_rules:
-                if rid not in {c.rule_id for c in candidates}:
-                    candidates.append(RuleCandidate(rule_id=rid, source="neo4j_keyword"))
-
-            # Evaluate
-            if candidates:
-                rules = fetch_rules_by_ids(driver, [c.rule_id for c in candidates])
+        for kind in COMPONENT_KINDS:
+            components = sheet_components(sheet, kind)
+            if kind.progress:
+                components = tqdm(components, desc=f"Sheet {sheet_num} - {kind.progress}", disable=None)
+
+            for component in components:
+                candidates = []
+
+                # Query Pinecone
+                if pinecone_client:
+                    candidates.extend(query_pinecone_for_component(
+                        kind.component_type, component, pinecone_client, openai_client,
+                        pinecone_index, top_k, embed_cache, pinecone_cache
+                    ))
+
+                # Query Neo4j by keywords
+                neo4j_rules = keyword_rules_for_component(driver, kind.component_type, component, top_k, keyword_cache)
+                seen = {c.rule_id for c in candidates}
+                for rid in neo4j_rules:
+                    if rid not in seen:
+                        seen.add(rid)
+                        candidates.append(RuleCandidate(rule_id=rid, source="neo4j_keyword"))
+
+                # Queue for rule details, relevance check and evaluation
+                label = kind.label(component)
                 for candidate in candidates:
-                    if candidate.rule_id in rules:
-                        rule = rules[candidate.rule_id]
-
-                        # Check relevance
-                        is_relevant, relevance_conf, reasoning = check_rule_relevance(
-                            "geometric_setback", setback, rule, openai_client, plan_context
-                        )
-
-                        if not is_relevant:
-                            log(f"  Filtered irrelevant rule {rule.rule_id} for setback {setback.get('direction')}: {reasoning}")
-                            continue
-
-                        eval_result = evaluate_setback_component(setback, rule, candidate, is_geometric=True)
-                        if eval_result:
-                            evaluations.append(eval_result)
-
-        # Process openings
-        for opening in tqdm(sheet.get("openings", []), desc=f"Sheet {sheet_num} - Openings"):
-            candidates = []
-
-            if pinecone_client:
-                candidates.extend(query_pinecone_for_component(
-                    "opening", opening, pinecone_client, openai_client,
-                    pinecone_index, top_k, embed_cache
-                ))
-
-            keywords = [opening.get("opening_type", ""), "egress" if opening.get("is_egress") else ""]
-            neo4j_rules = search_rules_by_keywords(driver, "opening", keywords, limit=top_k)
-            for rid in neo4j_rules:
-                if rid not in {c.rule_id for c in candidates}:
-                    candidates.append(RuleCandidate(rule_id=rid, source="neo4j_keyword"))
-
-            if candidates:
-                rules = fetch_rules_by_ids(driver, [c.rule_id for c in candidates])
-                for candidate in candidates:
-                    if candidate.rule_id in rules:
-                        rule = rules[candidate.rule_id]
-
-                        # Check relevance
-                        is_relevant, relevance_conf, reasoning = check_rule_relevance(
-                            "opening", opening, rule, openai_client, plan_context
-                        )
-
-                        if not is_relevant:
-                            log(f"  Filtered irrelevant rule {rule.rule_id} for opening {opening.get('opening_type')}: {reasoning}")
-                            continue
-
-                        eval_result = evaluate_opening_component(opening, rule, candidate)
-                        if eval_result:
-                            evaluations.append(eval_result)
-
-        # Process parking
-        for parking in tqdm(sheet.get("parking", []), desc=f"Sheet {sheet_num} - Parking"):
-            candidates = []
-
-            if pinecone_client:
-                candidates.extend(query_pinecone_for_component(
-                    "parking", parking, pinecone_client, openai_client,
-                    pinecone_index, top_k, embed_cache
-                ))
-
-            keywords = ["parking", parking.get("space_type", ""), "accessible" if parking.get("accessible") else ""]
-            neo4j_rules = search_rules_by_keywords(driver, "parking", keywords, limit=top_k)
-            for rid in neo4j_rules:
-                if rid not in {c.rule_id for c in candidates}:
-                    candidates.append(RuleCandidate(rule_id=rid, source="neo4j_keyword"))
-
-            if candidates:
-                rules = fetch_rules_by_ids(driver, [c.rule_id for c in candidates])
-                for candidate in candidates:
-                    if candidate.rule_id in rules:
-                        rule = rules[candidate.rule_id]
-
-                        # Check relevance
-                        is_relevant, relevance_conf, reasoning = check_rule_relevance(
-                            "parking", parking, rule, openai_client, plan_context
-                        )
-
-                        if not is_relevant:
-                            log(f"  Filtered irrelevant rule {rule.rule_id} for parking: {reasoning}")
-                            continue
-
-                        eval_result = evaluate_parking_component(parking, rule, candidate)
-                        if eval_result:
-                            evaluations.append(eval_result)
-
-        # Process lot information
-        lot_info = sheet.get("lot_info")
-        if lot_info:
-            candidates = []
-
-            if pinecone_client:
-                candidates.extend(query_pinecone_for_component(
-                    "lot_info", lot_info, pinecone_client, openai_client,
-                    pinecone_index, top_k, embed_cache
-                ))
-
-            keywords = ["lot", "site", "parcel", "area", "minimum lot size"]
-            neo4j_rules = search_rules_by_keywords(driver, "lot", keywords, limit=top_k)
-            for rid in neo4j_rules:
-                if rid not in {c.rule_id for c in candidates}:
-                    candidates.append(RuleCandidate(rule_id=rid, source="neo4j_keyword"))
-
-            if candidates:
-                rules = fetch_rules_by_ids(driver, [c.rule_id for c in candidates])
-                for candidate in candidates:
-                    if candidate.rule_id in rules:
-                        rule = rules[candidate.rule_id]
-
-                        is_relevant, relevance_conf, reasoning = check_rule_relevance(
-                            "lot_info", lot_info, rule, openai_client, plan_context
-                        )
-
-                        if not is_relevant:
-                            log(f"  Filtered irrelevant rule {rule.rule_id} for lot info: {reasoning}")
-                            continue
-
-                        eval_result = evaluate_lot_info_component(lot_info, rule, candidate)
-                        if eval_result:
-                            evaluations.append(eval_result)
-
-        # Process water features
-        for water_feature in sheet.get("water_features", []):
-            candidates = []
-
-            if pinecone_client:
-                candidates.extend(query_pinecone_for_component(
-                    "water_feature", water_feature, pinecone_client, openai_client,
-                    pinecone_index, top_k, embed_cache
-                ))
-
-            keywords = ["water", "creek", "river", "stream", "setback", "riparian", "environmental"]
-            neo4j_rules = search_rules_by_keywords(driver, "water", keywords, limit=top_k)
-            for rid in neo4j_rules:
-                if rid not in {c.rule_id for c in candidates}:
-                    candidates.append(RuleCandidate(rule_id=rid, source="neo4j_keyword"))
-
-            if candidates:
-                rules = fetch_rules_by_ids(driver, [c.rule_id for c in candidates])
-                for candidate in candidates:
-                    if candidate.rule_id in rules:
-                        rule = rules[candidate.rule_id]
-
-                        is_relevant, relevance_conf, reasoning = check_rule_relevance(
-                            "water_feature", water_feature, rule, openai_client, plan_context
-                        )
-
-                        if not is_relevant:
-                            log(f"  Filtered irrelevant rule {rule.rule_id} for water feature: {reasoning}")
-                            continue
+                    pending.append(PendingEvaluation(
+                        kind.component_type, component, candidate, kind.evaluate, label
+                    ))
+
+    # Fetch the details of every candidate rule in one Neo4j round trip (or
+    # from the rule snapshot); candidates whose rule isn't in Neo4j are dropped
+    rules = fetch_rules_cached(driver, [item.candidate.rule_id for item in pending])
+    pending = [item for item in pending if item.candidate.rule_id in rules]
+    for item in pending:
+        item.rule = rules[item.candidate.rule_id]
+
+    # Evaluate before checking relevance: evaluation is cheap and local, and
+    # pairs the evaluator rejects outright (e.g. a rule not about doors for a
+    # door) never reach the report, so they need no relevance check
+    for item in pending:
+        item.result = item.evaluate(item.component, item.rule, item.candidate)
+    pending = [item for item in pending if item.result]
+
+    # Check relevance for the remaining pairs: clear-cut pairs are decided by
+    # Pinecone score or embedding similarity, the rest in a few batched LLM
+    # calls. Evaluations of the relevant ones are kept in the original order
+    pairs = [(item.component_type, item.component, item.rule) for item in pending]
+    verdicts = [pinecone_score_verdict(item.candidate, relevance_high, relevance_low) for item in pending]
+    unscored = [idx for idx, verdict in enumerate(verdicts) if verdict is None]
+    gate_verdicts = embedding_relevance_gate([pairs[idx] for idx in unscored], openai_client, embed_cache)
+    for idx, verdict in zip(unscored, gate_verdicts):
+        verdicts[idx] = verdict
+    ambiguous = [idx for idx, verdict in enumerate(verdicts) if verdict is None]
+    relevance_stats = {
+        "pairs_checked": len(pending),
+        "shortcut_count": len(pending) - len(unscored),
+        "embedding_gate_count": len(unscored) - len(ambiguous),
+        "llm_count": len(ambiguous),
+    }
+    log(f"Checking relevance of {len(pending)} component/rule pairs "
+        f"({relevance_stats['shortcut_count']} decided by Pinecone score, "
+        f"{relevance_stats['embedding_gate_count']} by embedding similarity)...")
+    llm_verdicts = check_rules_relevance_batch(
+        [pairs[idx] for idx in ambiguous],
+        openai_client,
+        plan_context,
+        max_workers=concurrency
+    )
+    for idx, verdict in zip(ambiguous, llm_verdicts):
+        verdicts[idx] = verdict
 
-                        eval_result = evaluate_water_feature_component(water_feature, rule, candidate)
-                        if eval_result:
-                            evaluations.append(eval_result)
+    for item, (is_relevant, relevance_conf, reasoning) in zip(pending, verdicts):
+        if not is_relevant:
+            log(f"  Filtered irrelevant rule {item.rule.rule_id} for {item.label}: {reasoning}")
+            continue
+        evaluations.append(item.result)
 
-    return evaluations
+    return evaluations, relevance_stats
 
 
 # =============================================================================
@@ -1089,16 +2022,19 @@ def process_components(
 
 def build_compliance_report(
     plan_name: str,
-    evaluations: List[ComplianceEvaluation]
+    evaluations: List[ComplianceEvaluation],
+    relevance_stats: Optional[Dict[str, int]] = None
 ) -> Dict[str, Any]:
-    """Build the compliance report JSON."""
+    """
+    Build the compliance report JSON. relevance_stats (from
+    process_components) records how many pairs were decided by Pinecone
+    score, embedding similarity and the LLM.
+    """
+    # Serialize evaluations, tallying statuses in the same pass
     status_counts = defaultdict(int)
-    for eval in evaluations:
-        status_counts[eval.status] += 1
-
-    # Serialize evaluations
     eval_dicts = []
     for eval in evaluations:
+        status_counts[eval.status] += 1
         eval_dicts.append({
             "component_id": eval.component_id,
             "component_type": eval.component_type,
@@ -1112,7 +2048,7 @@ def build_compliance_report(
             "actual_value": eval.actual_value,
             "status": eval.status,
             "confidence": round(eval.confidence, 3),
-            "notes": eval.notes,
+            "notes": list(eval.notes),
             "zones": eval.zones,
             "source": eval.source
         })
@@ -1123,7 +2059,8 @@ def build_compliance_report(
         "summary": {
             "total_evaluations": len(evaluations),
             "status_breakdown": dict(status_counts),
-            "pass_rate": round(status_counts["PASS"] / len(evaluations) * 100, 1) if evaluations else 0
+            "pass_rate": round(status_counts["PASS"] / len(evaluations) * 100, 1) if evaluations else 0,
+            "relevance_checks": dict(relevance_stats or {})
         },
         "evaluations": eval_dicts
     }
@@ -1133,6 +2070,23 @@ def build_compliance_report(
 # CLI Entry Point
 # =============================================================================
 
+def read_json(path: Path) -> Any:
+    """Load a JSON file, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(Path(path).read_bytes())
+    with open(path) as f:
+        return json.load(f)
+
+
+def write_json(path: Path, data: Any) -> None:
+    """Write data as indented JSON, using orjson when it is installed."""
+    if orjson is not None:
+        Path(path).write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        return
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
+
+
 def load_environment() -> None:
     """Load environment variables from .env file."""
     root = Path(__file__).resolve().parents[1]
@@ -1143,7 +2097,7 @@ def load_environment() -> None:
         log(f"Loaded environment from {env_path}")
 
 
-def parse_args() -> argparse.Namespace:
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
     """Parse command line arguments."""
     parser = argparse.ArgumentParser(description="Component-based compliance checking")
     parser.add_argument("--components", required=True, help="Path to components JSON")
@@ -1151,48 +2105,67 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--top-k", type=int, default=2, help="Top rules per component")
     parser.add_argument("--output", help="Output path for compliance JSON")
     parser.add_argument("--writeback", action="store_true", help="Write results to Neo4j")
-    return parser.parse_args()
+    parser.add_argument("--concurrency", type=int, default=16,
+                        help="Maximum Pinecone queries / LLM calls in flight at once")
+    parser.add_argument("--relevance-high", type=float, default=RELEVANCE_SCORE_HIGH,
+                        help="Pinecone score at or above which a rule is relevant without an LLM check")
+    parser.add_argument("--relevance-low", type=float, default=RELEVANCE_SCORE_LOW,
+                        help="Pinecone score at or below which a rule is irrelevant without an LLM check")
+    return parser.parse_args(argv)
 
 
-def main():
-    """Main execution."""
-    args = parse_args()
+def check_components(components_data: Dict[str, Any], args: argparse.Namespace) -> Dict[str, Any]:
+    """
+    Check an in-memory components dict and return the compliance report;
+    compliCheckV2 calls this directly. args.components only names the plan
+    when the components have no pdf_name.
+    """
     load_environment()
 
-    # Load components
-    components_path = Path(args.components)
-    if not components_path.exists():
-        raise FileNotFoundError(f"Components file not found: {components_path}")
-
-    log(f"Loading components from {components_path.name}...")
-    with components_path.open() as f:
-        components_data = json.load(f)
-
-    plan_name = components_data.get("pdf_name", components_path.stem)
+    plan_name = components_data.get("pdf_name", Path(args.components).stem)
 
     # Initialize connections
     log("Connecting to databases...")
     driver = get_neo4j_driver()
-    pinecone_client = get_pinecone_client()
     openai_client = get_openai_client()
+    if VECTOR_BACKEND == "local":
+        pinecone_client = build_local_rule_index(driver, openai_client)
+    else:
+        pinecone_client = get_pinecone_client()
 
     if not pinecone_client:
         log("⚠️  Proceeding with Neo4j keyword search only (no Pinecone)")
 
     # Process components
     log("Evaluating components against rules...")
-    evaluations = process_components(
+    evaluations, relevance_stats = process_components(
         components_data,
         driver,
         pinecone_client,
         openai_client,
         args.pinecone_index,
-        args.top_k
+        args.top_k,
+        max(1, args.concurrency),
+        args.relevance_high,
+        args.relevance_low
     )
 
     # Build report
     log("Building compliance report...")
-    report = build_compliance_report(plan_name, evaluations)
+    return build_compliance_report(plan_name, evaluations, relevance_stats)
+
+
+def run(args: argparse.Namespace) -> int:
+    """Check compliance for parsed CLI args."""
+    # Load components
+    components_path = Path(args.components)
+    if not components_path.exists():
+        raise FileNotFoundError(f"Components file not found: {components_path}")
+
+    log(f"Loading components from {components_path.name}...")
+    components_data = read_json(components_path)
+
+    report = check_components(components_data, args)
 
     # Save output
     if args.output:
@@ -1200,8 +2173,7 @@ def main():
     else:
         output_path = components_path.with_name(components_path.stem.replace("_components", "_compliance.json"))
 
-    with output_path.open("w") as f:
-        json.dump(report, f, indent=2)
+    write_json(output_path, report)
 
     log(f"✅ Compliance report saved to {output_path}")
     log(f"\nSummary:")
@@ -1209,7 +2181,12 @@ def main():
     log(f"  Status Breakdown: {report['summary']['status_breakdown']}")
     log(f"  Pass Rate: {report['summary']['pass_rate']}%")
 
-    driver.close()
+    return 0
+
+
+def main():
+    """Main execution."""
+    return run(parse_args())
 
 
 if __name__ == "__main__":
@@ -15,6 +15,10 @@ Optional flags:
     --region us-east-1              # AWS region
     --model-id anthropic.claude-3-sonnet-20240229-v1:0  # Bedrock model
     --max-results 5                 # Max KB search results per component
+    --kb-cache-ttl 3600             # Seconds to reuse KB results for a repeated query (0 disables)
+    --concurrency 16                # Upper bound on Bedrock requests in flight
+    --batch                         # Evaluate via a Bedrock batch inference job (needs
+                                    # --batch-s3-uri and --batch-role-arn, IAM credentials)
     --output path/to/output.json    # Custom output path
 
 Output:
@@ -25,6 +29,8 @@ Environment Variables Required:
     BEDROCK_KB_ID (if not passed via --kb-id)
     BEDROCK_REGION (optional, default: us-east-1)
     BEDROCK_MODEL_ID (optional, default: anthropic.claude-3-sonnet-20240229-v1:0)
+    BEDROCK_EVALUATION_BATCH_SIZE (optional, default: 6; same-type components per Claude call)
+    BEDROCK_KB_TARGET_LATENCY / BEDROCK_MODEL_TARGET_LATENCY (optional, default: 5 / 60 seconds)
 """
 
 from __future__ import annotations
@@ -32,31 +38,32 @@ from __future__ import annotations
 import argparse
 import json
 import os
+import re
 import sys
 import base64
 import hmac
 import hashlib
-from collections import defaultdict
+import threading
+import time
+from collections import OrderedDict, defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, asdict
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 from urllib.parse import urlparse
 
-try:
-    import boto3
-    from botocore.exceptions import ClientError
-    BOTO3_AVAILABLE = True
-except ImportError:
-    BOTO3_AVAILABLE = False
-    print("[WARNING] boto3 not installed. Install with: pip install boto3")
-
 try:
     from dotenv import load_dotenv
     load_dotenv()
 except ImportError:
     pass
 
+try:
+    import orjson
+except ImportError:
+    orjson = None  # falls back to the stdlib json module
+
 
 # =============================================================================
 # Configuration
@@ -65,6 +72,15 @@ except ImportError:
 DEFAULT_REGION = os.getenv('BEDROCK_REGION', 'us-east-1')
 DEFAULT_KB_ID = os.getenv('BEDROCK_KB_ID')
 DEFAULT_MODEL_ID = os.getenv('BEDROCK_MODEL_ID', 'anthropic.claude-3-sonnet-20240229-v1:0')
+
+# Body of the first markdown code block (```json or plain ```) in a model response
+CODE_BLOCK_PATTERN = re.compile(r'```(?:json)?\s*(.*?)```', re.DOTALL)
+# Outermost JSON object in a model response with prose around it
+JSON_OBJECT_PATTERN = re.compile(r'\{.*\}', re.DOTALL)
+# Outermost JSON array, for batched responses
+JSON_ARRAY_PATTERN = re.compile(r'\[.*\]', re.DOTALL)
+# Same-type components evaluated together in one Claude call (1 disables batching)
+EVALUATION_BATCH_SIZE = max(1, int(os.getenv('BEDROCK_EVALUATION_BATCH_SIZE', '6')))
 # Try both environment variable names
 BEDROCK_API_KEY = os.getenv('AWS_BEARER_TOKEN_BEDROCK') or os.getenv('BEDROCK_API_KEY')
 
@@ -84,8 +100,13 @@ def error(msg: str) -> None:
 # =============================================================================
 # Data Models
 # =============================================================================
+# Slotted to drop the per-instance __dict__; dataclass(slots=True) needs
+# Python 3.10+, older versions keep plain classes
+
+DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
 
-@dataclass
+@dataclass(frozen=True, **DATACLASS_SLOTS)
 class KBSearchResult:
     """Result from Bedrock Knowledge Base search."""
     content: str
@@ -94,7 +115,7 @@ class KBSearchResult:
     metadata: Dict[str, Any]
 
 
-@dataclass
+@dataclass(frozen=True, **DATACLASS_SLOTS)
 class ComplianceEvaluation:
     """Result of evaluating a component against rules."""
     component_id: str
@@ -116,7 +137,10 @@ class ComplianceEvaluation:
 class BedrockHTTPClient:
     """HTTP client for AWS Bedrock using ABSK API Keys."""
 
-    def __init__(self, api_key: str, region: str):
+    def __init__(self, api_key: str, region: str, pool_size: int = 16):
+        import requests
+        from requests.adapters import HTTPAdapter
+
         # Decode base64 if needed
         decoded_key = api_key
         try:
@@ -131,6 +155,13 @@ class BedrockHTTPClient:
         self.region = region
         self.kb_base_url = f"https://bedrock-agent-runtime.{region}.amazonaws.com"
         self.runtime_base_url = f"https://bedrock-runtime.{region}.amazonaws.com"
+        # One session for every call, so TLS connections are kept alive
+        # between KB and model requests. Up to pool_size (--concurrency)
+        # threads share it; the default adapter only keeps 10 connections
+        # per host and discards the rest
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
 
         log(f"Using Bedrock API Key authentication for region {region}")
 
@@ -149,7 +180,7 @@ class BedrockHTTPClient:
         }
 
         try:
-            response = requests.post(url, headers=headers, json=payload, timeout=30)
+            response = self.session.post(url, headers=headers, json=payload, timeout=30)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.HTTPError as e:
@@ -158,8 +189,6 @@ class BedrockHTTPClient:
 
     def invoke_model(self, modelId: str, contentType: str, accept: str, body: str) -> Dict:
         """Invoke Bedrock model."""
-        import requests
-
         url = f"{self.runtime_base_url}/model/{modelId}/invoke"
         headers = {
             'Authorization': f'Bearer {self.api_key}',
@@ -167,7 +196,7 @@ class BedrockHTTPClient:
             'Accept': accept
         }
 
-        response = requests.post(url, headers=headers, data=body, timeout=60)
+        response = self.session.post(url, headers=headers, data=body, timeout=60)
         response.raise_for_status()
 
         # Return response in boto3-compatible format
@@ -180,10 +209,14 @@ class BedrockHTTPClient:
         return {'body': ResponseWrapper(response.content)}
 
 
-def setup_bedrock_clients_boto3(region: str):
+def setup_bedrock_clients_boto3(region: str, pool_size: int = 16):
     """Initialize Bedrock clients using boto3 with IAM credentials."""
 
-    if not BOTO3_AVAILABLE:
+    # Imported here: boto3 is slow to import and only needed without an API key
+    try:
+        import boto3
+        from botocore.config import Config
+    except ImportError:
         error("boto3 is required but not installed. Run: pip install boto3")
         sys.exit(1)
 
@@ -196,8 +229,10 @@ def setup_bedrock_clients_boto3(region: str):
         log(f"Using AWS IAM credentials for account: {identity['Account']}")
         log(f"ARN: {identity['Arn']}")
 
-        bedrock_agent = session.client('bedrock-agent-runtime')
-        bedrock_runtime = session.client('bedrock-runtime')
+        # Enough pooled connections for every --concurrency thread
+        config = Config(max_pool_connections=pool_size)
+        bedrock_agent = session.client('bedrock-agent-runtime', config=config)
+        bedrock_runtime = session.client('bedrock-runtime', config=config)
 
         return bedrock_agent, bedrock_runtime
 
@@ -212,7 +247,7 @@ def setup_bedrock_clients_boto3(region: str):
         sys.exit(1)
 
 
-def setup_bedrock_client(region: str, api_key: str):
+def setup_bedrock_client(region: str, api_key: str, pool_size: int = 16):
     """Initialize Bedrock client - supports both ABSK keys and IAM credentials."""
 
     # Try ABSK key first
@@ -229,28 +264,155 @@ def setup_bedrock_client(region: str, api_key: str):
 
         if 'ABSK' in decoded_key or decoded_key.startswith('ABSK'):
             log("Using Bedrock API Key (ABSK) authentication")
-            client = BedrockHTTPClient(api_key, region)
+            client = BedrockHTTPClient(api_key, region, pool_size)
             return client, client
 
     # Fall back to IAM credentials via boto3
     log("Using AWS IAM credentials (boto3)")
-    return setup_bedrock_clients_boto3(region)
+    return setup_bedrock_clients_boto3(region, pool_size)
+
+
+# =============================================================================
+# Request Throttling
+# =============================================================================
+
+def throttle_retry_after(exc: Exception) -> Optional[float]:
+    """
+    Seconds to wait before retrying a throttled Bedrock call (0 when the
+    response gives no Retry-After), or None if exc isn't a throttling error.
+    Handles both botocore ClientError and requests HTTPError.
+    """
+    response = getattr(exc, 'response', None)
+    if isinstance(response, dict):  # botocore
+        if response.get('Error', {}).get('Code') not in ('ThrottlingException', 'TooManyRequestsException'):
+            return None
+        headers = response.get('ResponseMetadata', {}).get('HTTPHeaders', {})
+    elif getattr(response, 'status_code', None) == 429:  # requests
+        headers = response.headers
+    else:
+        return None
+    try:
+        return float(headers.get('retry-after', 0))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class BackpressureController:
+    """
+    AIMD limit on concurrent Bedrock requests.
+
+    The limit grows by `increase` after each call while the mean latency of
+    the last `window` calls is within target_latency, and is multiplied by
+    `decrease` when Bedrock throttles. Throttled calls are retried after
+    Retry-After (or exponential backoff). Callers block in call() while the
+    limit is reached, so the thread pool size is only an upper bound.
+    """
+
+    def __init__(self, target_latency: float, initial: float = 4.0, min_limit: float = 1.0,
+                 max_limit: float = 16.0, increase: float = 0.5, decrease: float = 0.5,
+                 window: int = 20, max_attempts: int = 5):
+        self.target_latency = target_latency
+        self.limit = initial
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.decrease = decrease
+        self.max_attempts = max_attempts
+        self.latencies = deque(maxlen=window)
+        self.in_flight = 0
+        self.cond = threading.Condition()
+
+    def _acquire(self) -> None:
+        with self.cond:
+            while self.in_flight >= int(self.limit):
+                self.cond.wait()
+            self.in_flight += 1
+
+    def _release(self, latency: Optional[float] = None, throttled: bool = False) -> None:
+        with self.cond:
+            self.in_flight -= 1
+            if throttled:
+                self.limit = max(self.min_limit, self.limit * self.decrease)
+            elif latency is not None:
+                self.latencies.append(latency)
+                if sum(self.latencies) / len(self.latencies) <= self.target_latency:
+                    self.limit = min(self.max_limit, self.limit + self.increase)
+            self.cond.notify_all()
+
+    def call(self, fn, *args, **kwargs):
+        """Call fn(*args, **kwargs) within the limit, retrying when throttled."""
+        for attempt in range(self.max_attempts):
+            self._acquire()
+            started = time.monotonic()
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as exc:
+                retry_after = throttle_retry_after(exc)
+                self._release(throttled=retry_after is not None)
+                if retry_after is None or attempt == self.max_attempts - 1:
+                    raise
+                delay = retry_after or 2.0 ** attempt
+                log(f"Bedrock throttled, retrying in {delay:.1f}s (concurrency limit now {int(self.limit)})")
+                time.sleep(delay)
+                continue
+            self._release(latency=time.monotonic() - started)
+            return result
+
+
+# Shared by every check in the process, since Bedrock quotas are per account.
+# KB retrievals and model calls have separate limits and latency targets
+# (a batched Claude evaluation legitimately takes tens of seconds)
+KB_BACKPRESSURE = BackpressureController(target_latency=float(os.getenv('BEDROCK_KB_TARGET_LATENCY', '5')))
+MODEL_BACKPRESSURE = BackpressureController(target_latency=float(os.getenv('BEDROCK_MODEL_TARGET_LATENCY', '60')))
 
 
 # =============================================================================
 # Bedrock Knowledge Base Query
 # =============================================================================
 
+# KB results by query, shared across runs in one process (compliCheckV2 and
+# the backend run many checks in one process): key -> (fetched_at, results).
+# Least recently used entries are evicted beyond KB_CACHE_MAXSIZE
+KB_CACHE_MAXSIZE = int(os.getenv('BEDROCK_KB_CACHE_SIZE', '1024'))
+_kb_cache: OrderedDict = OrderedDict()
+_kb_cache_lock = threading.Lock()
+
+
+def normalize_kb_query(query: str) -> str:
+    """Queries differing only in case or whitespace retrieve the same rules."""
+    return " ".join(query.lower().split())
+
+
+def kb_cache_key(kb_id: str, query: str, max_results: int) -> str:
+    """Cache key for one KB retrieval."""
+    return hashlib.sha256(f"{kb_id}\0{normalize_kb_query(query)}\0{max_results}".encode()).hexdigest()
+
+
 def query_knowledge_base(
     bedrock_agent,
     kb_id: str,
     query: str,
-    max_results: int = 5
+    max_results: int = 5,
+    cache_ttl: float = 0
 ) -> List[KBSearchResult]:
-    """Query Bedrock Knowledge Base and return relevant documents."""
+    """
+    Query Bedrock Knowledge Base and return relevant documents. Results for
+    the same query are reused for cache_ttl seconds; failed queries are not
+    cached.
+    """
+    key = kb_cache_key(kb_id, query, max_results)
+    if cache_ttl > 0:
+        with _kb_cache_lock:
+            cached = _kb_cache.get(key)
+            if cached and time.time() - cached[0] < cache_ttl:
+                _kb_cache.move_to_end(key)
+                return list(cached[1])
+            if cached:
+                del _kb_cache[key]
 
     try:
-        response = bedrock_agent.retrieve(
+        response = KB_BACKPRESSURE.call(
+            bedrock_agent.retrieve,
             knowledgeBaseId=kb_id,
             retrievalQuery={'text': query},
             retrievalConfiguration={
@@ -269,6 +431,12 @@ def query_knowledge_base(
                 metadata=item.get('metadata', {})
             ))
 
+        if cache_ttl > 0:
+            with _kb_cache_lock:
+                _kb_cache[key] = (time.time(), tuple(results))
+                _kb_cache.move_to_end(key)
+                while len(_kb_cache) > KB_CACHE_MAXSIZE:
+                    _kb_cache.popitem(last=False)
         return results
 
     except Exception as e:
@@ -280,6 +448,87 @@ def query_knowledge_base(
 # Claude Evaluation via Bedrock
 # =============================================================================
 
+EVALUATION_TASK = """TASK:
+1. Determine if the component complies with the relevant building codes
+2. Identify specific requirements that apply
+3. Compare expected values vs actual values
+4. Provide a compliance status: PASS, FAIL, REVIEW, or NOT_APPLICABLE"""
+
+EVALUATION_FIELDS = """    "requirement": "Brief description of the primary requirement",
+    "expected_value": "What the code requires",
+    "actual_value": "What the component has",
+    "status": "PASS|FAIL|REVIEW|NOT_APPLICABLE",
+    "confidence": 0.0-1.0,
+    "notes": ["Detailed explanation", "Additional context"]"""
+
+
+def claude_request_body(prompt: str, max_tokens: int = 2000) -> Dict[str, Any]:
+    """Bedrock request body for a single-turn Claude prompt."""
+    return {
+        "anthropic_version": "bedrock-2023-05-31",
+        "max_tokens": max_tokens,
+        "temperature": 0.0,
+        "messages": [
+            {
+                "role": "user",
+                "content": prompt
+            }
+        ]
+    }
+
+
+def invoke_claude(bedrock_runtime, model_id: str, prompt: str, max_tokens: int = 2000) -> str:
+    """Send a single-turn prompt to Claude via Bedrock and return the response text."""
+    response = MODEL_BACKPRESSURE.call(
+        bedrock_runtime.invoke_model,
+        modelId=model_id,
+        contentType='application/json',
+        accept='application/json',
+        body=json.dumps(claude_request_body(prompt, max_tokens))
+    )
+
+    response_body = json.loads(response['body'].read())
+    return response_body['content'][0]['text']
+
+
+def parse_claude_json(result_text: str, pattern: re.Pattern = JSON_OBJECT_PATTERN) -> Any:
+    """Parse JSON from a Claude response, tolerating code fences and surrounding prose."""
+    loads = orjson.loads if orjson is not None else json.loads
+
+    # Extract JSON from markdown code blocks if present
+    block = CODE_BLOCK_PATTERN.search(result_text)
+    if block:
+        result_text = block.group(1).strip()
+
+    try:
+        return loads(result_text)
+    except ValueError:  # json and orjson decode errors both subclass it
+        match = pattern.search(result_text)
+        if not match:
+            raise
+        return loads(match.group())
+
+
+def evaluation_from_result(
+    component: Dict[str, Any],
+    result: Dict[str, Any],
+    kb_results: List[KBSearchResult]
+) -> ComplianceEvaluation:
+    """Build a ComplianceEvaluation from Claude's JSON verdict for one component."""
+    return ComplianceEvaluation(
+        component_id=component.get('component_id', ''),
+        component_type=component.get('component_type', 'Unknown'),
+        component_name=component.get('component_name', 'Unnamed'),
+        requirement=result.get('requirement', 'Unknown requirement'),
+        expected_value=result.get('expected_value', 'N/A'),
+        actual_value=result.get('actual_value', 'N/A'),
+        status=result.get('status', 'REVIEW'),
+        confidence=float(result.get('confidence', 0.5)),
+        notes=result.get('notes', []),
+        kb_sources=[r.source for r in kb_results]
+    )
+
+
 def evaluate_compliance_with_claude(
     bedrock_runtime,
     model_id: str,
@@ -305,66 +554,17 @@ COMPONENT INFORMATION:
 RELEVANT BUILDING CODE RULES:
 {kb_context}
 
-TASK:
-1. Determine if the component complies with the relevant building codes
-2. Identify specific requirements that apply
-3. Compare expected values vs actual values
-4. Provide a compliance status: PASS, FAIL, REVIEW, or NOT_APPLICABLE
+{EVALUATION_TASK}
 
 Respond ONLY with a JSON object in this format:
 {{
-    "requirement": "Brief description of the primary requirement",
-    "expected_value": "What the code requires",
-    "actual_value": "What the component has",
-    "status": "PASS|FAIL|REVIEW|NOT_APPLICABLE",
-    "confidence": 0.0-1.0,
-    "notes": ["Detailed explanation", "Additional context"]
+{EVALUATION_FIELDS}
 }}"""
 
     try:
         # Call Claude via Bedrock
-        response = bedrock_runtime.invoke_model(
-            modelId=model_id,
-            contentType='application/json',
-            accept='application/json',
-            body=json.dumps({
-                "anthropic_version": "bedrock-2023-05-31",
-                "max_tokens": 2000,
-                "temperature": 0.0,
-                "messages": [
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ]
-            })
-        )
-
-        response_body = json.loads(response['body'].read())
-        result_text = response_body['content'][0]['text']
-
-        # Parse JSON response from Claude
-        # Extract JSON from markdown code blocks if present
-        if '```json' in result_text:
-            result_text = result_text.split('```json')[1].split('```')[0].strip()
-        elif '```' in result_text:
-            result_text = result_text.split('```')[1].split('```')[0].strip()
-
-        result = json.loads(result_text)
-
-        # Build ComplianceEvaluation
-        return ComplianceEvaluation(
-            component_id=component.get('component_id', ''),
-            component_type=component.get('component_type', 'Unknown'),
-            component_name=component.get('component_name', 'Unnamed'),
-            requirement=result.get('requirement', 'Unknown requirement'),
-            expected_value=result.get('expected_value', 'N/A'),
-            actual_value=result.get('actual_value', 'N/A'),
-            status=result.get('status', 'REVIEW'),
-            confidence=float(result.get('confidence', 0.5)),
-            notes=result.get('notes', []),
-            kb_sources=[r.source for r in kb_results]
-        )
+        result = parse_claude_json(invoke_claude(bedrock_runtime, model_id, prompt))
+        return evaluation_from_result(component, result, kb_results)
 
     except Exception as e:
         error(f"Claude evaluation failed for component {component.get('component_id', 'unknown')}: {e}")
@@ -383,6 +583,249 @@ Respond ONLY with a JSON object in this format:
         )
 
 
+def build_batch_prompt(
+    components: List[Dict[str, Any]],
+    kb_results_list: List[List[KBSearchResult]]
+) -> str:
+    """
+    Prompt evaluating several same-type components at once. Rules retrieved
+    for more than one component are sent once and referenced by number from
+    each component.
+    """
+    # Shared rule context, deduplicated by content across the chunk
+    rule_numbers: Dict[str, int] = {}
+    rule_blocks = []
+    component_rules = []
+    for kb_results in kb_results_list:
+        numbers = []
+        for r in kb_results:
+            if r.content not in rule_numbers:
+                rule_numbers[r.content] = len(rule_numbers) + 1
+                rule_blocks.append(f"[Rule {rule_numbers[r.content]}]\n{r.content}")
+            numbers.append(rule_numbers[r.content])
+        component_rules.append(numbers)
+
+    component_blocks = "\n\n".join(
+        f"""COMPONENT_{i}:
+- Type: {component.get('component_type', 'Unknown')}
+- Name: {component.get('component_name', 'Unnamed')}
+- Attributes: {json.dumps(component.get('attributes', {}), indent=2)}
+- Candidate rules: {', '.join(str(n) for n in numbers)}"""
+        for i, (component, numbers) in enumerate(zip(components, component_rules), 1)
+    )
+
+    return f"""You are a building code compliance expert. Evaluate each of the following components against the relevant building regulations.
+
+RELEVANT BUILDING CODE RULES:
+{chr(10).join(rule_blocks)}
+
+COMPONENTS:
+{component_blocks}
+
+{EVALUATION_TASK}
+Evaluate each component only against its candidate rules.
+
+Respond ONLY with a JSON array containing one object per component, in this format:
+[
+  {{
+    "component": 1,
+{EVALUATION_FIELDS}
+  }}
+]"""
+
+
+def batch_max_tokens(component_count: int) -> int:
+    """Response token budget for a batch prompt."""
+    return 1000 + 800 * component_count
+
+
+def parse_batch_evaluations(
+    result_text: str,
+    components: List[Dict[str, Any]],
+    kb_results_list: List[List[KBSearchResult]]
+) -> List[Optional[ComplianceEvaluation]]:
+    """
+    Map Claude's response to a batch prompt back to its components. Entries
+    are None where the response was unusable for that component.
+    """
+    evaluations: List[Optional[ComplianceEvaluation]] = [None] * len(components)
+    try:
+        results = parse_claude_json(result_text, JSON_ARRAY_PATTERN)
+    except ValueError as e:
+        error(f"Could not parse batched evaluation of {len(components)} components: {e}")
+        return evaluations
+
+    if not isinstance(results, list):
+        return evaluations
+
+    for result in results:
+        if not isinstance(result, dict) or 'status' not in result:
+            continue
+        try:
+            index = int(result.get('component', 0)) - 1
+        except (TypeError, ValueError):
+            continue
+        if 0 <= index < len(components) and evaluations[index] is None:
+            try:
+                evaluations[index] = evaluation_from_result(
+                    components[index], result, kb_results_list[index]
+                )
+            except (TypeError, ValueError):
+                pass
+
+    return evaluations
+
+
+def evaluate_components_batch(
+    bedrock_runtime,
+    model_id: str,
+    components: List[Dict[str, Any]],
+    kb_results_list: List[List[KBSearchResult]]
+) -> List[Optional[ComplianceEvaluation]]:
+    """
+    Evaluate several same-type components in one Claude call.
+
+    Returns one entry per component; entries are None where the response was
+    unusable, so the caller can fall back to evaluate_compliance_with_claude
+    for just those.
+    """
+    try:
+        result_text = invoke_claude(
+            bedrock_runtime, model_id,
+            build_batch_prompt(components, kb_results_list),
+            max_tokens=batch_max_tokens(len(components))
+        )
+    except Exception as e:
+        error(f"Batched Claude evaluation failed for {len(components)} components: {e}")
+        return [None] * len(components)
+
+    return parse_batch_evaluations(result_text, components, kb_results_list)
+
+
+# =============================================================================
+# Bedrock Batch Inference
+# =============================================================================
+
+# Bedrock rejects batch jobs with fewer records than this; smaller runs use
+# the on-demand path
+BATCH_INFERENCE_MIN_RECORDS = 100
+BATCH_INFERENCE_POLL_SECONDS = 60
+# Give up on a batch job (and evaluate on demand) after this long
+BATCH_INFERENCE_MAX_WAIT_SECONDS = float(os.getenv('BEDROCK_BATCH_MAX_WAIT_SECONDS', str(6 * 3600)))
+
+
+@dataclass(frozen=True)
+class BatchInference:
+    """Clients and locations for running evaluations as a Bedrock batch job."""
+    bedrock: Any  # boto3 'bedrock' control-plane client
+    s3: Any  # boto3 's3' client
+    s3_uri: str  # s3://bucket/prefix for job input and output
+    role_arn: str  # service role Bedrock assumes to read and write s3_uri
+
+
+def setup_batch_inference(region: str, s3_uri: str, role_arn: str) -> BatchInference:
+    """Create the boto3 clients batch inference needs (IAM credentials only)."""
+    try:
+        import boto3
+    except ImportError:
+        error("boto3 is required for --batch. Run: pip install boto3")
+        sys.exit(1)
+
+    session = boto3.Session(region_name=region)
+    return BatchInference(session.client('bedrock'), session.client('s3'), s3_uri.rstrip('/'), role_arn)
+
+
+def run_batch_inference(
+    batch: BatchInference,
+    model_id: str,
+    model_inputs: Dict[str, Dict[str, Any]]
+) -> Dict[str, str]:
+    """
+    Run Claude requests (record id -> request body) as one Bedrock batch
+    inference job and wait for it to finish, at most
+    BATCH_INFERENCE_MAX_WAIT_SECONDS. Returns the response text by record
+    id; records that failed are missing, and any error submitting, polling
+    or downloading the job returns {}, so callers evaluate on demand.
+    """
+    job_name = f"compliance-{datetime.now(timezone.utc).strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+    parsed = urlparse(batch.s3_uri)
+    bucket, prefix = parsed.netloc, parsed.path.strip('/')
+    input_key = '/'.join(p for p in (prefix, job_name, 'input.jsonl') if p)
+
+    try:
+        batch.s3.put_object(
+            Bucket=bucket,
+            Key=input_key,
+            Body='\n'.join(
+                json.dumps({"recordId": record_id, "modelInput": body})
+                for record_id, body in model_inputs.items()
+            ).encode()
+        )
+
+        output_uri = f"{batch.s3_uri}/{job_name}/output/"
+        job_arn = batch.bedrock.create_model_invocation_job(
+            jobName=job_name,
+            roleArn=batch.role_arn,
+            modelId=model_id,
+            inputDataConfig={'s3InputDataConfig': {'s3Uri': f"s3://{bucket}/{input_key}"}},
+            outputDataConfig={'s3OutputDataConfig': {'s3Uri': output_uri}}
+        )['jobArn']
+    except Exception as e:
+        error(f"Could not submit batch inference job {job_name}: {e}")
+        return {}
+    log(f"Submitted batch inference job {job_name} with {len(model_inputs)} records")
+
+    deadline = time.monotonic() + BATCH_INFERENCE_MAX_WAIT_SECONDS
+    while True:
+        try:
+            status = batch.bedrock.get_model_invocation_job(jobIdentifier=job_arn)['status']
+        except Exception as e:
+            error(f"Could not check batch inference job {job_name}: {e}")
+            return {}
+        if status == 'Completed':
+            break
+        if status in ('Failed', 'Stopped', 'Expired', 'PartiallyCompleted'):
+            error(f"Batch inference job {job_name} ended with status {status}")
+            if status != 'PartiallyCompleted':
+                return {}
+            break
+        if time.monotonic() >= deadline:
+            error(f"Batch inference job {job_name} still {status} after "
+                  f"{BATCH_INFERENCE_MAX_WAIT_SECONDS:.0f}s; stopping it")
+            try:
+                batch.bedrock.stop_model_invocation_job(jobIdentifier=job_arn)
+            except Exception as e:
+                error(f"Could not stop batch inference job {job_name}: {e}")
+            return {}
+        log(f"  Batch job {job_name}: {status}")
+        time.sleep(BATCH_INFERENCE_POLL_SECONDS)
+
+    # Output lands in <output_uri>/<job id>/input.jsonl.out
+    output_key = '/'.join(p for p in (prefix, job_name, 'output', job_arn.split('/')[-1], 'input.jsonl.out') if p)
+    try:
+        output = batch.s3.get_object(Bucket=bucket, Key=output_key)['Body'].read().decode()
+    except Exception as e:
+        error(f"Could not download batch inference output {output_key}: {e}")
+        return {}
+
+    texts = {}
+    for line in output.splitlines():
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            record = None
+        if not isinstance(record, dict):
+            error(f"Skipping malformed batch output line: {line[:100]}")
+            continue
+        try:
+            texts[record['recordId']] = record['modelOutput']['content'][0]['text']
+        except (KeyError, IndexError, TypeError):
+            error(f"Batch record {record.get('recordId')} failed: {record.get('error', 'no output')}")
+    return texts
+
+
 # =============================================================================
 # Main Processing
 # =============================================================================
@@ -393,61 +836,136 @@ def process_components(
     components: List[Dict[str, Any]],
     kb_id: str,
     model_id: str,
-    max_results: int
+    max_results: int,
+    kb_cache_ttl: float = 0,
+    concurrency: int = 16,
+    batch: Optional[BatchInference] = None
 ) -> Dict[str, Any]:
-    """Process all components and evaluate compliance."""
+    """
+    Process all components and evaluate compliance. KB retrievals and Claude
+    calls run in a thread pool of concurrency threads; how many requests are
+    actually in flight is set by KB_BACKPRESSURE and MODEL_BACKPRESSURE.
+    With batch, the Claude evaluations run as one Bedrock batch inference
+    job instead (when there are enough of them).
+    """
 
     log(f"Processing {len(components)} components with Bedrock KB...")
 
-    evaluations = []
+    evaluations: List[Optional[ComplianceEvaluation]] = [None] * len(components)
+    # component_type -> indices of components with KB results, in input order
+    pending = defaultdict(list)
+    kb_results_by_index: Dict[int, List[KBSearchResult]] = {}
 
-    for i, component in enumerate(components, 1):
-        comp_type = component.get('component_type', 'Unknown')
+    def kb_query(component: Dict[str, Any]) -> str:
         comp_name = component.get('component_name', 'Unnamed')
-
-        log(f"[{i}/{len(components)}] Checking {comp_type}: {comp_name}")
-
-        # Build query for KB
-        query = f"Building code requirements for {comp_type}"
+        query = f"Building code requirements for {component.get('component_type', 'Unknown')}"
         if comp_name and comp_name != 'Unnamed':
             query += f" {comp_name}"
-
-        # Get relevant rules from KB
-        kb_results = query_knowledge_base(bedrock_agent, kb_id, query, max_results)
-
-        if not kb_results:
-            log(f"  ⚠ No KB results found for {comp_type}")
-            evaluations.append(ComplianceEvaluation(
-                component_id=component.get('component_id', ''),
-                component_type=comp_type,
-                component_name=comp_name,
-                requirement='No applicable rules found',
-                expected_value='N/A',
-                actual_value='N/A',
-                status='NOT_APPLICABLE',
-                confidence=0.0,
-                notes=['No relevant building code rules found in knowledge base'],
-                kb_sources=[]
-            ))
-            continue
-
-        log(f"  Found {len(kb_results)} relevant rules")
-
-        # Evaluate compliance with Claude
-        evaluation = evaluate_compliance_with_claude(
+        return query
+
+    def finish_chunk(chunk: List[int], chunk_evaluations: List[Optional[ComplianceEvaluation]]) -> List[ComplianceEvaluation]:
+        # Single-component path for anything the batch did not answer
+        return [
+            evaluation or evaluate_compliance_with_claude(
+                bedrock_runtime,
+                model_id,
+                components[i],
+                kb_results_by_index[i]
+            )
+            for i, evaluation in zip(chunk, chunk_evaluations)
+        ]
+
+    def evaluate_chunk(chunk: List[int]) -> List[ComplianceEvaluation]:
+        if len(chunk) == 1:
+            return finish_chunk(chunk, [None])
+        log(f"Evaluating {len(chunk)} {components[chunk[0]].get('component_type', 'Unknown')} components together")
+        return finish_chunk(chunk, evaluate_components_batch(
             bedrock_runtime,
             model_id,
-            component,
-            kb_results
-        )
-
-        evaluations.append(evaluation)
-        log(f"  Status: {evaluation.status} (Confidence: {evaluation.confidence:.2f})")
-
-        # Add delay to avoid AWS throttling (except for last component)
-        if i < len(components):
-            import time
-            time.sleep(2.0)  # 2 second delay between requests
+            [components[i] for i in chunk],
+            [kb_results_by_index[i] for i in chunk]
+        ))
+
+    def evaluate_chunks_in_batch_job(chunks: List[List[int]]) -> List[List[ComplianceEvaluation]]:
+        model_inputs = {
+            f"chunk-{n}": claude_request_body(
+                build_batch_prompt([components[i] for i in chunk], [kb_results_by_index[i] for i in chunk]),
+                batch_max_tokens(len(chunk))
+            )
+            for n, chunk in enumerate(chunks)
+        }
+        texts = run_batch_inference(batch, model_id, model_inputs)
+        chunk_evaluations = [
+            parse_batch_evaluations(
+                texts[f"chunk-{n}"], [components[i] for i in chunk], [kb_results_by_index[i] for i in chunk]
+            ) if f"chunk-{n}" in texts else [None] * len(chunk)
+            for n, chunk in enumerate(chunks)
+        ]
+        return list(executor.map(finish_chunk, chunks, chunk_evaluations))
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        # Get relevant rules from KB for every component; components with the
+        # same (normalized) query share one retrieval
+        queries = [kb_query(component) for component in components]
+        unique_queries: Dict[str, str] = {}
+        for query in queries:
+            unique_queries.setdefault(normalize_kb_query(query), query)
+        results_by_query = dict(zip(
+            unique_queries,
+            executor.map(
+                lambda query: query_knowledge_base(bedrock_agent, kb_id, query, max_results, kb_cache_ttl),
+                unique_queries.values()
+            )
+        ))
+        if len(unique_queries) < len(queries):
+            log(f"Retrieving rules for {len(unique_queries)} unique KB queries ({len(queries)} components)")
+        kb_results_list = [results_by_query[normalize_kb_query(q)] for q in queries]
+
+        for i, (component, kb_results) in enumerate(zip(components, kb_results_list)):
+            comp_type = component.get('component_type', 'Unknown')
+            comp_name = component.get('component_name', 'Unnamed')
+
+            log(f"[{i + 1}/{len(components)}] Checking {comp_type}: {comp_name}")
+
+            if not kb_results:
+                log(f"  ⚠ No KB results found for {comp_type}")
+                evaluations[i] = ComplianceEvaluation(
+                    component_id=component.get('component_id', ''),
+                    component_type=comp_type,
+                    component_name=comp_name,
+                    requirement='No applicable rules found',
+                    expected_value='N/A',
+                    actual_value='N/A',
+                    status='NOT_APPLICABLE',
+                    confidence=0.0,
+                    notes=['No relevant building code rules found in knowledge base'],
+                    kb_sources=[]
+                )
+                continue
+
+            log(f"  Found {len(kb_results)} relevant rules")
+            kb_results_by_index[i] = kb_results
+            pending[comp_type].append(i)
+
+        # Evaluate compliance with Claude, one call per chunk of same-type components
+        chunks = [
+            indices[start:start + EVALUATION_BATCH_SIZE]
+            for indices in pending.values()
+            for start in range(0, len(indices), EVALUATION_BATCH_SIZE)
+        ]
+
+        if batch is not None and len(chunks) >= BATCH_INFERENCE_MIN_RECORDS:
+            results = evaluate_chunks_in_batch_job(chunks)
+        else:
+            if batch is not None:
+                log(f"Only {len(chunks)} evaluation requests, below the batch inference minimum "
+                    f"of {BATCH_INFERENCE_MIN_RECORDS}; evaluating on demand")
+            results = executor.map(evaluate_chunk, chunks)
+
+        for chunk, chunk_evaluations in zip(chunks, results):
+            for i, evaluation in zip(chunk, chunk_evaluations):
+                evaluations[i] = evaluation
+                log(f"  {evaluation.component_name} status: {evaluation.status} (Confidence: {evaluation.confidence:.2f})")
 
     # Calculate summary statistics
     status_counts = defaultdict(int)
@@ -470,7 +988,24 @@ def process_components(
 # Main Entry Point
 # =============================================================================
 
-def main():
+def read_json(path: Path) -> Any:
+    """Load a JSON file, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(Path(path).read_bytes())
+    with open(path) as f:
+        return json.load(f)
+
+
+def write_json(path: Path, data: Any) -> None:
+    """Write data as indented JSON, using orjson when it is installed."""
+    if orjson is not None:
+        Path(path).write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        return
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(
         description='Check building plan compliance using AWS Bedrock Knowledge Base'
     )
@@ -500,48 +1035,74 @@ def main():
         default=5,
         help='Maximum KB search results per component'
     )
+    parser.add_argument(
+        '--kb-cache-ttl',
+        type=float,
+        default=3600,
+        help='Seconds to reuse KB results for a repeated query (0 disables)'
+    )
+    parser.add_argument(
+        '--concurrency',
+        type=int,
+        default=16,
+        help='Upper bound on Bedrock requests in flight (the actual limit adapts to throttling)'
+    )
+    parser.add_argument(
+        '--batch',
+        action='store_true',
+        help='Run Claude evaluations as a Bedrock batch inference job (cheaper, can take hours)'
+    )
+    parser.add_argument(
+        '--batch-s3-uri',
+        default=os.getenv('BEDROCK_BATCH_S3_URI'),
+        help='s3://bucket/prefix for batch job input and output'
+    )
+    parser.add_argument(
+        '--batch-role-arn',
+        default=os.getenv('BEDROCK_BATCH_ROLE_ARN'),
+        help='Service role Bedrock assumes for the batch job'
+    )
     parser.add_argument(
         '--output',
         help='Output JSON path (default: <input>_compliance_bkb.json)'
     )
 
-    args = parser.parse_args()
+    return parser.parse_args(argv)
+
 
+def check_components(data: Dict[str, Any], args: argparse.Namespace) -> Dict[str, Any]:
+    """
+    Check an in-memory components dict and return the compliance results;
+    compliCheckV2 calls this directly. data is not modified, so the caller
+    can still pass it on to the report step.
+    """
     # Validate KB ID
     if not args.kb_id:
         error("Bedrock Knowledge Base ID not specified. Set BEDROCK_KB_ID in .env or use --kb-id")
         sys.exit(1)
 
-    # Load components
-    components_path = Path(args.components)
-    if not components_path.exists():
-        error(f"Components file not found: {components_path}")
-        sys.exit(1)
-
-    log(f"Loading components from {components_path}")
-    with open(components_path) as f:
-        data = json.load(f)
-
-        # Try different component structures
-        components = data.get('components', [])
-
-        # If no top-level components array, flatten from sheets structure
-        if not components and 'sheets' in data:
-            components = []
-            for sheet in data['sheets']:
-                # Add rooms as components
-                for room in sheet.get('rooms', []):
-                    room['component_type'] = 'room'
-                    room['component_id'] = f"room_{len(components)}"
-                    room['component_name'] = room.get('name', 'Unnamed')
-                    components.append(room)
-
-                # Add setbacks as components
-                for setback in sheet.get('geometric_setbacks', []):
-                    setback['component_type'] = 'setback'
-                    setback['component_id'] = f"setback_{len(components)}"
-                    setback['component_name'] = setback.get('name', 'Setback')
-                    components.append(setback)
+    # Try different component structures
+    components = data.get('components', [])
+
+    # If no top-level components array, flatten from sheets structure
+    if not components and 'sheets' in data:
+        components = []
+        for sheet in data['sheets']:
+            # Add rooms as components
+            for room in sheet.get('rooms', []):
+                room = dict(room)
+                room['component_type'] = 'room'
+                room['component_id'] = f"room_{len(components)}"
+                room['component_name'] = room.get('name', 'Unnamed')
+                components.append(room)
+
+            # Add setbacks as components
+            for setback in sheet.get('geometric_setbacks', []):
+                setback = dict(setback)
+                setback['component_type'] = 'setback'
+                setback['component_id'] = f"setback_{len(components)}"
+                setback['component_name'] = setback.get('name', 'Setback')
+                components.append(setback)
 
     if not components:
         error("No components found in input file")
@@ -549,18 +1110,43 @@ def main():
 
     # Setup Bedrock clients
     log(f"Connecting to AWS Bedrock in {args.region}")
-    bedrock_agent, bedrock_runtime = setup_bedrock_client(args.region, BEDROCK_API_KEY)
+    concurrency = max(1, args.concurrency)
+    bedrock_agent, bedrock_runtime = setup_bedrock_client(args.region, BEDROCK_API_KEY, concurrency)
+
+    batch = None
+    if args.batch:
+        if not args.batch_s3_uri or not args.batch_role_arn:
+            error("--batch needs --batch-s3-uri and --batch-role-arn (or BEDROCK_BATCH_S3_URI / BEDROCK_BATCH_ROLE_ARN)")
+            sys.exit(1)
+        batch = setup_batch_inference(args.region, args.batch_s3_uri, args.batch_role_arn)
 
     # Process components
-    results = process_components(
+    return process_components(
         bedrock_agent,
         bedrock_runtime,
         components,
         args.kb_id,
         args.model_id,
-        args.max_results
+        args.max_results,
+        args.kb_cache_ttl,
+        concurrency,
+        batch
     )
 
+
+def run(args: argparse.Namespace) -> int:
+    """Check compliance for parsed CLI args."""
+    # Load components
+    components_path = Path(args.components)
+    if not components_path.exists():
+        error(f"Components file not found: {components_path}")
+        sys.exit(1)
+
+    log(f"Loading components from {components_path}")
+    data = read_json(components_path)
+
+    results = check_components(data, args)
+
     # Determine output path
     if args.output:
         output_path = Path(args.output)
@@ -569,8 +1155,7 @@ def main():
 
     # Save results
     log(f"Writing compliance results to {output_path}")
-    with open(output_path, 'w') as f:
-        json.dump(results, f, indent=2)
+    write_json(output_path, results)
 
     # Print summary
     summary = results['metadata']['status_summary']
@@ -585,5 +1170,9 @@ def main():
     return 0
 
 
+def main():
+    return run(parse_args())
+
+
 if __name__ == '__main__':
     sys.exit(main())
@@ -18,16 +18,27 @@ import os
 import re
 import json
 import argparse
+import importlib.util
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass, asdict
 from collections import defaultdict
 
+import numpy as np
 import pdfplumber
-from shapely.geometry import LineString, Polygon, Point, box
+import shapely
+from shapely.geometry import LineString, Polygon, box
 from shapely.ops import unary_union
+from shapely.strtree import STRtree
 from tqdm import tqdm
 
+try:
+    import orjson
+except ImportError:
+    orjson = None  # falls back to the stdlib json module
+
 # =============================================================================
 # Component Data Models
 # =============================================================================
@@ -565,12 +576,54 @@ WATER_FEATURE_KEYWORDS = {
     "stream": ["STREAM"],
     "drainage": ["DRAINAGE", "DRAIN", "SWALE"]
 }
+
+
+def keyword_pattern(keywords: List[str]) -> re.Pattern:
+    """
+    Compile keywords into one regex that matches wherever any of them occurs
+    (plain substring matching, like `any(kw in text for kw in keywords)`).
+    """
+    return re.compile("|".join(re.escape(kw) for kw in keywords))
+
+
+# Precompiled keyword matchers: one regex scan per text block instead of a
+# Python-level substring test per keyword
+ROOM_PATTERNS = {t: keyword_pattern(kws) for t, kws in ROOM_KEYWORDS.items()}
+SETBACK_PATTERN = keyword_pattern(SETBACK_KEYWORDS)
+DOOR_PATTERN = keyword_pattern(DOOR_KEYWORDS)
+WINDOW_PATTERN = keyword_pattern(WINDOW_KEYWORDS)
+PARKING_PATTERN = keyword_pattern(PARKING_KEYWORDS)
+STAIR_PATTERN = keyword_pattern(STAIR_KEYWORDS)
+RAMP_PATTERN = keyword_pattern(RAMP_KEYWORDS)
+ELEVATOR_PATTERN = keyword_pattern(ELEVATOR_KEYWORDS)
+FIRE_SAFETY_PATTERNS = {t: keyword_pattern(kws) for t, kws in FIRE_SAFETY_KEYWORDS.items()}
+ACCESSIBILITY_PATTERN = keyword_pattern(ACCESSIBILITY_KEYWORDS)
+HEIGHT_PATTERN = keyword_pattern(HEIGHT_KEYWORDS + ROOF_KEYWORDS)
+NORTH_PATTERN = keyword_pattern(NORTH_KEYWORDS)
+WATER_FEATURE_PATTERNS = {t: keyword_pattern(kws) for t, kws in WATER_FEATURE_KEYWORDS.items()}
+
 ADJACENT_LOT_PATTERNS = [
     r"LOT\s+(\d+)",               # LOT 137
     r"SP\s*(\d+)",                # SP163257
     r"DP\s*(\d+)",                # DP123456 (Deposited Plan)
 ]
 
+# Precompiled forms of the pattern lists above
+DIMENSION_PATTERN = re.compile("|".join(f"(?:{p})" for p in DIMENSION_PATTERNS))
+METRIC_DIMENSION_REGEXES = [re.compile(p) for p in METRIC_DIMENSION_PATTERNS]
+SCALE_REGEXES = [re.compile(p, re.IGNORECASE) for p in SCALE_PATTERNS]
+ADJACENT_LOT_REGEXES = [re.compile(p) for p in ADJACENT_LOT_PATTERNS]
+
+# parse_dimension's notations as one alternation, tried in this order; the
+# outer group that matched names the notation
+PARSE_DIMENSION_PATTERN = re.compile(
+    r"(?P<ft_in>(?P<ft_in_feet>\d+)'-(?P<ft_in_inches>\d+)\")"
+    r"|(?P<ft_in_frac>(?P<frac_feet>\d+)'-(?P<frac_inches>\d+)\s*(?P<numerator>\d+)/(?P<denominator>\d+)\")"
+    r"|(?P<ft>(?P<feet>\d+)')"
+    r"|(?P<inches>(?P<inches_value>\d+)\")"
+    r"|(?P<ft_decimal>(?P<decimal_feet>\d+\.\d+)')"
+)
+
 
 # =============================================================================
 # Utility Functions
@@ -580,45 +633,52 @@ def log(msg: str) -> None:
     print(f"[INFO] {msg}")
 
 
+def read_json(path: Path) -> Any:
+    """Load a JSON file, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(Path(path).read_bytes())
+    with open(path) as f:
+        return json.load(f)
+
+
+def write_json(path: Path, data: Any) -> None:
+    """Write data as indented JSON, using orjson when it is installed."""
+    if orjson is not None:
+        Path(path).write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        return
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
+
+
 def parse_dimension(text: str) -> Optional[float]:
     """
     Convert architectural dimension string to decimal feet.
     Examples: "10'-6"" -> 10.5, "3'" -> 3.0, "6"" -> 0.5
     """
-    text = text.strip()
+    match = PARSE_DIMENSION_PATTERN.match(text.strip())
+    if not match:
+        return None
+    notation = match.lastgroup
 
     # Pattern: 10'-6"
-    match = re.match(r"(\d+)'-(\d+)\"", text)
-    if match:
-        feet = int(match.group(1))
-        inches = int(match.group(2))
-        return feet + inches / 12.0
+    if notation == "ft_in":
+        return int(match["ft_in_feet"]) + int(match["ft_in_inches"]) / 12.0
 
     # Pattern: 10'-6 1/2"
-    match = re.match(r"(\d+)'-(\d+)\s*(\d+)/(\d+)\"", text)
-    if match:
-        feet = int(match.group(1))
-        inches = int(match.group(2))
-        numerator = int(match.group(3))
-        denominator = int(match.group(4))
-        return feet + (inches + numerator/denominator) / 12.0
+    if notation == "ft_in_frac":
+        inches = int(match["frac_inches"]) + int(match["numerator"]) / int(match["denominator"])
+        return int(match["frac_feet"]) + inches / 12.0
 
     # Pattern: 10'
-    match = re.match(r"(\d+)'", text)
-    if match:
-        return float(match.group(1))
+    if notation == "ft":
+        return float(match["feet"])
 
     # Pattern: 6"
-    match = re.match(r"(\d+)\"", text)
-    if match:
-        return int(match.group(1)) / 12.0
+    if notation == "inches":
+        return int(match["inches_value"]) / 12.0
 
     # Pattern: 10.5'
-    match = re.match(r"(\d+\.\d+)'", text)
-    if match:
-        return float(match.group(1))
-
-    return None
+    return float(match["decimal_feet"])
 
 
 def extract_text_blocks(page) -> List[Dict]:
@@ -637,15 +697,27 @@ def extract_text_blocks(page) -> List[Dict]:
     return blocks
 
 
-def find_nearby_text(target_block: Dict, all_blocks: List[Dict], radius: float = 50) -> List[Dict]:
-    """Find text blocks near a target block."""
-    target_point = Point(target_block["x"], target_block["y"])
-    nearby = []
-    for block in all_blocks:
-        block_point = Point(block["x"], block["y"])
-        if target_point.distance(block_point) <= radius:
-            nearby.append(block)
-    return nearby
+class TextBlockIndex:
+    """
+    A page's text blocks with their centre points as one (N, 2) float array
+    and an STRtree over them, built once per page so radius lookups don't
+    scan every block.
+    """
+
+    def __init__(self, blocks: List[Dict]):
+        self.blocks = blocks
+        self.centres = np.array([(block["x"], block["y"]) for block in blocks], dtype=float).reshape(-1, 2)
+        self.tree = STRtree(shapely.points(self.centres))
+
+
+def find_nearby_text(target_block: Dict, index: TextBlockIndex, radius: float = 50) -> List[Dict]:
+    """Find text blocks near a target block, in page order."""
+    x, y = target_block["x"], target_block["y"]
+    # Blocks in the bounding square, then the exact distance test on just those
+    candidates = np.sort(index.tree.query(box(x - radius, y - radius, x + radius, y + radius)))
+    offsets = index.centres[candidates] - (x, y)
+    distances = np.sqrt(offsets[:, 0] * offsets[:, 0] + offsets[:, 1] * offsets[:, 1])
+    return [index.blocks[i] for i in candidates[distances <= radius]]
 
 
 # =============================================================================
@@ -659,6 +731,7 @@ class ComponentExtractor:
         self.page = page
         self.page_number = page_number
         self.text_blocks = extract_text_blocks(page)
+        self.text_index = TextBlockIndex(self.text_blocks)
         self.all_text_upper = " ".join([b["text"] for b in self.text_blocks]).upper()
 
     def extract_scale(self) -> Optional[str]:
@@ -666,10 +739,10 @@ class ComponentExtractor:
         for block in self.text_blocks:
             if "SCALE" in block["text"].upper():
                 # Look for nearby text
-                nearby = find_nearby_text(block, self.text_blocks, radius=100)
+                nearby = find_nearby_text(block, self.text_index, radius=100)
                 scale_text = " ".join([b["text"] for b in nearby])
-                for pattern in SCALE_PATTERNS:
-                    match = re.search(pattern, scale_text, re.IGNORECASE)
+                for pattern in SCALE_REGEXES:
+                    match = pattern.search(scale_text)
                     if match:
                         return match.group(0)
         return None
@@ -681,7 +754,7 @@ class ComponentExtractor:
             text_upper = block["text"].upper()
             if any(kw in text_upper for kw in title_keywords):
                 # Get nearby text to build full title
-                nearby = find_nearby_text(block, self.text_blocks, radius=150)
+                nearby = find_nearby_text(block, self.text_index, radius=150)
                 title = " ".join([b["text"] for b in sorted(nearby, key=lambda x: x["x"])])
                 return title[:100]  # Limit length
         return None
@@ -690,18 +763,16 @@ class ComponentExtractor:
         """Extract all dimension annotations."""
         dimensions = []
         for block in self.text_blocks:
-            for pattern in DIMENSION_PATTERNS:
-                if re.match(pattern, block["text"]):
-                    value = parse_dimension(block["text"])
-                    if value:
-                        dim = Dimension(
-                            value=value,
-                            original_text=block["text"],
-                            location=(block["x"], block["y"]),
-                            unit="ft"
-                        )
-                        dimensions.append(dim)
-                    break
+            if DIMENSION_PATTERN.match(block["text"]):
+                value = parse_dimension(block["text"])
+                if value:
+                    dim = Dimension(
+                        value=value,
+                        original_text=block["text"],
+                        location=(block["x"], block["y"]),
+                        unit="ft"
+                    )
+                    dimensions.append(dim)
         return dimensions
 
     def extract_rooms(self) -> List[Room]:
@@ -709,18 +780,12 @@ class ComponentExtractor:
         rooms = []
         found_room_names = set()
 
-        for room_type, keywords in ROOM_KEYWORDS.items():
+        for room_type, pattern in ROOM_PATTERNS.items():
             for block in self.text_blocks:
                 text_upper = block["text"].upper()
 
                 # Check if this block matches room keywords
-                matched_keyword = None
-                for kw in keywords:
-                    if kw in text_upper:
-                        matched_keyword = kw
-                        break
-
-                if matched_keyword:
+                if pattern.search(text_upper):
                     # Avoid duplicates
                     room_key = f"{room_type}_{block['x']:.0f}_{block['y']:.0f}"
                     if room_key in found_room_names:
@@ -728,7 +793,7 @@ class ComponentExtractor:
                     found_room_names.add(room_key)
 
                     # Find nearby dimensions
-                    nearby_blocks = find_nearby_text(block, self.text_blocks, radius=100)
+                    nearby_blocks = find_nearby_text(block, self.text_index, radius=100)
                     room_dims = []
                     for nearby in nearby_blocks:
                         dim_value = parse_dimension(nearby["text"])
@@ -769,12 +834,12 @@ class ComponentExtractor:
             text_upper = block["text"].upper()
 
             # Check for setback keywords
-            is_setback = any(kw in text_upper for kw in SETBACK_KEYWORDS)
+            is_setback = bool(SETBACK_PATTERN.search(text_upper))
             if not is_setback:
                 continue
 
             # Find nearby dimensions
-            nearby_blocks = find_nearby_text(block, self.text_blocks, radius=150)
+            nearby_blocks = find_nearby_text(block, self.text_index, radius=150)
             for nearby in nearby_blocks:
                 dim_value = parse_dimension(nearby["text"])
                 if dim_value:
@@ -813,14 +878,14 @@ class ComponentExtractor:
             text_upper = block["text"].upper()
 
             opening_type = None
-            if any(kw in text_upper for kw in DOOR_KEYWORDS):
+            if DOOR_PATTERN.search(text_upper):
                 opening_type = "door"
-            elif any(kw in text_upper for kw in WINDOW_KEYWORDS):
+            elif WINDOW_PATTERN.search(text_upper):
                 opening_type = "window"
 
             if opening_type:
                 # Find dimensions nearby
-                nearby = find_nearby_text(block, self.text_blocks, radius=80)
+                nearby = find_nearby_text(block, self.text_index, radius=80)
                 dims = [parse_dimension(b["text"]) for b in nearby]
                 dims = [d for d in dims if d is not None]
 
@@ -845,7 +910,7 @@ class ComponentExtractor:
         for block in self.text_blocks:
             text_upper = block["text"].upper()
 
-            if any(kw in text_upper for kw in PARKING_KEYWORDS):
+            if PARKING_PATTERN.search(text_upper):
                 # Determine type
                 space_type = "open_space"
                 if "GARAGE" in text_upper:
@@ -854,7 +919,7 @@ class ComponentExtractor:
                     space_type = "carport"
 
                 # Find dimensions
-                nearby = find_nearby_text(block, self.text_blocks, radius=100)
+                nearby = find_nearby_text(block, self.text_index, radius=100)
                 dims = [parse_dimension(b["text"]) for b in nearby]
                 dims = [d for d in dims if d is not None]
 
@@ -880,15 +945,15 @@ class ComponentExtractor:
             text_upper = block["text"].upper()
 
             circulation_type = None
-            if any(kw in text_upper for kw in STAIR_KEYWORDS):
+            if STAIR_PATTERN.search(text_upper):
                 circulation_type = "stair"
-            elif any(kw in text_upper for kw in RAMP_KEYWORDS):
+            elif RAMP_PATTERN.search(text_upper):
                 circulation_type = "ramp"
-            elif any(kw in text_upper for kw in ELEVATOR_KEYWORDS):
+            elif ELEVATOR_PATTERN.search(text_upper):
                 circulation_type = "elevator"
 
             if circulation_type:
-                nearby = find_nearby_text(block, self.text_blocks, radius=100)
+                nearby = find_nearby_text(block, self.text_index, radius=100)
                 context_text = " ".join([b["text"].upper() for b in nearby])
 
                 # Extract dimensions
@@ -925,12 +990,12 @@ class ComponentExtractor:
         """Extract fire safety components."""
         fire_safety = []
 
-        for feature_type, keywords in FIRE_SAFETY_KEYWORDS.items():
+        for feature_type, pattern in FIRE_SAFETY_PATTERNS.items():
             for block in self.text_blocks:
                 text_upper = block["text"].upper()
 
-                if any(kw in text_upper for kw in keywords):
-                    nearby = find_nearby_text(block, self.text_blocks, radius=80)
+                if pattern.search(text_upper):
+                    nearby = find_nearby_text(block, self.text_index, radius=80)
                     context_text = " ".join([b["text"].upper() for b in nearby])
 
                     # Look for fire rating
@@ -955,8 +1020,8 @@ class ComponentExtractor:
         for block in self.text_blocks:
             text_upper = block["text"].upper()
 
-            if any(kw in text_upper for kw in ACCESSIBILITY_KEYWORDS):
-                nearby = find_nearby_text(block, self.text_blocks, radius=100)
+            if ACCESSIBILITY_PATTERN.search(text_upper):
+                nearby = find_nearby_text(block, self.text_index, radius=100)
                 context_text = " ".join([b["text"].upper() for b in nearby])
 
                 # Determine feature type from context
@@ -999,8 +1064,8 @@ class ComponentExtractor:
         for block in self.text_blocks:
             text_upper = block["text"].upper()
 
-            if any(kw in text_upper for kw in HEIGHT_KEYWORDS + ROOF_KEYWORDS):
-                nearby = find_nearby_text(block, self.text_blocks, radius=100)
+            if HEIGHT_PATTERN.search(text_upper):
+                nearby = find_nearby_text(block, self.text_index, radius=100)
 
                 # Extract elevation value
                 dims = [parse_dimension(b["text"]) for b in nearby]
@@ -1107,7 +1172,7 @@ class ComponentExtractor:
         overall_dims = []
         for block in self.text_blocks:
             if "OVERALL" in block["text"].upper():
-                nearby = find_nearby_text(block, self.text_blocks, radius=100)
+                nearby = find_nearby_text(block, self.text_index, radius=100)
                 for n in nearby:
                     dim_val = parse_dimension(n["text"])
                     if dim_val:
@@ -1150,7 +1215,7 @@ class ComponentExtractor:
 
             # Also check if "LOT" appears, then look nearby for number
             if text_upper.strip() == "LOT":
-                nearby = find_nearby_text(block, self.text_blocks, radius=100)
+                nearby = find_nearby_text(block, self.text_index, radius=100)
                 for n in nearby:
                     # Look for a number that could be lot number (1-3 digits typically)
                     num_match = re.search(r"^(\d{1,4})$", n["text"].strip())
@@ -1178,7 +1243,7 @@ class ComponentExtractor:
 
             # Also check for "Area:" label nearby
             if "AREA" in block["text"].upper():
-                nearby = find_nearby_text(block, self.text_blocks, radius=150)
+                nearby = find_nearby_text(block, self.text_index, radius=150)
                 for n in nearby:
                     # Look for numbers with commas (e.g., "1,190")
                     area_match = re.search(r"([\d,]+\.?\d*)", n["text"])
@@ -1202,7 +1267,7 @@ class ComponentExtractor:
                         area_val = float(area_str)
                         if 500 < area_val < 100000:  # Large enough to be lot area
                             # Check if m² is nearby
-                            nearby = find_nearby_text(block, self.text_blocks, radius=50)
+                            nearby = find_nearby_text(block, self.text_index, radius=50)
                             nearby_text = " ".join([b["text"] for b in nearby])
                             if "m²" in nearby_text or "m2" in nearby_text or "sqm" in nearby_text.lower():
                                 lot_info.lot_area = area_val
@@ -1214,8 +1279,8 @@ class ComponentExtractor:
         # Extract boundary dimensions (metric)
         # First try with explicit unit markers
         for block in self.text_blocks:
-            for pattern in METRIC_DIMENSION_PATTERNS:
-                match = re.search(pattern, block["text"])
+            for pattern in METRIC_DIMENSION_REGEXES:
+                match = pattern.search(block["text"])
                 if match:
                     try:
                         value = float(match.group(1))
@@ -1265,8 +1330,8 @@ class ComponentExtractor:
             text_upper = block["text"].upper()
 
             # Check each pattern
-            for pattern in ADJACENT_LOT_PATTERNS:
-                matches = re.finditer(pattern, text_upper)
+            for pattern in ADJACENT_LOT_REGEXES:
+                matches = pattern.finditer(text_upper)
                 for match in matches:
                     identifier = match.group(0)
                     if identifier not in seen_identifiers:
@@ -1288,23 +1353,22 @@ class ComponentExtractor:
         for block in self.text_blocks:
             text_upper = block["text"].upper()
 
-            for feature_type, keywords in WATER_FEATURE_KEYWORDS.items():
-                for keyword in keywords:
-                    if keyword in text_upper:
-                        # Get full name from nearby text
-                        nearby = find_nearby_text(block, self.text_blocks, radius=150)
-                        name_parts = [b["text"] for b in sorted(nearby, key=lambda x: x["x"])]
-                        full_name = " ".join(name_parts[:3])  # Limit to avoid too much text
-
-                        if full_name not in seen_features:
-                            seen_features.add(full_name)
-                            water_features.append(
-                                WaterFeature(
-                                    feature_type=feature_type,
-                                    name=full_name,
-                                    location=(block["x"], block["y"])
-                                )
+            for feature_type, pattern in WATER_FEATURE_PATTERNS.items():
+                if pattern.search(text_upper):
+                    # Get full name from nearby text
+                    nearby = find_nearby_text(block, self.text_index, radius=150)
+                    name_parts = [b["text"] for b in sorted(nearby, key=lambda x: x["x"])]
+                    full_name = " ".join(name_parts[:3])  # Limit to avoid too much text
+
+                    if full_name not in seen_features:
+                        seen_features.add(full_name)
+                        water_features.append(
+                            WaterFeature(
+                                feature_type=feature_type,
+                                name=full_name,
+                                location=(block["x"], block["y"])
                             )
+                        )
 
         return water_features
 
@@ -1313,7 +1377,7 @@ class ComponentExtractor:
         # Look for north indicators in text
         for block in self.text_blocks:
             text_upper = block["text"].upper()
-            if any(kw in text_upper for kw in NORTH_KEYWORDS):
+            if NORTH_PATTERN.search(text_upper):
                 # Check if it's a standalone "N" or "NORTH" (likely compass)
                 if text_upper.strip() in ["N", "NORTH"]:
                     return NorthPointer(
@@ -1393,7 +1457,7 @@ class ComponentExtractor:
             text_upper = block["text"].upper()
             if any(kw in text_upper for kw in legend_keywords):
                 # Found a legend
-                nearby = find_nearby_text(block, self.text_blocks, radius=200)
+                nearby = find_nearby_text(block, self.text_index, radius=200)
                 symbols = [b["text"] for b in nearby if len(b["text"]) < 50]
 
                 return Legend(
@@ -1425,7 +1489,7 @@ class ComponentExtractor:
             for keyword, schedule_type in schedule_types.items():
                 if keyword in text_upper and "SCHEDULE" in text_upper:
                     # Found a schedule
-                    nearby = find_nearby_text(block, self.text_blocks, radius=300)
+                    nearby = find_nearby_text(block, self.text_index, radius=300)
                     items = []
 
                     # Extract schedule items (simple approach - look for numbered/lettered items)
@@ -1466,7 +1530,7 @@ class ComponentExtractor:
                     dimensions = None
 
                     # Look for dimension patterns nearby
-                    nearby = find_nearby_text(block, self.text_blocks, radius=50)
+                    nearby = find_nearby_text(block, self.text_index, radius=50)
                     for nb in nearby:
                         if re.search(r'\d+["\']?\s*x\s*\d+["\']?', nb["text"], re.IGNORECASE):
                             dimensions = nb["text"][:30]
@@ -1669,15 +1733,61 @@ class ComponentExtractor:
 # Main Extraction Pipeline
 # =============================================================================
 
-def extract_compliance_components(pdf_path: Path) -> Dict[str, Any]:
-    """Extract compliance components from all pages of a PDF."""
-    all_components = []
+# Worker processes for page extraction. Library callers (the backend) default
+# to extracting in their own process; this script's and compliCheckV2's CLIs
+# default to one worker per core
+EXTRACT_WORKERS = int(os.getenv("EXTRACT_WORKERS", "1"))
+
 
+def extract_worker_limit() -> int:
+    """Cores available to one plan when the backend runs several at once."""
+    concurrency = max(1, int(os.getenv("COMPLICHECK_CONCURRENCY", "1")))
+    return max(1, (os.cpu_count() or 1) // concurrency)
+
+
+def spawnable() -> bool:
+    """Whether a spawned worker can import this module to find extract_page_range."""
+    return __name__ == "__main__" or importlib.util.find_spec(__name__) is not None
+
+
+def extract_page_range(pdf_path: Path, start: int, stop: int) -> List[Dict[str, Any]]:
+    """Extract components from pages [start, stop) of a PDF, opened in this process."""
     with pdfplumber.open(pdf_path) as pdf:
-        for page_idx, page in enumerate(tqdm(pdf.pages, desc="Processing pages")):
-            extractor = ComponentExtractor(page, page_idx + 1)
-            components = extractor.extract_all()
-            all_components.append(components.to_dict())
+        return [
+            ComponentExtractor(pdf.pages[page_idx], page_idx + 1).extract_all().to_dict()
+            for page_idx in range(start, stop)
+        ]
+
+
+def extract_compliance_components(pdf_path: Path, workers: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Extract compliance components from all pages of a PDF.
+
+    Pages are independent and extraction is CPU-bound, so multi-page PDFs
+    can be split into contiguous page ranges extracted in worker processes
+    (workers, default EXTRACT_WORKERS, capped by extract_worker_limit).
+    Each worker opens the PDF itself, as pdfplumber pages can't be pickled.
+    Workers are spawned rather than forked so the caller's threads and
+    locks aren't copied into them; if this module was loaded under a name
+    they can't import, pages are extracted in this process.
+    """
+    workers = min(workers or EXTRACT_WORKERS, extract_worker_limit())
+    with pdfplumber.open(pdf_path) as pdf:
+        page_count = len(pdf.pages)
+        workers = min(workers, page_count)
+        if workers <= 1 or not spawnable():
+            all_components = [
+                ComponentExtractor(page, page_idx + 1).extract_all().to_dict()
+                for page_idx, page in enumerate(tqdm(pdf.pages, desc="Processing pages", disable=None))
+            ]
+            workers = 1
+
+    if workers > 1:
+        log(f"Extracting {page_count} pages in {workers} processes...")
+        bounds = [page_count * i // workers for i in range(workers + 1)]
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+            ranges = executor.map(extract_page_range, [pdf_path] * workers, bounds[:-1], bounds[1:])
+            all_components = [sheet for page_range in ranges for sheet in page_range]
 
     summary = {
         "total_sheets": len(all_components),
@@ -1708,20 +1818,25 @@ def extract_compliance_components(pdf_path: Path) -> Dict[str, Any]:
 # CLI Entry Point
 # =============================================================================
 
-def main():
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(
         description="Extract compliance components from architectural PDF"
     )
     parser.add_argument("--pdf", required=True, help="Input PDF path")
     parser.add_argument("--output", help="Output JSON path (optional)")
-    args = parser.parse_args()
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="Processes to extract pages in (default: CPU count)")
+    return parser.parse_args(argv)
+
 
+def run(args: argparse.Namespace) -> int:
+    """Extract components for parsed CLI args; also called in-process by compliCheckV2."""
     pdf_path = Path(args.pdf)
     if not pdf_path.exists():
         raise FileNotFoundError(f"PDF not found: {pdf_path}")
 
     log(f"Processing {pdf_path.name}...")
-    result = extract_compliance_components(pdf_path)
+    result = extract_compliance_components(pdf_path, args.workers)
 
     # Determine output path
     if args.output:
@@ -1730,8 +1845,7 @@ def main():
         output_path = pdf_path.with_name(pdf_path.stem + "_components.json")
 
     # Save results
-    with open(output_path, "w") as f:
-        json.dump(result, f, indent=2)
+    write_json(output_path, result)
 
     log(f"✅ Components extracted and saved to {output_path}")
     log(f"\nSummary:")
@@ -1746,6 +1860,11 @@ def main():
     log(f"  Accessibility: {result['summary']['total_accessibility']}")
     log(f"  Height/Levels: {result['summary']['total_height_levels']}")
     log(f"  Room types found: {', '.join(result['summary']['room_types'])}")
+    return 0
+
+
+def main():
+    return run(parse_args())
 
 
 if __name__ == "__main__":
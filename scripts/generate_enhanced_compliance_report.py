@@ -33,6 +33,11 @@ from reportlab.lib.enums import TA_CENTER, TA_RIGHT, TA_LEFT
 from reportlab.pdfgen import canvas
 import os
 
+try:
+    import orjson
+except ImportError:
+    orjson = None  # falls back to the stdlib json module
+
 
 # =============================================================================
 # Branding & Page Template
@@ -104,6 +109,8 @@ def log(msg: str) -> None:
 
 
 def load_json(path: Path) -> dict:
+    if orjson is not None:
+        return orjson.loads(path.read_bytes())
     with path.open() as f:
         return json.load(f)
 
@@ -393,6 +400,31 @@ def build_components_overview(story, styles, components_data: Dict):
     story.append(PageBreak())
 
 
+# Findings are laid out as a run of tables of at most this many rows. ReportLab
+# re-wraps every remaining row of a Table each time it splits it across a
+# page, so one table per component type gets quadratically slower with the
+# number of findings; page-sized tables keep layout linear
+FINDINGS_ROWS_PER_TABLE = 25
+
+FINDINGS_TABLE_STYLE = TableStyle([
+    ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#2F3C7E")),
+    ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
+    ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+    ("FONTSIZE", (0, 0), (-1, -1), 8),
+    ("ALIGN", (1, 0), (1, -1), "CENTER"),
+    ("ALIGN", (5, 0), (5, -1), "CENTER"),
+    ("VALIGN", (0, 0), (-1, -1), "TOP"),
+    ("BACKGROUND", (0, 1), (-1, -1), colors.white),
+    ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.white, colors.HexColor("#F8F9FA")]),
+    ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+    ("LEFTPADDING", (0, 0), (-1, -1), 4),
+    ("RIGHTPADDING", (0, 0), (-1, -1), 4),
+    ("TOPPADDING", (0, 0), (-1, -1), 6),
+    ("BOTTOMPADDING", (0, 0), (-1, -1), 6),
+    ("WORDWRAP", (0, 0), (-1, -1), True),
+])
+
+
 def build_compliance_by_component_type(story, styles, evaluations: List[Dict]):
     """Build detailed compliance section grouped by component type."""
     story.append(Paragraph("<b>Detailed Compliance Findings</b>", styles["Heading1"]))
@@ -412,10 +444,9 @@ def build_compliance_by_component_type(story, styles, evaluations: List[Dict]):
         story.append(Paragraph(f"<b>{type_title}</b>", styles["Heading2"]))
         story.append(Spacer(1, 0.1 * inch))
 
-        # Build table for this component type
-        table_data = [
-            ["Component", "Rule", "Requirement", "Expected", "Actual", "Status"]
-        ]
+        # Build table rows for this component type
+        header = ["Component", "Rule", "Requirement", "Expected", "Actual", "Status"]
+        rows = []
 
         for eval in evals:
             status = eval.get("status", "REVIEW")
@@ -454,7 +485,7 @@ def build_compliance_by_component_type(story, styles, evaluations: List[Dict]):
             if len(requirement_text) > 150:
                 requirement_text = requirement_text[:147] + "..."
 
-            table_data.append([
+            rows.append([
                 Paragraph(eval.get("component_name", ""), styles["BodyText"]),
                 Paragraph(eval.get("rule_id", ""), styles["BodyText"]),
                 Paragraph(requirement_text, styles["BodyText"]),
@@ -463,26 +494,14 @@ def build_compliance_by_component_type(story, styles, evaluations: List[Dict]):
                 Paragraph(status_style, styles["BodyText"])
             ])
 
-        detail_table = Table(table_data, colWidths=[1.2*inch, 0.6*inch, 2.7*inch, 0.9*inch, 0.9*inch, 0.6*inch])
-        detail_table.setStyle(TableStyle([
-            ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#2F3C7E")),
-            ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
-            ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-            ("FONTSIZE", (0, 0), (-1, -1), 8),
-            ("ALIGN", (1, 0), (1, -1), "CENTER"),
-            ("ALIGN", (5, 0), (5, -1), "CENTER"),
-            ("VALIGN", (0, 0), (-1, -1), "TOP"),
-            ("BACKGROUND", (0, 1), (-1, -1), colors.white),
-            ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.white, colors.HexColor("#F8F9FA")]),
-            ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-            ("LEFTPADDING", (0, 0), (-1, -1), 4),
-            ("RIGHTPADDING", (0, 0), (-1, -1), 4),
-            ("TOPPADDING", (0, 0), (-1, -1), 6),
-            ("BOTTOMPADDING", (0, 0), (-1, -1), 6),
-            ("WORDWRAP", (0, 0), (-1, -1), True),
-        ]))
-
-        story.append(detail_table)
+        for start in range(0, len(rows), FINDINGS_ROWS_PER_TABLE):
+            detail_table = Table(
+                [header] + rows[start:start + FINDINGS_ROWS_PER_TABLE],
+                colWidths=[1.2*inch, 0.6*inch, 2.7*inch, 0.9*inch, 0.9*inch, 0.6*inch],
+                repeatRows=1
+            )
+            detail_table.setStyle(FINDINGS_TABLE_STYLE)
+            story.append(detail_table)
         story.append(Spacer(1, 0.25 * inch))
 
 
@@ -861,6 +880,19 @@ def build_enhanced_report(
     compliance_data = load_json(compliance_path)
 
     plan_name = components_data.get("pdf_name", components_path.stem)
+    render_report(components_data, compliance_data, output_path, title, plan_name)
+
+
+def render_report(
+    components_data: dict,
+    compliance_data: dict,
+    output_path: Path,
+    title: str,
+    plan_name: str
+):
+    """Build the report PDF from already-loaded components and compliance data."""
+    # Shallow copy: the summary is replaced below, the caller's dict is left alone
+    compliance_data = dict(compliance_data)
     evaluations = compliance_data.get("evaluations", [])
 
     # Filter and deduplicate evaluations
@@ -936,7 +968,7 @@ def build_enhanced_report(
 # CLI Entry Point
 # =============================================================================
 
-def parse_args():
+def parse_args(argv: List[str] = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(
         description="Generate enhanced PDF compliance report from component-based analysis"
     )
@@ -944,12 +976,26 @@ def parse_args():
     parser.add_argument("--compliance", required=True, help="Path to compliance JSON")
     parser.add_argument("--output", help="Output PDF path (optional)")
     parser.add_argument("--title", default="Building Plan Compliance Report", help="Report title")
-    return parser.parse_args()
+    return parser.parse_args(argv)
 
 
-def main():
-    args = parse_args()
+def build_report(components_data: dict, compliance_data: dict, args: argparse.Namespace) -> int:
+    """
+    Build the report from in-memory data; compliCheckV2 calls this directly.
+    args.components only names the plan when the components have no pdf_name.
+    """
+    if args.output:
+        output_path = Path(args.output)
+    else:
+        output_path = Path(args.compliance).with_name(Path(args.compliance).stem + "_report.pdf")
+
+    plan_name = components_data.get("pdf_name", Path(args.components).stem)
+    render_report(components_data, compliance_data, output_path, args.title, plan_name)
+    return 0
 
+
+def run(args: argparse.Namespace) -> int:
+    """Build the report for parsed CLI args."""
     components_path = Path(args.components)
     compliance_path = Path(args.compliance)
 
@@ -964,6 +1010,11 @@ def main():
         output_path = compliance_path.with_name(compliance_path.stem + "_report.pdf")
 
     build_enhanced_report(components_path, compliance_path, output_path, args.title)
+    return 0
+
+
+def main():
+    return run(parse_args())
 
 
 if __name__ == "__main__":
@@ -14,10 +14,18 @@ This module is designed to be called programmatically or as a CLI tool.
 
 import os
 import json
+import functools
+import time
+import hashlib
 import argparse
+import re
+import sys
+import tempfile
+import threading
 from pathlib import Path
 from typing import Dict, List, Any, Optional
 from dataclasses import dataclass, asdict
+from concurrent.futures import ThreadPoolExecutor
 
 # Load environment variables
 try:
@@ -39,6 +47,88 @@ try:
 except ImportError:
     HAS_OPENAI = False
 
+try:
+    import orjson
+except ImportError:
+    orjson = None  # falls back to the stdlib json module
+
+# config.py lives in the repository root, next to compliCheckV2.py
+REPO_DIR = Path(__file__).resolve().parents[1]
+if str(REPO_DIR) not in sys.path:
+    sys.path.insert(0, str(REPO_DIR))
+
+from config import EnrichmentConfig, repo_path
+
+
+# =============================================================================
+# Rate Limiting
+# =============================================================================
+
+# Request budget shared by every enrichment call in the process, and retries
+# on rate-limit/server errors; MAX_REQUESTS_PER_MINUTE = 0 disables the limit
+MAX_REQUESTS_PER_MINUTE = EnrichmentConfig.MAX_REQUESTS_PER_MINUTE
+MAX_RETRIES = EnrichmentConfig.MAX_RETRIES
+
+
+class RateLimiter:
+    """Thread-safe token bucket: at most `rate` calls per `period` seconds, bursting up to `rate`."""
+
+    def __init__(self, rate: int, period: float = 60.0):
+        self.rate = rate
+        self.period = period
+        self.tokens = float(rate)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until a call may be made."""
+        if self.rate <= 0:
+            return
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate / self.period)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) * self.period / self.rate
+            time.sleep(wait)
+
+
+rate_limiter = RateLimiter(MAX_REQUESTS_PER_MINUTE)
+
+
+@functools.lru_cache(maxsize=None)
+def get_llm_client(provider: str, api_key: Optional[str]):
+    """
+    Return a shared API client per provider and key. Reusing the client keeps
+    its HTTP connection pool alive across enrichers and in-process runs. The
+    SDKs retry 429/5xx responses with exponential backoff up to MAX_RETRIES.
+    """
+    if provider == "anthropic":
+        return anthropic.Anthropic(api_key=api_key, max_retries=MAX_RETRIES)
+    return OpenAI(api_key=api_key, max_retries=MAX_RETRIES)
+
+
+# =============================================================================
+# Response Cache
+# =============================================================================
+
+# Bump whenever prompts or response handling change in a way that should not
+# reuse responses cached under the old version
+PROMPT_VERSION = "1"
+
+# LLM responses are cached on disk keyed by a hash of the prompt, so re-running
+# the same document skips the API calls. A relative EnrichmentConfig.CACHE_DIR
+# is taken from the repository root rather than the working directory
+CACHE_DIR = repo_path(EnrichmentConfig.CACHE_DIR)
+CACHE_EXPIRY_DAYS = EnrichmentConfig.CACHE_EXPIRY_DAYS
+
+# Outermost JSON object or array in a response, compiled once for every
+# _extract_json fallback
+JSON_BLOCK_PATTERN = re.compile(r"\{.*\}|\[.*\]", re.DOTALL)
+
 
 # =============================================================================
 # LLM Enrichment Engine
@@ -51,7 +141,10 @@ class LLMEnrichmentEngine:
     Designed to integrate seamlessly into existing pipelines.
     """
 
-    def __init__(self, api_key: str = None, provider: str = "auto", model: str = None):
+    def __init__(self, api_key: str = None, provider: str = "auto", model: str = None,
+                 max_workers: int = 8, use_cache: bool = EnrichmentConfig.ENABLE_CACHING,
+                 batch_mode: bool = False,
+                 poll_interval: float = 10.0):
         """
         Initialize LLM enrichment engine.
 
@@ -59,9 +152,20 @@ class LLMEnrichmentEngine:
             api_key: API key (auto-detected if None)
             provider: 'anthropic', 'openai', or 'auto' (default: auto-detect)
             model: Model name (uses defaults if None)
+            max_workers: Maximum LLM calls in flight at once during enrichment
+            use_cache: Reuse LLM responses cached in CACHE_DIR
+                (default: EnrichmentConfig.ENABLE_CACHING)
+            batch_mode: Send all requests through the Anthropic Message Batches
+                API (half the cost, but results can take minutes)
+            poll_interval: Seconds between batch status checks in batch mode
         """
         self.provider = provider
         self.max_tokens = 4096
+        self.max_workers = max_workers
+        self.use_cache = use_cache
+        self.batch_mode = batch_mode
+        self.poll_interval = poll_interval
+        self._batch_responses = {}  # cache key -> response text from a batch
 
         # Auto-detect provider if not specified
         if provider == "auto":
@@ -84,14 +188,14 @@ class LLMEnrichmentEngine:
         if self.provider == "anthropic":
             if not HAS_ANTHROPIC:
                 raise ImportError("anthropic library not installed. Run: pip install anthropic")
-            self.client = anthropic.Anthropic(api_key=api_key)
+            self.client = get_llm_client("anthropic", api_key)
             self.model = model or "claude-sonnet-4-20250514"
             print(f"🤖 Using Anthropic Claude ({self.model})")
 
         elif self.provider == "openai":
             if not HAS_OPENAI:
                 raise ImportError("openai library not installed. Run: pip install openai")
-            self.client = OpenAI(api_key=api_key)
+            self.client = get_llm_client("openai", api_key)
             self.model = model or "gpt-4o-mini"
             print(f"🤖 Using OpenAI ({self.model})")
         else:
@@ -99,15 +203,62 @@ class LLMEnrichmentEngine:
 
     def _call_llm(self, prompt: str, system_prompt: str = "") -> str:
         """Make a call to the LLM API with error handling."""
+        key = self._cache_key(prompt, system_prompt)
+        if key in self._batch_responses:
+            return self._batch_responses[key]
+
+        cache_path = self._cache_path(key) if self.use_cache else None
+        if cache_path:
+            cached = self._read_cache(cache_path)
+            if cached is not None:
+                return cached
+
+        rate_limiter.acquire()
         try:
             if self.provider == "anthropic":
-                return self._call_anthropic(prompt, system_prompt)
+                response = self._call_anthropic(prompt, system_prompt)
             elif self.provider == "openai":
-                return self._call_openai(prompt, system_prompt)
+                response = self._call_openai(prompt, system_prompt)
         except Exception as e:
             print(f"⚠️  LLM API error: {e}")
             return "{}"
 
+        if cache_path:
+            self._write_cache(cache_path, response)
+        return response
+
+    def _cache_key(self, prompt: str, system_prompt: str) -> str:
+        """Hash of everything that determines a response: prompt version, model and prompt text."""
+        return hashlib.sha256(json.dumps(
+            [PROMPT_VERSION, self.provider, self.model, self.max_tokens, system_prompt, prompt]
+        ).encode()).hexdigest()
+
+    def _cache_path(self, key: str) -> Path:
+        """Cache file for a request's cache key."""
+        return CACHE_DIR / key[:2] / f"{key[2:]}.json"
+
+    def _read_cache(self, cache_path: Path) -> Optional[str]:
+        """Cached response text, or None if missing or older than CACHE_EXPIRY_DAYS."""
+        try:
+            if time.time() - cache_path.stat().st_mtime > CACHE_EXPIRY_DAYS * 86400:
+                return None
+            with open(cache_path, "r") as f:
+                return json.load(f)["response"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _write_cache(self, cache_path: Path, response: str) -> None:
+        """Write a response to the cache atomically (temp file + rename)."""
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile(
+                "w", dir=cache_path.parent, suffix=".tmp", delete=False
+            ) as f:
+                json.dump({"model": self.model, "response": response}, f)
+            os.replace(f.name, cache_path)
+        except OSError as e:
+            print(f"⚠️  Could not write enrichment cache: {e}")
+
     def _call_anthropic(self, prompt: str, system_prompt: str = "") -> str:
         """Call Anthropic Claude API."""
         messages = [{"role": "user", "content": prompt}]
@@ -121,6 +272,60 @@ class LLMEnrichmentEngine:
 
         return response.content[0].text
 
+    def _run_anthropic_batch(self, requests: List[tuple]) -> None:
+        """
+        Send (prompt, system_prompt) requests as one Anthropic Message Batch and
+        wait for it; responses are picked up by _call_llm. Requests that are
+        already cached, or that fail in the batch, are left to normal calls.
+        """
+        pending = {}
+        for prompt, system_prompt in requests:
+            key = self._cache_key(prompt, system_prompt)
+            if key in pending or key in self._batch_responses:
+                continue
+            if self.use_cache and self._read_cache(self._cache_path(key)) is not None:
+                continue
+            pending[key] = (prompt, system_prompt)
+
+        if not pending:
+            return
+
+        custom_ids = {}
+        batch_requests = []
+        for i, (key, (prompt, system_prompt)) in enumerate(pending.items()):
+            params = {
+                "model": self.model,
+                "max_tokens": self.max_tokens,
+                "messages": [{"role": "user", "content": prompt}]
+            }
+            if system_prompt:
+                params["system"] = system_prompt
+            custom_ids[f"req-{i}"] = key
+            batch_requests.append({"custom_id": f"req-{i}", "params": params})
+
+        try:
+            batch = self.client.messages.batches.create(requests=batch_requests)
+            print(f"📦 Submitted batch {batch.id} with {len(batch_requests)} requests")
+            while batch.processing_status != "ended":
+                time.sleep(self.poll_interval)
+                batch = self.client.messages.batches.retrieve(batch.id)
+
+            succeeded = 0
+            for entry in self.client.messages.batches.results(batch.id):
+                key = custom_ids.get(entry.custom_id)
+                if key is None or entry.result.type != "succeeded":
+                    continue
+                response = entry.result.message.content[0].text
+                self._batch_responses[key] = response
+                succeeded += 1
+                if self.use_cache:
+                    self._write_cache(self._cache_path(key), response)
+        except Exception as e:
+            print(f"⚠️  Batch API error, falling back to direct calls: {e}")
+            return
+
+        print(f"   Batch returned {succeeded}/{len(batch_requests)} responses")
+    
     def _call_openai(self, prompt: str, system_prompt: str = "") -> str:
         """Call OpenAI API."""
         messages = []
@@ -139,7 +344,7 @@ class LLMEnrichmentEngine:
         return response.choices[0].message.content
     
     def _extract_json(self, response: str) -> Dict:
-        """Extract JSON from Claude's response, handling markdown formatting."""
+        """Extract JSON from the LLM's response, handling markdown formatting and surrounding prose."""
         response_clean = response.strip()
         
         # Remove markdown code blocks
@@ -151,6 +356,13 @@ class LLMEnrichmentEngine:
         try:
             return json.loads(response_clean)
         except json.JSONDecodeError as e:
+            # Prose around the JSON: try the outermost object/array instead
+            match = JSON_BLOCK_PATTERN.search(response_clean)
+            if match:
+                try:
+                    return json.loads(match.group())
+                except json.JSONDecodeError:
+                    pass
             print(f"⚠️  JSON parse error: {e}")
             return {}
     
@@ -159,6 +371,13 @@ class LLMEnrichmentEngine:
         Infer additional metadata about a sheet for better downstream processing.
         Returns enhanced sheet metadata.
         """
+        response = self._call_llm(*self._sheet_metadata_prompt(sheet))
+        metadata = self._extract_json(response)
+        
+        return metadata
+    
+    def _sheet_metadata_prompt(self, sheet: Dict[str, Any]) -> tuple:
+        """(prompt, system_prompt) for infer_sheet_metadata."""
         system_prompt = """You are an architectural drawing analyzer. Infer metadata about this sheet.
 Return JSON with:
 {
@@ -187,16 +406,20 @@ Return JSON with:
         
         prompt = f"Analyze this sheet and infer metadata:\n\n{json.dumps(sheet_summary, indent=2)}"
         
-        response = self._call_llm(prompt, system_prompt)
-        metadata = self._extract_json(response)
-        
-        return metadata
+        return prompt, system_prompt
     
     def categorize_components(self, components: Dict[str, Any]) -> Dict[str, Any]:
         """
         Categorize all extracted components by compliance domain.
         Useful for routing to specific KB checks.
         """
+        response = self._call_llm(*self._categorize_prompt(components))
+        categorization = self._extract_json(response)
+        
+        return categorization
+    
+    def _categorize_prompt(self, components: Dict[str, Any]) -> tuple:
+        """(prompt, system_prompt) for categorize_components."""
         system_prompt = """You are a building code expert. Categorize components by compliance domain.
 Return JSON with component counts and categories:
 {
@@ -223,10 +446,7 @@ Return JSON with component counts and categories:
         
         prompt = f"Categorize these components:\n\n{json.dumps(summary, indent=2)}"
         
-        response = self._call_llm(prompt, system_prompt)
-        categorization = self._extract_json(response)
-        
-        return categorization
+        return prompt, system_prompt
     
     def generate_component_labels(self, components_list: List[Dict], 
                                    component_type: str) -> List[Dict[str, Any]]:
@@ -237,6 +457,17 @@ Return JSON with component counts and categories:
         if not components_list:
             return []
         
+        response = self._call_llm(*self._labels_prompt(components_list, component_type))
+        labels = self._extract_json(response)
+        
+        # Ensure we return a list
+        if not isinstance(labels, list):
+            labels = [labels] if labels else []
+        
+        return labels
+    
+    def _labels_prompt(self, components_list: List[Dict], component_type: str) -> tuple:
+        """(prompt, system_prompt) for generate_component_labels."""
         system_prompt = f"""You are labeling {component_type} components for a compliance report.
 For each component, add:
 - readable_label: Human-friendly name
@@ -250,19 +481,19 @@ Return JSON array matching input length."""
         
         prompt = f"Label these {component_type} components:\n\n{json.dumps(sample, indent=2)}"
         
-        response = self._call_llm(prompt, system_prompt)
-        labels = self._extract_json(response)
-        
-        # Ensure we return a list
-        if not isinstance(labels, list):
-            labels = [labels] if labels else []
-        
-        return labels
+        return prompt, system_prompt
     
     def reconcile_conflicts(self, components: Dict[str, Any]) -> Dict[str, Any]:
         """
         Identify and resolve conflicts or inconsistencies in extracted data.
         """
+        response = self._call_llm(*self._reconcile_prompt(components))
+        reconciliation = self._extract_json(response)
+        
+        return reconciliation
+    
+    def _reconcile_prompt(self, components: Dict[str, Any]) -> tuple:
+        """(prompt, system_prompt) for reconcile_conflicts."""
         system_prompt = """You are a data quality analyst for architectural drawings.
 Identify conflicts, missing data, or inconsistencies.
 Return JSON:
@@ -284,10 +515,7 @@ Return JSON:
         
         prompt = f"Analyze for conflicts:\n\n{json.dumps(checks, indent=2)}"
         
-        response = self._call_llm(prompt, system_prompt)
-        reconciliation = self._extract_json(response)
-        
-        return reconciliation
+        return prompt, system_prompt
     
     def enrich_components(self, components_json: Dict[str, Any], 
                          operations: List[str] = None) -> Dict[str, Any]:
@@ -315,53 +543,86 @@ Return JSON:
         enriched = components_json.copy()
         enriched["llm_enrichment"] = {}
         
-        # Operation 1: Infer sheet metadata
-        if "infer_metadata" in operations:
-            print("📋 Inferring sheet metadata...")
-            sheet_metadata = []
-            for sheet in components_json["sheets"]:
-                metadata = self.infer_sheet_metadata(sheet)
-                sheet_metadata.append({
-                    "sheet_number": sheet["sheet_number"],
-                    "metadata": metadata
-                })
-                print(f"   Sheet {sheet['sheet_number']}: {metadata.get('drawing_type', 'unknown')}")
-            
-            enriched["llm_enrichment"]["sheet_metadata"] = sheet_metadata
+        all_rooms = []
+        for sheet in components_json["sheets"]:
+            all_rooms.extend(sheet.get("rooms", []))
         
-        # Operation 2: Categorize components
-        if "categorize" in operations:
-            print("\n🏷️  Categorizing components...")
-            categorization = self.categorize_components(components_json)
-            enriched["llm_enrichment"]["categorization"] = categorization
-            
-            if categorization.get("by_compliance_domain"):
-                for domain, info in categorization["by_compliance_domain"].items():
-                    print(f"   {domain}: {info.get('count', 0)} components")
+        # Batch mode: send every request in one discounted batch up front, so
+        # the calls below are answered from its results
+        if self.batch_mode:
+            if self.provider == "anthropic":
+                requests = []
+                if "infer_metadata" in operations:
+                    requests.extend(self._sheet_metadata_prompt(sheet) for sheet in components_json["sheets"])
+                if "categorize" in operations:
+                    requests.append(self._categorize_prompt(components_json))
+                if "label" in operations and all_rooms:
+                    requests.append(self._labels_prompt(all_rooms, "room"))
+                if "reconcile" in operations:
+                    requests.append(self._reconcile_prompt(components_json))
+                self._run_anthropic_batch(requests)
+            else:
+                print("⚠️  Batch mode requires the Anthropic provider - using direct calls")
         
-        # Operation 3: Generate labels (for rooms only, to save tokens)
-        if "label" in operations:
-            print("\n📝 Generating component labels...")
-            all_rooms = []
-            for sheet in components_json["sheets"]:
-                all_rooms.extend(sheet.get("rooms", []))
+        # The operations (and each sheet's metadata call) are independent LLM
+        # requests, so they are all submitted at once and awaited below in
+        # the original order; wall time is roughly that of the slowest call
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            if "infer_metadata" in operations:
+                sheet_futures = [
+                    (sheet, executor.submit(self.infer_sheet_metadata, sheet))
+                    for sheet in components_json["sheets"]
+                ]
+            if "categorize" in operations:
+                categorize_future = executor.submit(self.categorize_components, components_json)
+            if "label" in operations and all_rooms:
+                labels_future = executor.submit(self.generate_component_labels, all_rooms, "room")
+            if "reconcile" in operations:
+                reconcile_future = executor.submit(self.reconcile_conflicts, components_json)
             
-            if all_rooms:
-                room_labels = self.generate_component_labels(all_rooms, "room")
-                enriched["llm_enrichment"]["room_labels"] = room_labels
-                print(f"   Generated labels for {len(room_labels)} rooms")
-        
-        # Operation 4: Reconcile conflicts
-        if "reconcile" in operations:
-            print("\n🔍 Reconciling conflicts...")
-            reconciliation = self.reconcile_conflicts(components_json)
-            enriched["llm_enrichment"]["reconciliation"] = reconciliation
+            # Operation 1: Infer sheet metadata
+            if "infer_metadata" in operations:
+                print("📋 Inferring sheet metadata...")
+                sheet_metadata = []
+                for sheet, future in sheet_futures:
+                    metadata = future.result()
+                    sheet_metadata.append({
+                        "sheet_number": sheet["sheet_number"],
+                        "metadata": metadata
+                    })
+                    print(f"   Sheet {sheet['sheet_number']}: {metadata.get('drawing_type', 'unknown')}")
+                
+                enriched["llm_enrichment"]["sheet_metadata"] = sheet_metadata
             
-            quality_score = reconciliation.get("quality_score", 0.0)
-            print(f"   Data quality: {quality_score:.2f}/1.0")
+            # Operation 2: Categorize components
+            if "categorize" in operations:
+                print("\n🏷️  Categorizing components...")
+                categorization = categorize_future.result()
+                enriched["llm_enrichment"]["categorization"] = categorization
+                
+                if categorization.get("by_compliance_domain"):
+                    for domain, info in categorization["by_compliance_domain"].items():
+                        print(f"   {domain}: {info.get('count', 0)} components")
             
-            if reconciliation.get("conflicts"):
-                print(f"   Found {len(reconciliation['conflicts'])} conflicts")
+            # Operation 3: Generate labels (for rooms only, to save tokens)
+            if "label" in operations:
+                print("\n📝 Generating component labels...")
+                if all_rooms:
+                    room_labels = labels_future.result()
+                    enriched["llm_enrichment"]["room_labels"] = room_labels
+                    print(f"   Generated labels for {len(room_labels)} rooms")
+            
+            # Operation 4: Reconcile conflicts
+            if "reconcile" in operations:
+                print("\n🔍 Reconciling conflicts...")
+                reconciliation = reconcile_future.result()
+                enriched["llm_enrichment"]["reconciliation"] = reconciliation
+                
+                quality_score = reconciliation.get("quality_score", 0.0)
+                print(f"   Data quality: {quality_score:.2f}/1.0")
+                
+                if reconciliation.get("conflicts"):
+                    print(f"   Found {len(reconciliation['conflicts'])} conflicts")
         
         print("\n✅ Enrichment complete")
         
@@ -372,7 +633,24 @@ Return JSON:
 # CLI Interface
 # =============================================================================
 
-def main():
+def read_json(path: Path) -> Any:
+    """Load a JSON file, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(Path(path).read_bytes())
+    with open(path) as f:
+        return json.load(f)
+
+
+def write_json(path: Path, data: Any) -> None:
+    """Write data as indented JSON, using orjson when it is installed."""
+    if orjson is not None:
+        Path(path).write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        return
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(
         description="LLM Enrichment Layer - Add intelligent metadata to extracted components"
     )
@@ -406,25 +684,44 @@ def main():
         default=["all"],
         help="Enrichment operations to run"
     )
+    parser.add_argument(
+        "--batch-mode",
+        action="store_true",
+        help="Use the Anthropic Message Batches API (50%% cheaper, slower to return)"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help=f"Always call the LLM instead of reusing cached responses in {CACHE_DIR}"
+    )
+
+    return parser.parse_args(argv)
+
+
+def enrich(components: Dict[str, Any], args: argparse.Namespace) -> Dict[str, Any]:
+    """Enrich an in-memory components dict; compliCheckV2 calls this directly."""
+    # Run enrichment (auto-detects API key and provider)
+    engine = LLMEnrichmentEngine(
+        api_key=args.api_key,
+        provider=args.provider,
+        model=args.model,
+        use_cache=EnrichmentConfig.ENABLE_CACHING and not args.no_cache,
+        batch_mode=args.batch_mode
+    )
+    return engine.enrich_components(components, args.operations)
 
-    args = parser.parse_args()
 
+def run(args: argparse.Namespace) -> int:
+    """Enrich components for parsed CLI args."""
     # Load input
     input_path = Path(args.input)
     if not input_path.exists():
         raise FileNotFoundError(f"Input file not found: {input_path}")
 
     print(f"📂 Loading: {input_path}")
-    with open(input_path, "r") as f:
-        components = json.load(f)
+    components = read_json(input_path)
 
-    # Run enrichment (auto-detects API key and provider)
-    engine = LLMEnrichmentEngine(
-        api_key=args.api_key,
-        provider=args.provider,
-        model=args.model
-    )
-    enriched = engine.enrich_components(components, args.operations)
+    enriched = enrich(components, args)
     
     # Determine output path
     if args.output:
@@ -433,11 +730,15 @@ def main():
         output_path = input_path.with_name(input_path.stem + "_enriched.json")
     
     # Save enriched output
-    with open(output_path, "w") as f:
-        json.dump(enriched, f, indent=2)
+    write_json(output_path, enriched)
     
     print(f"\n💾 Enriched data saved: {output_path}")
     print(f"📊 Original components + LLM enrichment layer added")
+    return 0
+
+
+def main():
+    return run(parse_args())
 
 
 if __name__ == "__main__":